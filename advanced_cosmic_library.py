@@ -6,16 +6,28 @@ import os
 import time
 from datetime import datetime
 import textwrap
+from cosmic_profiler import FrameProfiler
+from cosmic_clock import SimulationClock
+from cosmic_display import DirtyRectTracker, FramePacer, app_options, build_gradient_background, create_screen, headless_requested, init_pygame, run_frame_loop
 
 class AdvancedCosmicLibrary:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, dirty_rects=None, target_fps=60, idle_fps=10, headless=None,
+                 pause_when_unfocused=None):
+        init_pygame(headless)
         self.width, self.height = 1280, 800
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.screen = create_screen((self.width, self.height), headless=headless)
         pygame.display.set_caption("Cosmic Akashic Records Library")
         self.clock = pygame.time.Clock()
+        self.pacer = FramePacer(target_fps, idle_fps, pause_when_unfocused=pause_when_unfocused, clock=self.clock)
+        # Fixed-step animation clock; headless runs count exactly one step per frame
+        self.simulation = SimulationClock(frame_time=1 / 60 if headless_requested(headless) else None)
+        self.profiler = FrameProfiler()
         self.running = True
         
+        # Display updates (full flip or dirty rectangles only)
+        self.dirty_tracker = DirtyRectTracker(dirty_rects)
+        self.background = None
+        
         # Fonts
         self.font_tiny = pygame.font.SysFont('Arial', 12)
         self.font_small = pygame.font.SysFont('Arial', 16)
@@ -148,7 +160,7 @@ class AdvancedCosmicLibrary:
     def update_stars(self):
         for star in self.stars:
             # Make stars twinkle
-            brightness = 150 + 105 * math.sin(time.time() * star['twinkle_rate'] * 10)
+            brightness = 150 + 105 * math.sin(self.simulation.render_time * star['twinkle_rate'] * 10)
             star['color'] = (brightness, brightness, brightness)
     
     def update_energy_particles(self):
@@ -182,16 +194,12 @@ class AdvancedCosmicLibrary:
                 particle['life'] = random.uniform(0.5, 1)
     
     def draw_cosmic_background(self):
-        # Create a dark gradient background
-        for y in range(0, self.height, 2):  # Step by 2 for performance
-            # Calculate gradient colors
-            gradient_factor = y / self.height
-            r = int(5 + 10 * gradient_factor)
-            g = int(8 + 2 * gradient_factor)
-            b = int(25 + 5 * gradient_factor)
-            
-            # Draw a line with the calculated color
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.width, y), 2)
+        # Render the dark gradient background once and reuse it every frame
+        if self.background is None or self.background.get_size() != (self.width, self.height):
+            self.background = build_gradient_background(
+                (self.width, self.height), (5, 8, 25), (15, 10, 30), step=2
+            )
+        self.screen.blit(self.background, (0, 0))
     
     def draw_stars(self):
         for star in self.stars:
@@ -268,7 +276,7 @@ class AdvancedCosmicLibrary:
             rect = pygame.Rect(x, y, col_width, 60)
             
             # Calculate animation effect
-            pulse = 0.5 + 0.5 * math.sin(time.time() * 1.5 + i * 0.7)
+            pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.5 + i * 0.7)
             glow_size = int(2 + 2 * pulse)
             
             # Draw glowing box with animation
@@ -296,7 +304,7 @@ class AdvancedCosmicLibrary:
         add_rect = pygame.Rect(self.width // 2 - 150, start_y + rows * category_height + 40, 300, 60)
         
         # Animated button glow
-        pulse = 0.5 + 0.5 * math.sin(time.time() * 2)
+        pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 2)
         button_color = (
             int(30 + 20 * pulse),
             int(80 + 20 * pulse),
@@ -367,7 +375,7 @@ class AdvancedCosmicLibrary:
                 rect = pygame.Rect(self.width // 2 - 400, y_pos, 800, record_height - 20)
                 
                 # Animated highlight for records
-                pulse = 0.5 + 0.5 * math.sin(time.time() * 1.0 + i * 0.3)
+                pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.0 + i * 0.3)
                 record_color = (
                     int(20 + 10 * pulse),
                     int(20 + 10 * pulse),
@@ -935,4 +943,58 @@ class AdvancedCosmicLibrary:
             
         if self.input_active:
             # Handle input dialog clicks
-            panel_rect = pygame.Rect(self.width // 2 - 400, 50, 800, self.height - 100)
\ No newline at end of file
+            panel_rect = pygame.Rect(self.width // 2 - 400, 50, 800, self.height - 100)
+    
+    def draw_frame(self):
+        # Update elements
+        with self.profiler.phase("update"):
+            steps = self.simulation.advance()
+            self.update_stars()
+            # Particles move a fixed distance per simulation step, whatever the frame rate
+            for _ in range(steps):
+                self.update_energy_particles()
+        
+        # Draw everything
+        with self.profiler.phase("background"):
+            self.draw_cosmic_background()
+        with self.profiler.phase("stars_particles"):
+            self.draw_stars()
+            self.draw_energy_particles()
+        
+        with self.profiler.phase("interface"):
+            if self.active_category and self.viewing_records:
+                self.draw_category_view()
+            else:
+                self.draw_main_interface()
+            
+            # Overlays
+            if self.search_active:
+                self.draw_search_interface()
+            if self.input_active:
+                self.draw_input_interface()
+            if self.viewing_record_detail:
+                self.draw_record_detail()
+            
+            self.draw_notification()
+    
+    def is_animating(self):
+        # Notification fade-outs need the full frame rate
+        return self.notification is not None and time.time() < self.notification_timer
+    
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:  # Left click
+                self.handle_click(event.pos)
+        elif event.type == pygame.MOUSEWHEEL:
+            self.scroll_offset = max(0, min(self.max_scroll, self.scroll_offset - event.y * 40))
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+    
+    def run(self):
+        run_frame_loop(self, self.handle_event, self.is_animating)
+        pygame.quit()
+
+if __name__ == "__main__":
+    app = AdvancedCosmicLibrary(**app_options(description="Cosmic Akashic Records Library"))
+    app.run()
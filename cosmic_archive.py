@@ -0,0 +1,126 @@
+import json
+import struct
+
+MAGIC = b"CPAK"
+VERSION = 1
+HEADER = struct.Struct(">4sB")
+FRAME = struct.Struct(">I")
+TRAILER = struct.Struct(">Q4s")
+
+
+class PackWriter:
+    """Single-file archive of named binary records, written front to back.
+
+    Each record is a length-prefixed frame appended as it arrives, so an
+    archive of any size is written with constant memory. close() appends a
+    JSON index of (name, offset, length) entries and a fixed-size trailer
+    pointing at it; readers find the index from the end of the file and can
+    then fetch any record with one seek.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.offset = HEADER.size
+        self.index = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def write(self, name, payload):
+        """Append one record; payload is bytes"""
+        self.file.write(FRAME.pack(len(payload)))
+        self.file.write(payload)
+        self.index.append((name, self.offset + FRAME.size, len(payload)))
+        self.offset += FRAME.size + len(payload)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.write(json.dumps(self.index).encode("utf-8"))
+        self.file.write(TRAILER.pack(self.offset, MAGIC))
+        self.file.close()
+
+
+class PackReader:
+    """Reads a PackWriter archive: streaming in write order, or by position through the index"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.size = self.file.seek(0, 2)
+            if self.size < HEADER.size + TRAILER.size:
+                raise ValueError(f"{path} is truncated ({self.size} bytes)")
+            self.file.seek(0)
+            magic, version = HEADER.unpack(self._read_exact(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} pack archive")
+            self.file.seek(self.size - TRAILER.size)
+            self.index_offset, magic = TRAILER.unpack(self._read_exact(TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} has no index (archive was not closed or is truncated)")
+            if not HEADER.size <= self.index_offset <= self.size - TRAILER.size:
+                raise ValueError(f"{path} is truncated (index offset {self.index_offset} past the end)")
+        except Exception:
+            self.file.close()
+            raise
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def index(self):
+        """[(name, offset, length), ...] in write order, loaded on first use"""
+        if self._index is None:
+            self.file.seek(self.index_offset)
+            index = json.loads(self._read_exact(self.size - TRAILER.size - self.index_offset))
+            if not isinstance(index, list) or not all(isinstance(entry, list) and len(entry) == 3 for entry in index):
+                raise ValueError(f"{self.path} has a malformed index")
+            self._index = [tuple(entry) for entry in index]
+        return self._index
+
+    def read(self, position):
+        """Payload of the record at position (0-based)"""
+        _, offset, length = self.index[position]
+        if offset + length > self.index_offset:
+            raise ValueError(f"{self.path} is truncated (record {position} runs past the data)")
+        self.file.seek(offset)
+        return self._read_exact(length)
+
+    def frames(self):
+        """Payloads in write order, read sequentially without the index"""
+        offset = HEADER.size
+        while offset < self.index_offset:
+            if offset + FRAME.size > self.index_offset:
+                raise ValueError(f"{self.path} is truncated (partial frame header at {offset})")
+            self.file.seek(offset)
+            (length,) = FRAME.unpack(self._read_exact(FRAME.size))
+            if offset + FRAME.size + length > self.index_offset:
+                raise ValueError(f"{self.path} is truncated (frame at {offset} runs past the data)")
+            yield self._read_exact(length)
+            offset += FRAME.size + length
+
+    def _read_exact(self, size):
+        """Exactly size bytes from the current position; ValueError on a short read"""
+        data = self.file.read(size)
+        if len(data) != size:
+            raise ValueError(f"{self.path} is truncated (wanted {size} bytes, got {len(data)})")
+        return data
+
+    def close(self):
+        self.file.close()
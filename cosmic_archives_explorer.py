@@ -7,17 +7,29 @@ import math
 import time
 from datetime import datetime
 import textwrap
+from cosmic_profiler import FrameProfiler
+from cosmic_clock import SimulationClock
+from cosmic_display import DirtyRectTracker, FramePacer, app_options, build_gradient_background, create_screen, headless_requested, init_pygame, run_frame_loop
 
 class CosmicArchivesExplorer:
-    def __init__(self, username="behicof", timestamp="2025-04-17 14:27:41"):
-        pygame.init()
+    def __init__(self, username="behicof", timestamp="2025-04-17 14:27:41", dirty_rects=None,
+                 target_fps=60, idle_fps=10, headless=None, pause_when_unfocused=None):
+        init_pygame(headless)
         self.archives_path = "cosmic_grand_archives"
         self.width, self.height = 1280, 800
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.screen = create_screen((self.width, self.height), headless=headless)
         pygame.display.set_caption("Cosmic Archives Explorer: Five Centuries of Knowledge")
         self.clock = pygame.time.Clock()
+        self.pacer = FramePacer(target_fps, idle_fps, pause_when_unfocused=pause_when_unfocused, clock=self.clock)
+        # Fixed-step animation clock; headless runs count exactly one step per frame
+        self.simulation = SimulationClock(frame_time=1 / 60 if headless_requested(headless) else None)
+        self.profiler = FrameProfiler()
         self.running = True
         
+        # Display updates (full flip or dirty rectangles only)
+        self.dirty_tracker = DirtyRectTracker(dirty_rects)
+        self.background = None
+        
         # User info
         self.username = username
         self.timestamp = timestamp
@@ -238,7 +250,7 @@ class CosmicArchivesExplorer:
         """Update star twinkle effect"""
         for star in self.stars:
             # Make stars twinkle
-            brightness = 150 + 105 * math.sin(time.time() * star['twinkle_rate'] * 10)
+            brightness = 150 + 105 * math.sin(self.simulation.render_time * star['twinkle_rate'] * 10)
             star['color'] = (brightness, brightness, brightness)
     
     def update_energy_particles(self):
@@ -273,14 +285,12 @@ class CosmicArchivesExplorer:
                 particle['life'] = random.uniform(0.5, 1)
     
     def draw_cosmic_background(self):
-        """Draw the cosmic background gradient"""
-        for y in range(0, self.height, 2):
-            gradient_factor = y / self.height
-            r = int(5 + 10 * gradient_factor)
-            g = int(8 + 2 * gradient_factor)
-            b = int(25 + 5 * gradient_factor)
-            
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.width, y), 2)
+        """Draw the cosmic background gradient (rendered once, then blitted)"""
+        if self.background is None or self.background.get_size() != (self.width, self.height):
+            self.background = build_gradient_background(
+                (self.width, self.height), (5, 8, 25), (15, 10, 30), step=2
+            )
+        self.screen.blit(self.background, (0, 0))
     
     def draw_stars(self):
         """Draw background stars"""
@@ -372,7 +382,7 @@ class CosmicArchivesExplorer:
             self.screen.blit(name_text, name_rect)
             
             # Draw selection box with animation
-            pulse = 0.5 + 0.5 * math.sin(time.time() * 2 + i * 0.5)
+            pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 2 + i * 0.5)
             glow_size = int(2 + 2 * pulse)
             
             select_rect = pygame.Rect(x_pos - period_width//2 + 20, timeline_y + 90, period_width - 40, 60)
@@ -404,7 +414,7 @@ class CosmicArchivesExplorer:
             domain_rect = pygame.Rect(x, y, domain_width, domain_height)
             
             # Animated glow
-            pulse = 0.5 + 0.5 * math.sin(time.time() * 1.5 + i * 0.3)
+            pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.5 + i * 0.3)
             domain_color = (
                 int(40 + 20 * pulse),
                 int(40 + 10 * pulse),
@@ -512,7 +522,7 @@ class CosmicArchivesExplorer:
             
             # Draw with animated pulse if has records
             if record_count > 0:
-                pulse = 0.5 + 0.5 * math.sin(time.time() * 1.5 + i * 0.3)
+                pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.5 + i * 0.3)
                 glow_size = int(2 + 3 * pulse)
                 
                 # Adjust color with pulse
@@ -1256,4 +1266,62 @@ class CosmicArchivesExplorer:
             start_x = self.width // 2 - total_width // 2
             
             for i, category in enumerate(categories):
-                x = start_x + i * category_
\ No newline at end of file
+                x = start_x + i * category_width
+                y = 260
+                cat_rect = pygame.Rect(x, y, category_width - 10, 30)
+                if cat_rect.collidepoint(pos):
+                    self.search_category = category
+                    return
+    
+    def draw_frame(self):
+        """Update the background animation and draw the current view"""
+        with self.profiler.phase("update"):
+            steps = self.simulation.advance()
+            self.update_stars()
+            # Particles move a fixed distance per simulation step, whatever the frame rate
+            for _ in range(steps):
+                self.update_energy_particles()
+        
+        with self.profiler.phase("background"):
+            self.draw_cosmic_background()
+        with self.profiler.phase("stars_particles"):
+            self.draw_stars()
+            self.draw_energy_particles()
+        
+        with self.profiler.phase("interface"):
+            if self.view_mode == "main":
+                self.draw_main_interface()
+            elif self.view_mode == "period":
+                self.draw_period_interface()
+            elif self.view_mode == "domain":
+                self.draw_domain_interface()
+            elif self.view_mode == "record":
+                self.draw_record_interface()
+            elif self.view_mode == "search":
+                self.draw_search_interface()
+            
+            self.draw_notification()
+    
+    def is_animating(self):
+        """Whether a foreground animation (notification fade) needs the full frame rate"""
+        return self.notification is not None and time.time() < self.notification_timer
+    
+    def handle_event(self, event):
+        """Input handling for one event of the main loop"""
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:  # Left click
+                self.handle_click(event.pos)
+        elif event.type == pygame.MOUSEWHEEL:
+            self.scroll_offset = max(0, min(self.max_scroll, self.scroll_offset - event.y * 40))
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+    
+    def run(self):
+        """Main application loop"""
+        run_frame_loop(self, self.handle_event, self.is_animating)
+        pygame.quit()
+
+if __name__ == "__main__":
+    explorer = CosmicArchivesExplorer(**app_options(description="Cosmic Archives Explorer"))
+    explorer.run()
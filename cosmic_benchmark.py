@@ -0,0 +1,868 @@
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PRESENT_APPS = ("library", "advanced_library", "explorer")
+HEADLESS_APPS = ("cube", "reality", "library", "advanced_library", "explorer")
+
+# `python -X importtime` budget (cumulative ms) for the entry points that do not draw anything
+IMPORT_BUDGETS_MS = {
+    "cosmic_archives_generator": 40,
+    "populate_library": 40,
+    "populate_cosmic_library": 40,
+    "reality_editor": 40,
+    "cosmic_security": 40,
+    "cosmic_reality_forge": 60
+}
+HEAVY_MODULES = ("pygame", "numpy", "scipy", "cryptography")
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(timings):
+    """Frame-time statistics in milliseconds"""
+    return {
+        "frames": len(timings),
+        "mean_ms": statistics.fmean(timings) * 1000 if timings else 0.0,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "max_ms": max(timings) * 1000 if timings else 0.0
+    }
+
+
+def present_mode_apps():
+    """Screens that support the dirty-rectangle update mode"""
+    from advanced_cosmic_library import AdvancedCosmicLibrary
+    from cosmic_archives_explorer import CosmicArchivesExplorer
+    from cosmic_library import CosmicLibrary
+
+    return {
+        "library": CosmicLibrary,
+        "advanced_library": AdvancedCosmicLibrary,
+        "explorer": CosmicArchivesExplorer
+    }
+
+
+def benchmark_present_modes(frames=300, apps=None):
+    """Compare full-flip and dirty-rectangle presentation for each library screen"""
+    import pygame
+
+    # Without a display, fall back to SDL's dummy driver so the comparison still runs
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    available = present_mode_apps()
+    results = {}
+    for name in apps or PRESENT_APPS:
+        factory = available[name]
+        for dirty_rects in (False, True):
+            app = factory(dirty_rects=dirty_rects)
+            screen_area = app.width * app.height
+            timings = []
+            updated_area = 0
+            for _ in range(frames):
+                start = time.perf_counter()
+                app.draw_frame()
+                app.dirty_tracker.present(app.screen)
+                timings.append(time.perf_counter() - start)
+                updated_area += app.dirty_tracker.last_update_area
+            pygame.quit()
+
+            stats = summarize(timings)
+            stats["updated_fraction"] = updated_area / (screen_area * frames)
+            results[(name, "dirty" if dirty_rects else "flip")] = stats
+    return results
+
+
+def create_headless_app(name):
+    """Construct one of the visual apps on the off-screen backend"""
+    if name == "cube":
+        from cosmic_cube import CosmicCube
+        return CosmicCube(username="behicof", timestamp="2025-04-17 14:37:51", headless=True)
+    if name == "reality":
+        from cosmic_reality_forge import CosmicRealityVisualizer, RealityForge
+        return CosmicRealityVisualizer(RealityForge(timestamp="2025-04-17 14:01:33"), headless=True)
+    factory = present_mode_apps()[name]
+    return factory(headless=True)
+
+
+def render_one_frame(app):
+    """Advance and draw a single frame without event handling or frame pacing"""
+    profiler = app.profiler
+    profiler.begin_frame()
+    if hasattr(app, "draw_frame"):
+        app.draw_frame()
+        with profiler.phase("present"):
+            app.dirty_tracker.present(app.screen)
+    else:
+        with profiler.phase("update"):
+            app.update()
+        app.render()
+    profiler.end_frame()
+
+
+def benchmark_headless(name, frames=600, seed=0, warmup=10, trace_path=None):
+    """Render a fixed number of frames off-screen and collect frame-time statistics"""
+    import numpy as np
+    import pygame
+
+    random.seed(seed)
+    np.random.seed(seed)
+    app = create_headless_app(name)
+    # The benchmark reports its own statistics; no periodic summaries mid-run
+    app.profiler.log_interval = None
+    try:
+        for _ in range(warmup):
+            render_one_frame(app)
+
+        # Keep only the measured frames in the profiler's buffer
+        app.profiler.frames.clear()
+        timings = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            render_one_frame(app)
+            timings.append(time.perf_counter() - start)
+        if trace_path:
+            app.profiler.export_chrome_trace(trace_path)
+    finally:
+        pygame.quit()
+
+    stats = summarize(timings)
+    stats["phases_ms"] = app.profiler.phase_means()
+    stats.update({"app": name, "seed": seed, "timings_ms": [t * 1000 for t in timings]})
+    return stats
+
+
+def benchmark_picking(nodes=5000, queries=2000, radius=15, seed=0):
+    """Nearest-node hit-testing: linear distance scan vs the screen-space grid index"""
+    import math
+
+    import numpy as np
+
+    from cosmic_spatial import ScreenSpatialIndex
+
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform((0, 0), (1280, 800), size=(nodes, 2))
+    points = rng.uniform((0, 0), (1280, 800), size=(queries, 2)).tolist()
+    screen_positions = [tuple(p) for p in positions.tolist()]
+
+    def linear_pick(pos):
+        best, best_distance = None, radius
+        for i, (x, y) in enumerate(screen_positions):
+            distance = math.sqrt((pos[0] - x) ** 2 + (pos[1] - y) ** 2)
+            if distance < best_distance:
+                best, best_distance = i, distance
+        return best
+
+    start = time.perf_counter()
+    linear = [linear_pick(pos) for pos in points]
+    linear_time = time.perf_counter() - start
+
+    index = ScreenSpatialIndex()
+    start = time.perf_counter()
+    index.rebuild(positions)
+    rebuild_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.nearest(pos, radius) for pos in points]
+    indexed_time = time.perf_counter() - start
+
+    return {
+        "nodes": nodes,
+        "queries": queries,
+        "linear_us": linear_time / queries * 1e6,
+        "indexed_us": indexed_time / queries * 1e6,
+        "rebuild_ms": rebuild_time * 1000,
+        "matches": linear == indexed
+    }
+
+
+def synthetic_knowledge_nodes(nodes, edges, seed=0):
+    """Knowledge nodes shaped like CosmicCube's, with randomly wired connections"""
+    rng = random.Random(seed)
+    dimensions = ["consciousness", "frequency", "time", "space", "energy", "information", "intention"]
+    result = [{
+        "id": f"NODE-{i + 1}",
+        "name": f"Node {i + 1}",
+        "dimension": rng.choice(dimensions),
+        "frequency": rng.choice([396.0, 417.0, 432.0, 528.0, 741.0, 852.0, 963.0]),
+        "energy_level": 1.0,
+        "stability": 1.0,
+        "symbols": ["*"],
+        "connections": []
+    } for i in range(nodes)]
+    for _ in range(edges):
+        source, target = rng.randrange(nodes), rng.randrange(nodes)
+        result[source]["connections"].append({
+            "target_id": result[target]["id"],
+            "strength": rng.uniform(0.3, 1.0),
+            "type": rng.choice(("harmonic", "complementary")),
+            "active": True
+        })
+    return result
+
+
+def benchmark_graph(nodes=10000, edges=100000, seed=0, sample_edges=200):
+    """Edge resolution and traversal through KnowledgeGraph vs scanning the node list"""
+    import numpy as np
+    import pygame
+
+    from cosmic_graph import KnowledgeGraph
+
+    knowledge_nodes = synthetic_knowledge_nodes(nodes, edges, seed)
+
+    start = time.perf_counter()
+    graph = KnowledgeGraph.from_nodes(knowledge_nodes)
+    build_time = time.perf_counter() - start
+
+    # The old per-edge lookup is too slow to run over every edge; time a sample and scale it
+    sample = [conn for node in knowledge_nodes for conn in node["connections"]][:sample_edges]
+    start = time.perf_counter()
+    for conn in sample:
+        next((n for n in knowledge_nodes if n["id"] == conn["target_id"]), None)
+    scan_time = (time.perf_counter() - start) / len(sample) * edges
+
+    positions = np.random.default_rng(seed).uniform((0, 0), (1280, 800), size=(nodes, 2))
+    start = time.perf_counter()
+    points = positions.astype(int)
+    points[graph.sources()].tolist()
+    points[graph.targets].tolist()
+    csr_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reached = graph.neighborhood(0, depth=2)
+    traversal_time = time.perf_counter() - start
+
+    # Full edge + node pass of the cube renderer on the off-screen backend
+    app = create_headless_app("cube")
+    try:
+        app.knowledge_nodes = knowledge_nodes
+        app.knowledge_graph = graph
+        app.project_scene()
+        start = time.perf_counter()
+        app.render_knowledge_nodes()
+        render_time = time.perf_counter() - start
+
+        # Same frame with level-of-detail disabled
+        app.lod_full_detail_nodes = float("inf")
+        start = time.perf_counter()
+        app.render_knowledge_nodes()
+        full_render_time = time.perf_counter() - start
+
+        # Edge pass alone, best of a few runs, against one draw call per directed edge
+        positions = app.node_screen_positions
+        no_focus = np.empty(0, dtype=np.int64)
+        edge_times = []
+        for _ in range(3):
+            # Forget the cached layer so every run redraws it
+            app.edge_layer_key = None
+            start = time.perf_counter()
+            app.render_knowledge_edges(graph, positions, True, no_focus, 1.0)
+            edge_times.append(time.perf_counter() - start)
+        edge_time = min(edge_times)
+
+        # Unchanged projection: the cached edge layer is only blitted
+        start = time.perf_counter()
+        app.render_knowledge_edges(graph, positions, True, no_focus, 1.0)
+        cached_edge_time = time.perf_counter() - start
+        points = positions.astype(int)
+        start = time.perf_counter()
+        sources, targets = points[graph.sources()].tolist(), points[graph.targets].tolist()
+        widths = np.maximum(1, (3 * graph.strengths).astype(int)).tolist()
+        for start_pos, end_pos, width in zip(sources, targets, widths):
+            pygame.draw.line(app.screen, (120, 140, 220), start_pos, end_pos, width)
+        per_edge_time = time.perf_counter() - start
+    finally:
+        pygame.quit()
+
+    return {
+        "nodes": nodes,
+        "edges": graph.edge_count,
+        "build_ms": build_time * 1000,
+        "scan_lookup_ms": scan_time * 1000,
+        "csr_lookup_ms": csr_time * 1000,
+        "two_hop_nodes": len(reached),
+        "two_hop_ms": traversal_time * 1000,
+        "render_ms": render_time * 1000,
+        "full_render_ms": full_render_time * 1000,
+        "edge_ms": edge_time * 1000,
+        "cached_edge_ms": cached_edge_time * 1000,
+        "per_edge_ms": per_edge_time * 1000
+    }
+
+
+def relationship_test_nodes(nodes, dimensions=7, categories=50, seed=0):
+    """Nodes with random dimensions/categories and frequencies that often land on harmonic ratios"""
+    rng = random.Random(seed)
+    base = [396.0, 417.0, 432.0, 528.0, 741.0, 852.0, 963.0]
+    result = []
+    for i in range(nodes):
+        frequency = rng.choice(base) * rng.choice([0.5, 0.66, 1.0, 1.5, 2.0]) * rng.uniform(0.995, 1.005)
+        result.append({
+            "id": f"NODE-{i + 1}",
+            "dimension": f"dimension-{rng.randrange(dimensions)}",
+            "category": f"category-{rng.randrange(categories)}",
+            "frequency": rng.choice([frequency, frequency, frequency, 0])
+        })
+    return result
+
+
+def pairwise_relationships(nodes):
+    """Reference all-pairs builder (the original CosmicCube loop)"""
+    from cosmic_graph import connection_strength
+
+    relationships = []
+    for i, node in enumerate(nodes):
+        connections = []
+        for j, other_node in enumerate(nodes):
+            if i != j:
+                strength = connection_strength(node, other_node)
+                if strength > 0.3:
+                    connections.append({
+                        "target_id": other_node["id"],
+                        "strength": strength,
+                        "type": "harmonic" if node.get("dimension") == other_node.get("dimension") else "complementary",
+                        "active": True
+                    })
+        relationships.append(connections)
+    return relationships
+
+
+def benchmark_relationships(nodes=100000, dimensions=2000, categories=500, seed=0, verify_limit=3000, added=200):
+    """Time the bucketed relationship builder and incremental adds; compare with all pairs on small inputs"""
+    from cosmic_graph import RelationshipIndex, build_relationships
+
+    test_nodes = relationship_test_nodes(nodes, dimensions, categories, seed)
+    start = time.perf_counter()
+    relationships = build_relationships(test_nodes)
+    build_time = time.perf_counter() - start
+
+    pairwise_time = matches = None
+    if nodes <= verify_limit:
+        start = time.perf_counter()
+        reference = pairwise_relationships(test_nodes)
+        pairwise_time = time.perf_counter() - start
+        matches = reference == relationships
+    connection_count = sum(len(connections) for connections in relationships)
+
+    # Add nodes one by one to the built graph; each add should cost its neighbours, not the graph
+    for node, connections in zip(test_nodes, relationships):
+        node["connections"] = connections
+    index = RelationshipIndex.from_nodes(test_nodes)
+    new_nodes = relationship_test_nodes(added, dimensions, categories, seed + 1)
+    linked = 0
+    start = time.perf_counter()
+    for i, node in enumerate(new_nodes):
+        node["id"] = f"ADDED-{i + 1}"
+        linked += len(index.add(node))
+    add_time = time.perf_counter() - start
+    for node in test_nodes:
+        del node["connections"]
+
+    stats = {
+        "nodes": nodes,
+        "connections": connection_count,
+        "build_s": build_time,
+        "add_us": add_time / added * 1e6,
+        "add_neighbors": linked / added,
+        "pairwise_s": pairwise_time,
+        "matches": matches
+    }
+    return stats
+
+
+def benchmark_startup(nodes=10000, dimensions=2000, categories=500, seed=0):
+    """CosmicCube start-up with a persisted knowledge base: first run indexes it, later runs load the index"""
+    import tracemalloc
+
+    import pygame
+
+    knowledge = relationship_test_nodes(nodes, dimensions, categories, seed)
+    previous_dir = os.getcwd()
+    results = {"nodes": nodes}
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            node_dir = os.path.join("cosmic_foundations", "knowledge_nodes")
+            os.makedirs(node_dir)
+            for node in knowledge:
+                node.update(content="x" * 400, symbols=["*", "+", "#"], connections=[])
+                with open(os.path.join(node_dir, f"{node['id']}.json"), 'w', encoding='utf-8') as f:
+                    json.dump(node, f, ensure_ascii=False, indent=2)
+
+            for run in ("first", "indexed"):
+                start = time.perf_counter()
+                app = create_headless_app("cube")
+                results[f"{run}_s"] = time.perf_counter() - start
+                results["bodies_loaded"] = sum(1 for node in app.knowledge_nodes if node.get("body_loaded"))
+                pygame.quit()
+
+            # Memory is traced in a separate start so tracing does not inflate the timings
+            tracemalloc.start()
+            create_headless_app("cube")
+            results["indexed_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+            pygame.quit()
+        finally:
+            os.chdir(previous_dir)
+    return results
+
+
+def benchmark_rotation(frames=20000, speed=0.005):
+    """Per-frame camera rotation work (auto-rotate step, interpolation, matrix): quaternions vs scipy"""
+    import numpy as np
+
+    from cosmic_rotation import Quaternion
+
+    step = Quaternion.from_euler('xyz', [speed, speed * 0.7, speed * 0.5])
+    rotation = Quaternion.identity()
+    start = time.perf_counter()
+    for _ in range(frames):
+        previous, rotation = rotation, (step * rotation).normalized()
+        matrix = previous.slerp(rotation, 0.5).as_matrix()
+    quaternion_time = time.perf_counter() - start
+    results = {"frames": frames, "quaternion_us": quaternion_time / frames * 1e6, "scipy_us": None}
+
+    # scipy is optional; compare against it only where it is installed
+    try:
+        from scipy.spatial.transform import Rotation
+    except ImportError:
+        return results
+    reference = Rotation.identity()
+    start = time.perf_counter()
+    for _ in range(frames):
+        previous = reference
+        reference = Rotation.from_euler('xyz', [speed, speed * 0.7, speed * 0.5]) * reference
+        delta = reference * previous.inv()
+        reference_matrix = (Rotation.from_rotvec(delta.as_rotvec() * 0.5) * previous).as_matrix()
+    results["scipy_us"] = (time.perf_counter() - start) / frames * 1e6
+    results["matches"] = bool(np.allclose(matrix, reference_matrix, atol=1e-9))
+    return results
+
+
+def benchmark_security_startup(founder="behicof", foundation_date="2025-04-17 14:59:15", runs=5):
+    """CosmicSecuritySystem construction: first setup (derives every key) vs an initialized installation"""
+    from cosmic_security import CosmicSecuritySystem
+
+    previous_dir = os.getcwd()
+    results = {"cores": os.cpu_count()}
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            # The system reports its setup on stdout; keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                CosmicSecuritySystem(founder, foundation_date)
+                results["first_setup_s"] = time.perf_counter() - start
+
+                cached = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    CosmicSecuritySystem(founder, foundation_date)
+                    cached.append(time.perf_counter() - start)
+                results["cached_ms"] = min(cached) * 1000
+
+                start = time.perf_counter()
+                system = CosmicSecuritySystem(founder, foundation_date, rotate_keys=True)
+                results["rotation_s"] = time.perf_counter() - start
+
+                # Derivation of all eight keys, one after another vs fanned out over threads
+                for label, workers in (("sequential_s", 1), ("parallel_s", None)):
+                    start = time.perf_counter()
+                    system.generate_encryption_keys(workers=workers)
+                    results[label] = time.perf_counter() - start
+        finally:
+            os.chdir(previous_dir)
+    return results
+
+
+def benchmark_ciphers(payloads=5000, size=64, layer="master"):
+    """encrypt_data/decrypt_data throughput on small payloads: cipher registry vs a new Fernet per call"""
+    from cosmic_security import CosmicSecuritySystem
+
+    previous_dir = os.getcwd()
+    data = [{"id": i, "content": "x" * size} for i in range(payloads)]
+    results = {"payloads": payloads, "size": size}
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                system = CosmicSecuritySystem("behicof", "2025-04-17 14:59:15")
+
+            for label, reuse in (("per_call", False), ("registry", True)):
+                start = time.perf_counter()
+                packages = []
+                for item in data:
+                    if not reuse:
+                        # What every call paid before: building the cipher from the key
+                        system.ciphers.clear()
+                    packages.append(system.encrypt_data(item, layer))
+                encrypt_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for package in packages:
+                    if not reuse:
+                        system.ciphers.clear()
+                    system.decrypt_data(package)
+                decrypt_time = time.perf_counter() - start
+                results[f"{label}_encrypt_per_s"] = payloads / encrypt_time
+                results[f"{label}_decrypt_per_s"] = payloads / decrypt_time
+
+            # The same packages in the old envelope (token base64-encoded a second time)
+            legacy = []
+            for package in packages:
+                package = dict(package, encrypted_data=base64.b64encode(package["encrypted_data"].encode()).decode())
+                del package["envelope_version"]
+                legacy.append(package)
+            start = time.perf_counter()
+            for package in legacy:
+                system.decrypt_data(package)
+            results["legacy_decrypt_per_s"] = payloads / (time.perf_counter() - start)
+            results["envelope_bytes"] = sum(len(json.dumps(package)) for package in packages) / payloads
+            results["legacy_envelope_bytes"] = sum(len(json.dumps(package)) for package in legacy) / payloads
+        finally:
+            os.chdir(previous_dir)
+    return results
+
+
+def backup_nodes(count, seed=0):
+    """Knowledge nodes shaped like the library's, spread over the security layers"""
+    rng = random.Random(seed)
+    dimensions = ("consciousness", "frequency", "temporal", "spatial", "energetic", "information")
+    return [
+        {
+            "id": f"node-{i}",
+            "title": f"Knowledge {i}",
+            "dimension": rng.choice(dimensions),
+            "content": "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(rng.randint(40, 200))),
+            "frequency": rng.uniform(1, 1000)
+        }
+        for i in range(count)
+    ]
+
+
+def benchmark_backup(nodes=20000, seed=0):
+    """backup_knowledge throughput: calling process vs worker pool, one file per node vs packed archive"""
+    from cosmic_security import CosmicSecuritySystem
+
+    knowledge = backup_nodes(nodes, seed)
+    previous_dir = os.getcwd()
+    results = {"nodes": nodes, "cores": os.cpu_count()}
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                system = CosmicSecuritySystem("behicof", "2025-04-17 14:59:15")
+            backups_dir = os.path.join(system.security_path, "backups")
+            for label, workers, packed in (("sequential", 1, False), ("pool", None, False), ("packed", None, True)):
+                # Backups are named by the second they start in; start each run from an empty folder
+                shutil.rmtree(backups_dir, ignore_errors=True)
+                start = time.perf_counter()
+                backup = system.backup_knowledge(knowledge, workers=workers, packed=packed)
+                elapsed = time.perf_counter() - start
+                results[f"{label}_s"] = elapsed
+                results[f"{label}_nodes_per_s"] = nodes / elapsed
+                results[f"{label}_files"] = len(os.listdir(backup["backup_location"]))
+
+                # Restore (decrypt and verify the checksum) right after each layout's backup
+                if label != "sequential":
+                    start = time.perf_counter()
+                    restored = system.restore_knowledge(backup["backup_time"], {"success": True, "access_level": 9})
+                    results[f"{label}_restore_s"] = time.perf_counter() - start
+                    results[f"{label}_restored"] = len(restored.get("restored_nodes", []))
+                    results[f"{label}_verified"] = restored["success"]
+
+            # Hourly-style follow-up on top of the packed backup: 1% of the nodes changed
+            changed = [dict(node) for node in knowledge]
+            for node in changed[::100]:
+                node["content"] += " (revised)"
+            start = time.perf_counter()
+            backup = system.backup_knowledge(changed, packed=True, incremental=True)
+            results["incremental_s"] = time.perf_counter() - start
+            results["incremental_stored"] = backup["stored_count"]
+            start = time.perf_counter()
+            restored = system.restore_knowledge(backup["backup_time"], {"success": True, "access_level": 9})
+            results["incremental_restore_s"] = time.perf_counter() - start
+            results["incremental_verified"] = restored["success"]
+        finally:
+            os.chdir(previous_dir)
+    return results
+
+
+def benchmark_backup_checksum(nodes=50000, seed=0):
+    """Backup checksum: sha256 of the whole JSON node list vs the streaming Merkle root, time and peak memory"""
+    import hashlib
+    import tracemalloc
+    from cosmic_merkle import MerkleTree
+    from cosmic_security import CosmicSecuritySystem
+
+    knowledge = backup_nodes(nodes, seed)
+    # Only the checksum helpers are needed, not a configured installation on disk
+    system = CosmicSecuritySystem.__new__(CosmicSecuritySystem)
+    variants = (
+        ("whole_list", lambda: hashlib.sha256(json.dumps(knowledge, sort_keys=True).encode("utf-8")).hexdigest()),
+        ("merkle", lambda: system.generate_backup_checksum(knowledge)),
+    )
+    results = {"nodes": nodes}
+    for label, checksum in variants:
+        start = time.perf_counter()
+        checksum()
+        results[f"{label}_ms"] = (time.perf_counter() - start) * 1000
+        # Separate pass: tracemalloc slows every allocation down
+        tracemalloc.start()
+        checksum()
+        results[f"{label}_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    # Verifying one node against the stored leaves vs re-hashing the whole list
+    leaves = [system.node_hash(node) for node in knowledge]
+    start = time.perf_counter()
+    MerkleTree.root_of(leaves)
+    results["root_from_leaves_ms"] = (time.perf_counter() - start) * 1000
+    return results
+
+
+def measure_import(module, runs=3):
+    """Best-of-runs import cost of a module in a fresh interpreter, and the heavy modules it loaded"""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_dir, os.environ.get("PYTHONPATH")])))
+    # Modules handed out by cosmic_lazy.lazy_import stay _LazyModule until first used
+    probe = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} "
+        f"if m in sys.modules and type(sys.modules[m]).__name__ != '_LazyModule'))"
+    )
+    import_times, process_times = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", probe],
+            capture_output=True, text=True, env=env, check=True
+        )
+        process_times.append(time.perf_counter() - start)
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                import_times.append(int(fields[1].split(":")[-1]) / 1000)
+    # The probe's answer is the last line; modules like pygame print a banner before it
+    loaded = (result.stdout.strip().splitlines() or [""])[-1]
+    return {
+        "module": module,
+        "import_ms": min(import_times),
+        "process_ms": min(process_times) * 1000,
+        "heavy": [name for name in loaded.split(",") if name]
+    }
+
+
+def benchmark_imports(modules=None, runs=3):
+    """Import time of each batch entry point against its budget in IMPORT_BUDGETS_MS"""
+    results = []
+    for module in modules or IMPORT_BUDGETS_MS:
+        stats = measure_import(module, runs)
+        stats["budget_ms"] = IMPORT_BUDGETS_MS.get(module)
+        stats["ok"] = stats["budget_ms"] is None or stats["import_ms"] <= stats["budget_ms"]
+        results.append(stats)
+    return results
+
+
+def print_present_results(results):
+    print(f"{'screen':<18}{'mode':<7}{'mean ms':>9}{'p95 ms':>9}{'updated':>9}")
+    for (name, mode), stats in results.items():
+        print(
+            f"{name:<18}{mode:<7}{stats['mean_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+            f"{stats['updated_fraction']:>8.0%}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cosmic Cube performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    present = subparsers.add_parser("present", help="full flip vs dirty-rectangle frame times")
+    present.add_argument("--frames", type=int, default=300)
+    present.add_argument("--app", action="append", choices=PRESENT_APPS)
+
+    headless = subparsers.add_parser("headless", help="render N frames off-screen and report frame times")
+    headless.add_argument("--app", choices=HEADLESS_APPS, default="cube")
+    headless.add_argument("--frames", type=int, default=600)
+    headless.add_argument("--seed", type=int, default=0)
+    headless.add_argument("--output", help="write the statistics (with per-frame timings) as JSON")
+    headless.add_argument("--trace", help="write the profiled frames as a Chrome trace")
+
+    picking = subparsers.add_parser("picking", help="node hit-testing: linear scan vs spatial index")
+    picking.add_argument("--nodes", type=int, default=5000)
+    picking.add_argument("--queries", type=int, default=2000)
+    picking.add_argument("--seed", type=int, default=0)
+
+    graph = subparsers.add_parser("graph", help="knowledge-graph edge lookup, traversal and rendering")
+    graph.add_argument("--nodes", type=int, default=10000)
+    graph.add_argument("--edges", type=int, default=100000)
+    graph.add_argument("--seed", type=int, default=0)
+
+    relationships = subparsers.add_parser("relationships", help="knowledge relationship builder scaling")
+    relationships.add_argument("--nodes", type=int, default=100000)
+    relationships.add_argument("--dimensions", type=int, default=2000,
+                               help="distinct dimensions (same-dimension pairs always connect)")
+    relationships.add_argument("--categories", type=int, default=500)
+    relationships.add_argument("--seed", type=int, default=0)
+
+    startup = subparsers.add_parser("startup", help="cube start-up time with a persisted knowledge base")
+    startup.add_argument("--nodes", type=int, default=10000)
+    startup.add_argument("--seed", type=int, default=0)
+
+    rotation = subparsers.add_parser("rotation", help="per-frame cube rotation cost, quaternions vs scipy")
+    rotation.add_argument("--frames", type=int, default=20000)
+
+    imports = subparsers.add_parser("imports", help="python -X importtime of batch entry points vs budget")
+    imports.add_argument("--module", action="append", help="module to measure (default: all budgeted)")
+    imports.add_argument("--runs", type=int, default=3)
+
+    subparsers.add_parser("security", help="CosmicSecuritySystem start-up: first setup vs stored keys")
+
+    ciphers = subparsers.add_parser("ciphers", help="encrypt/decrypt throughput for many small payloads")
+    ciphers.add_argument("--payloads", type=int, default=5000)
+    ciphers.add_argument("--size", type=int, default=64, help="payload content length")
+
+    backup = subparsers.add_parser("backup", help="encrypted knowledge backup throughput")
+    backup.add_argument("--nodes", type=int, default=20000)
+    backup.add_argument("--seed", type=int, default=0)
+
+    checksum = subparsers.add_parser("checksum", help="backup checksum: whole-list hash vs streaming Merkle root")
+    checksum.add_argument("--nodes", type=int, default=50000)
+    checksum.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "present":
+        print_present_results(benchmark_present_modes(args.frames, args.app))
+    elif args.command == "headless":
+        stats = benchmark_headless(args.app, args.frames, args.seed, trace_path=args.trace)
+        print(
+            f"{stats['app']}: {stats['frames']} frames, mean {stats['mean_ms']:.2f} ms, "
+            f"p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms"
+        )
+        phases = sorted(stats["phases_ms"].items(), key=lambda item: item[1], reverse=True)
+        for phase, ms in phases[:5]:
+            print(f"  {phase:<26}{ms:>8.3f} ms")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2)
+    elif args.command == "graph":
+        stats = benchmark_graph(args.nodes, args.edges, args.seed)
+        print(
+            f"{stats['nodes']} nodes, {stats['edges']} edges: build {stats['build_ms']:.1f} ms\n"
+            f"  edge endpoints, list scan (extrapolated) {stats['scan_lookup_ms']:.0f} ms\n"
+            f"  edge endpoints, CSR arrays              {stats['csr_lookup_ms']:.1f} ms\n"
+            f"  2-hop neighborhood ({stats['two_hop_nodes']} nodes) {stats['two_hop_ms']:.2f} ms\n"
+            f"  render_knowledge_nodes, LOD             {stats['render_ms']:.1f} ms\n"
+            f"  render_knowledge_nodes, full detail     {stats['full_render_ms']:.0f} ms\n"
+            f"  edges, one line per directed edge       {stats['per_edge_ms']:.0f} ms\n"
+            f"  edges, grouped, one per node pair       {stats['edge_ms']:.0f} ms\n"
+            f"  edges, cached layer, nothing moved     {stats['cached_edge_ms']:.1f} ms"
+        )
+    elif args.command == "relationships":
+        stats = benchmark_relationships(args.nodes, args.dimensions, args.categories, args.seed)
+        line = f"{stats['nodes']} nodes, {stats['connections']} connections: {stats['build_s']:.2f} s"
+        if stats["pairwise_s"] is not None:
+            line += f" (all pairs {stats['pairwise_s']:.2f} s, identical: {stats['matches']})"
+        print(line)
+        print(f"  add one node: {stats['add_us']:.0f} us ({stats['add_neighbors']:.1f} neighbours on average)")
+    elif args.command == "startup":
+        stats = benchmark_startup(args.nodes, seed=args.seed)
+        print(
+            f"{stats['nodes']} stored nodes: first start {stats['first_s']:.2f} s, "
+            f"indexed start {stats['indexed_s']:.2f} s (peak {stats['indexed_peak_mb']:.1f} MB), "
+            f"node bodies in memory: {stats['bodies_loaded']}"
+        )
+    elif args.command == "rotation":
+        stats = benchmark_rotation(args.frames)
+        line = f"{stats['frames']} frames: quaternion {stats['quaternion_us']:.1f} us/frame"
+        if stats["scipy_us"] is not None:
+            line += f", scipy Rotation {stats['scipy_us']:.1f} us/frame (same matrix: {stats['matches']})"
+        print(line)
+    elif args.command == "imports":
+        results = benchmark_imports(args.module, args.runs)
+        print(f"{'module':<28}{'import ms':>10}{'budget':>8}{'process ms':>12}  heavy modules loaded")
+        for stats in results:
+            budget = "-" if stats["budget_ms"] is None else f"{stats['budget_ms']}"
+            flag = "" if stats["ok"] else "  OVER BUDGET"
+            print(
+                f"{stats['module']:<28}{stats['import_ms']:>10.1f}{budget:>8}{stats['process_ms']:>12.1f}"
+                f"  {', '.join(stats['heavy']) or '-'}{flag}"
+            )
+        if not all(stats["ok"] for stats in results):
+            sys.exit(1)
+    elif args.command == "security":
+        stats = benchmark_security_startup()
+        print(
+            f"first setup {stats['first_setup_s'] * 1000:.0f} ms, "
+            f"initialized installation {stats['cached_ms']:.1f} ms, "
+            f"with key rotation {stats['rotation_s'] * 1000:.0f} ms\n"
+            f"  key derivation: sequential {stats['sequential_s'] * 1000:.0f} ms, "
+            f"parallel {stats['parallel_s'] * 1000:.0f} ms ({stats['cores']} cores)"
+        )
+    elif args.command == "backup":
+        stats = benchmark_backup(args.nodes, args.seed)
+        print(f"backup of {stats['nodes']} nodes ({stats['cores']} cores):")
+        for label in ("sequential", "pool", "packed"):
+            print(
+                f"  {label:<10} {stats[label + '_s']:.2f} s ({stats[label + '_nodes_per_s']:.0f} nodes/s, "
+                f"{stats[label + '_files']} files)"
+            )
+        for label, title in (("pool", "files"), ("packed", "packed")):
+            print(
+                f"  restore {title:<7} {stats[label + '_restore_s']:.2f} s "
+                f"({stats[label + '_restored']} nodes, "
+                f"{'checksum verified' if stats[label + '_verified'] else 'FAILED'})"
+            )
+        print(
+            f"  incremental backup after 1% changes {stats['incremental_s']:.2f} s "
+            f"({stats['incremental_stored']} nodes stored), restore {stats['incremental_restore_s']:.2f} s "
+            f"({'checksum verified' if stats['incremental_verified'] else 'FAILED'})"
+        )
+    elif args.command == "checksum":
+        stats = benchmark_backup_checksum(args.nodes, args.seed)
+        print(f"checksum of {stats['nodes']} nodes:")
+        for label, title in (("whole_list", "whole-list sha256"), ("merkle", "streaming Merkle")):
+            print(f"  {title:<18} {stats[label + '_ms']:8.1f} ms, peak {stats[label + '_peak_mb']:.1f} MB")
+        print(f"  root from stored leaf hashes {stats['root_from_leaves_ms']:.1f} ms")
+    elif args.command == "ciphers":
+        stats = benchmark_ciphers(args.payloads, args.size)
+        print(f"{stats['payloads']} payloads of ~{stats['size']} bytes (operations per second):")
+        for label, title in (("per_call", "new Fernet per call"), ("registry", "cipher registry")):
+            print(
+                f"  {title:<20} encrypt {stats[label + '_encrypt_per_s']:>9.0f}  "
+                f"decrypt {stats[label + '_decrypt_per_s']:>9.0f}"
+            )
+        print(f"  {'legacy envelope':<20} {'':>17}  decrypt {stats['legacy_decrypt_per_s']:>9.0f}")
+        print(
+            f"envelope size: {stats['envelope_bytes']:.0f} bytes "
+            f"(legacy double base64 {stats['legacy_envelope_bytes']:.0f} bytes)"
+        )
+    elif args.command == "picking":
+        stats = benchmark_picking(args.nodes, args.queries, seed=args.seed)
+        print(
+            f"{stats['nodes']} nodes: linear {stats['linear_us']:.1f} us/query, "
+            f"index {stats['indexed_us']:.1f} us/query (rebuild {stats['rebuild_ms']:.2f} ms), "
+            f"results match: {stats['matches']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
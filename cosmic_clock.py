@@ -0,0 +1,65 @@
+import time
+
+
+class SimulationClock:
+    """Fixed-timestep simulation time, decoupled from the render rate.
+
+    Real time elapsed between frames is collected in an accumulator and paid
+    out in whole steps of `step` seconds, so the simulation advances the same
+    amount per second at any frame rate. A slow frame runs several steps to
+    catch up (at most max_steps; anything beyond that is dropped so one stall
+    cannot snowball into the next frames). `alpha` is the fraction of a step
+    left over, for drawing between the previous and the current simulation
+    state. With frame_time set, every frame counts exactly that long instead
+    of reading the wall clock, which makes headless runs reproducible.
+    """
+
+    def __init__(self, step=1 / 60, max_steps=8, frame_time=None, time_source=time.perf_counter):
+        self.step = step
+        self.max_steps = max_steps
+        self.frame_time = frame_time
+        self.time_source = time_source
+        self.ticks = 0
+        self.accumulator = 0.0
+        self.dropped = 0.0
+        self.last = None
+
+    @property
+    def time(self):
+        """Simulation seconds after the last completed step"""
+        return self.ticks * self.step
+
+    @property
+    def alpha(self):
+        """Fraction of a step accumulated since the last completed step, in [0, 1)"""
+        return min(max(self.accumulator / self.step, 0.0), 1.0)
+
+    @property
+    def render_time(self):
+        """Simulation time to draw at, between the previous and the last completed step"""
+        return self.time - (1.0 - self.alpha) * self.step
+
+    def hold(self):
+        """Ignore the real time passing until the next advance (paused or minimized window)"""
+        self.last = None
+
+    def elapsed(self):
+        """Seconds of real time since the previous call (0 on the first)"""
+        now = self.time_source()
+        elapsed = 0.0 if self.last is None else now - self.last
+        self.last = now
+        return elapsed
+
+    def advance(self, elapsed=None):
+        """Add one frame of real time (measured when None); returns how many steps to run"""
+        if elapsed is None:
+            elapsed = self.frame_time if self.frame_time is not None else self.elapsed()
+        self.accumulator += max(0.0, elapsed)
+        # The tolerance keeps frame_time == step from landing a hair under one step
+        due = int(self.accumulator / self.step + 1e-9)
+        self.accumulator -= due * self.step
+        if due > self.max_steps:
+            self.dropped += (due - self.max_steps) * self.step
+            due = self.max_steps
+        self.ticks += due
+        return due
@@ -1,14 +1,23 @@
 import pygame
 import numpy as np
+import hashlib
 import json
 import os
-import time
 import math
 import random
+import textwrap
+import zlib
+from collections import OrderedDict
 from datetime import datetime
 import pygame.gfxdraw
-from scipy.spatial.transform import Rotation
 from pygame.locals import *
+from cosmic_graph import KnowledgeGraph, RelationshipIndex, build_relationships
+from cosmic_profiler import FrameProfiler
+from cosmic_rotation import Quaternion
+from cosmic_spatial import ScreenSpatialIndex
+from cosmic_sprites import GlowAtlas
+from cosmic_clock import SimulationClock
+from cosmic_display import DirtyRectTracker, FramePacer, app_options, create_screen, headless_requested, init_pygame
 
 class CosmicCube:
     """
@@ -16,13 +25,22 @@ class CosmicCube:
     یک سیستم چندبُعدی برای تجسم، کاوش و دستکاری دانش کیهانی
     """
     
-    def __init__(self, username="behicof", timestamp=None):
+    def __init__(self, username="behicof", timestamp=None, target_fps=60, idle_fps=10, headless=None,
+                 pause_when_unfocused=None):
         # اطلاعات پایه
         self.username = username
         self.timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.foundation_date = "2025-04-17 14:37:51"
         self.version = "1.0.0"
         
+        # نرخ فریم هدف و نرخ فریم حالت بیکاری
+        self.target_fps = target_fps
+        self.idle_fps = idle_fps
+        self.pause_when_unfocused = pause_when_unfocused
+        
+        # اجرای بدون نمایشگر (درایور dummy و سطح خارج از صفحه)
+        self.headless = headless
+        
         # مسیرها و داده‌ها
         self.data_path = "cosmic_foundations"
         self.ensure_directories()
@@ -56,6 +74,18 @@ class CosmicCube:
         
         # هسته دانش
         self.knowledge_nodes = []
+        # نگاشت شناسه گره به اندیس آن در knowledge_nodes (برای حذف بدون جستجوی لیست)
+        self.knowledge_node_rows = {}
+        # گره‌هایی که بدنه‌شان بارگذاری شده، از کم‌استفاده‌ترین تا تازه‌ترین (LRU)
+        self.materialized_nodes = OrderedDict()
+        self.max_materialized_nodes = 16
+        
+        # گراف ارتباطات گره‌ها (نگاشت شناسه به اندیس و آرایه‌های CSR)
+        self.knowledge_graph = KnowledgeGraph.from_nodes([])
+        self.knowledge_graph_dirty = False
+        
+        # شاخص‌های بُعد، دسته‌بندی و فرکانس برای به‌روزرسانی تدریجی ارتباطات
+        self.relationship_index = RelationshipIndex()
         
         # تاریخچه کاوش
         self.exploration_history = []
@@ -72,6 +102,10 @@ class CosmicCube:
         # شبکه ارتباطی
         self.connection_network = {}
         
+        # فهرست خلاصه گره‌های ذخیره‌شده (index.json) و وضعیت نیاز به ذخیره آن
+        self.knowledge_summaries = {}
+        self.knowledge_index_dirty = False
+        
         # شروع سیستم تجسم
         self.init_visualization()
         
@@ -158,11 +192,18 @@ class CosmicCube:
     
     def init_visualization(self):
         """آماده‌سازی سیستم تجسم"""
-        pygame.init()
+        init_pygame(self.headless)
         self.width, self.height = 1280, 800
-        self.screen = pygame.display.set_mode((self.width, self.height), HWSURFACE | DOUBLEBUF | RESIZABLE)
+        self.screen = create_screen((self.width, self.height), HWSURFACE | DOUBLEBUF | RESIZABLE, self.headless)
         pygame.display.set_caption("مکعب کیهانی - پایه‌گذاری دانش بنیادین")
         
+        # زمان‌بندی تطبیقی فریم‌ها و ارسال فریم به نمایشگر
+        self.pacer = FramePacer(self.target_fps, self.idle_fps, pause_when_unfocused=self.pause_when_unfocused)
+        self.dirty_tracker = DirtyRectTracker(False)
+        
+        # پروفایلر زمان فریم (F3: نمایش، F4: خروجی trace)
+        self.profiler = FrameProfiler()
+        
         # فونت‌ها
         self.fonts = {
             "tiny": pygame.font.SysFont('Arial', 12),
@@ -187,13 +228,41 @@ class CosmicCube:
             'intention': (200, 150, 240),
             'unity': (255, 255, 255),
             'node_core': (150, 100, 255),
-            'node_glow': (100, 150, 255, 100)
+            'node_glow': (100, 150, 255, 100),
+            'accent1': (180, 120, 255),
+            'accent2': (100, 200, 220)
         }
         
         # المان‌های بصری
         self.stars = []
         self.energy_particles = []
-        self.cube_rotation = Rotation.from_euler('xyz', [0, 0, 0])
+        self.cube_rotation = Quaternion.identity()
+        
+        # چرخش گام قبلی شبیه‌سازی و چرخش درون‌یابی‌شده برای رندر
+        self.previous_rotation = self.cube_rotation
+        self.view_rotation = self.cube_rotation
+        
+        # چرخش هر گام کلیدهای جهت‌دار (از پیش محاسبه‌شده، به ترتیب اعمال)
+        rot_amount = 0.02
+        self.key_rotations = (
+            (pygame.K_UP, Quaternion.from_euler('x', -rot_amount)),
+            (pygame.K_DOWN, Quaternion.from_euler('x', rot_amount)),
+            (pygame.K_LEFT, Quaternion.from_euler('y', -rot_amount)),
+            (pygame.K_RIGHT, Quaternion.from_euler('y', rot_amount))
+        )
+        
+        # چرخش خودکار هر گام، کش‌شده تا تغییر rotation_speed
+        self.auto_rotation = None
+        self.auto_rotation_speed = None
+        
+        # ماتریس چرخش کش‌شده؛ تا زمانی که view_rotation عوض نشده دوباره محاسبه نمی‌شود
+        self.rotation_matrix = None
+        self.rotation_matrix_source = None
+        
+        # نتایج پروجکشن دسته‌ای هر فریم
+        self.cube_screen_points = np.zeros((8, 2))
+        self.node_screen_positions = np.zeros((0, 2))
+        self.particle_projection = None
         self.cube_vertices = np.array([
             [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
             [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]
@@ -204,6 +273,9 @@ class CosmicCube:
             (0, 4), (1, 5), (2, 6), (3, 7)
         ]
         
+        # اطلس اسپرایت‌های هاله از پیش رندرشده (ترکیب جمعی به جای سه دایره در هر فریم)
+        self.glow_atlas = GlowAtlas()
+        
         # ایجاد ستاره‌ها و ذرات انرژی
         self.create_stars(500)
         self.create_energy_particles(100)
@@ -213,10 +285,37 @@ class CosmicCube:
         self.mouse_pos = (0, 0)
         self.mouse_pressed = False
         
+        # شاخص فضایی موقعیت‌های صفحه گره‌ها برای انتخاب با ماوس
+        self.node_index = ScreenSpatialIndex(cell_size=32)
+        self.node_pick_radius = 15
+        self.hovered_node = None
+        
+        # همسایه‌های گره انتخاب‌شده در گراف دانش
+        self.focus_neighbors = set()
+        
+        # سطح جزئیات (LOD) برای گراف‌های بزرگ
+        self.lod_full_detail_nodes = 64   # تا این تعداد گره همه با جزئیات کامل رندر می‌شوند
+        self.lod_cluster_px = 6           # اندازه خانه شبکه برای خوشه‌بندی گره‌های هم‌پوشان
+        self.lod_pixel_px = 8             # گره‌های کوچک‌تر از این اندازه یک پیکسل می‌شوند
+        self.lod_edge_strength = 0.7      # حداقل قدرت یال در بزرگنمایی پیش‌فرض
+        self.lod_max_edges = 3000         # سقف تعداد یال‌های رندرشده در هر فریم
+        self.edge_color_levels = 16       # تعداد سطوح رنگ یال‌ها (برای گروه‌بندی رسم)
+        self.edge_styles = {}             # کش رنگ و ضخامت هر گروه یال
+        self.edge_layer = None            # لایه کش‌شده ارتباطات (SRCALPHA)
+        self.edge_layer_key = None        # ورودی‌هایی که لایه با آن‌ها رسم شده است
+        
         # متغیرهای انیمیشن
         self.animation_time = 0
         self.auto_rotate = True
-        self.rotation_speed = 0.005
+        self.rotation_speed = 0.005       # رادیان در هر گام شبیه‌سازی
+        self.idle_rotation_speed = 0.01   # تا این سرعت چرخش خودکار مانع کاهش نرخ فریم نمی‌شود
+        
+        # ساعت شبیه‌سازی با گام ثابت ۱/۶۰ ثانیه، مستقل از نرخ رندر؛
+        # بدون نمایشگر هر فریم دقیقاً یک گام است تا اجراها تکرارپذیر باشند
+        self.simulation = SimulationClock(
+            step=1 / 60, frame_time=1 / 60 if headless_requested(self.headless) else None
+        )
+        self.particle_alpha = 0.0
         
         # زاویه دید و فاصله
         self.view_distance = 5.0
@@ -268,6 +367,7 @@ class CosmicCube:
             ])
             self.energy_particles.append({
                 'pos': (x, y, z),
+                'prev_pos': (x, y, z),
                 'size': size,
                 'color': color_choice,
                 'speed': speed,
@@ -345,92 +445,308 @@ class CosmicCube:
             }
         ]
         
-        # افزودن دانش به سیستم
-        for template in knowledge_templates:
+        # گره‌های ذخیره‌شده فقط از طریق فایل فهرست بارگذاری می‌شوند (بدون خواندن بدنه‌ها)
+        self.knowledge_summaries = self.load_knowledge_index()
+        
+        # افزودن دانش به سیستم؛ گره‌های بدون تغییر دوباره نوشته نمی‌شوند
+        for i, template in enumerate(knowledge_templates):
             node = template.copy()
-            node["id"] = f"FOUNDATION-{len(self.knowledge_nodes)+1}"
+            node["id"] = f"FOUNDATION-{i+1}"
             node["created_by"] = self.username
             node["creation_date"] = self.timestamp
             node["energy_level"] = 1.0
             node["stability"] = 1.0
-            node["connections"] = []
             
-            # افزودن به گره‌های دانش
-            self.knowledge_nodes.append(node)
+            # گره موجود تاریخ و سازنده اصلی خود را حفظ می‌کند
+            existing = self.knowledge_summaries.get(node["id"])
+            if existing:
+                node["created_by"] = existing.get("created_by", node["created_by"])
+                node["creation_date"] = existing.get("creation_date", node["creation_date"])
             
             # ذخیره به عنوان فایل
-            node_path = os.path.join(self.data_path, "knowledge_nodes", f"{node['id']}.json")
-            with open(node_path, 'w', encoding='utf-8') as f:
-                json.dump(node, f, ensure_ascii=False, indent=2)
+            self.save_knowledge_node(node)
+        
+        # گره‌های دانش از خلاصه‌ها ساخته می‌شوند؛ بدنه هنگام انتخاب بارگذاری می‌شود
+        self.knowledge_nodes = [self.node_from_summary(summary) for summary in self.knowledge_summaries.values()]
+        self.knowledge_node_rows = {node["id"]: i for i, node in enumerate(self.knowledge_nodes)}
+        self.materialized_nodes.clear()
+        self.flush_knowledge_index()
         
         # ایجاد روابط بین گره‌ها
         self.build_knowledge_relationships()
     
     def build_knowledge_relationships(self):
         """ایجاد روابط بین گره‌های دانشی"""
-        # برای هر گره، ارتباط با سایر گره‌ها را بررسی می‌کنیم
-        for i, node in enumerate(self.knowledge_nodes):
-            node_dimension = node.get("dimension")
-            
-            for j, other_node in enumerate(self.knowledge_nodes):
-                if i != j:  # گره با خودش ارتباط نمی‌گیرد
-                    other_dimension = other_node.get("dimension")
-                    
-                    # محاسبه قدرت ارتباط بر اساس ابعاد و فرکانس‌ها
-                    connection_strength = 0.0
-                    
-                    # ارتباط بر اساس بُعد
-                    if node_dimension == other_dimension:
-                        connection_strength += 0.5
-                    
-                    # ارتباط بر اساس فرکانس
-                    node_freq = node.get("frequency", 0)
-                    other_freq = other_node.get("frequency", 0)
-                    
-                    if node_freq > 0 and other_freq > 0:
-                        freq_ratio = min(node_freq, other_freq) / max(node_freq, other_freq)
-                        
-                        # فرکانس‌های هارمونیک قوی‌تر متصل می‌شوند
-                        if abs(freq_ratio - 1.0) < 0.01:  # فرکانس‌های مشابه
-                            connection_strength += 0.3
-                        elif abs(freq_ratio - 0.5) < 0.01 or abs(freq_ratio - 2.0) < 0.01:  # اکتاو‌ها
-                            connection_strength += 0.2
-                        elif abs(freq_ratio - 0.66) < 0.01 or abs(freq_ratio - 1.5) < 0.01:  # پنجم‌های کامل
-                            connection_strength += 0.15
-                    
-                    # ارتباط بر اساس دسته‌بندی
-                    if node.get("category") == other_node.get("category"):
-                        connection_strength += 0.3
-                    
-                    # اگر قدرت ارتباط از آستانه بالاتر است، ارتباط ایجاد می‌کنیم
-                    if connection_strength > 0.3:
-                        connection = {
-                            "target_id": other_node["id"],
-                            "strength": connection_strength,
-                            "type": "harmonic" if node_dimension == other_dimension else "complementary",
-                            "active": True
-                        }
-                        
-                        # اضافه کردن به لیست ارتباطات این گره
-                        if "connections" not in node:
-                            node["connections"] = []
-                        node["connections"].append(connection)
+        # گره‌ها بر اساس بُعد و دسته‌بندی گروه‌بندی می‌شوند و شرکای هارمونیک با
+        # جستجوی بازه‌ای روی فرکانس‌های مرتب پیدا می‌شوند (بدون مقایسه همه جفت‌ها)
+        relationships = build_relationships(self.knowledge_nodes)
+        
+        for node, connections in zip(self.knowledge_nodes, relationships):
+            # اضافه کردن به لیست ارتباطات این گره
+            if "connections" not in node:
+                node["connections"] = []
+            node["connections"].extend(connections)
+        
+        # بازسازی گراف ارتباطات برای رندر، انتخاب و پیمایش
+        self.knowledge_graph = KnowledgeGraph.from_nodes(self.knowledge_nodes)
+        self.knowledge_graph_dirty = False
+        
+        # شاخص‌ها برای افزودن، ویرایش و حذف بعدی گره‌ها
+        self.relationship_index = RelationshipIndex.from_nodes(self.knowledge_nodes)
+    
+    def get_knowledge_graph(self):
+        """گراف ارتباطات؛ پس از تغییر گره‌ها یک بار (در فریم بعد) بازسازی می‌شود"""
+        if self.knowledge_graph_dirty:
+            self.knowledge_graph = KnowledgeGraph.from_nodes(self.knowledge_nodes)
+            self.knowledge_graph_dirty = False
+        return self.knowledge_graph
+    
+    # فیلدهای خلاصه گره که در index.json نگه‌داری می‌شوند؛ بقیه (محتوا، نمادها، ...) بدنه گره هستند
+    NODE_SUMMARY_FIELDS = (
+        "id", "name", "category", "dimension", "frequency",
+        "energy_level", "stability", "created_by", "creation_date"
+    )
+    
+    # فیلدهای زمان اجرا که ذخیره نمی‌شوند
+    NODE_RUNTIME_FIELDS = ("connections", "screen_pos", "render_pos", "primary_symbol", "hash", "body_loaded")
+    
+    def knowledge_node_path(self, node_id):
+        return os.path.join(self.data_path, "knowledge_nodes", f"{node_id}.json")
+    
+    def knowledge_index_path(self):
+        return os.path.join(self.data_path, "knowledge_nodes", "index.json")
+    
+    def summarize_knowledge_node(self, data, node_hash):
+        """خلاصه گره برای فایل فهرست: فیلدهای لازم برای رندر و روابط به همراه نماد اصلی و هش"""
+        summary = {field: data[field] for field in self.NODE_SUMMARY_FIELDS if field in data}
+        symbols = data.get("symbols") or []
+        summary["primary_symbol"] = symbols[0] if symbols else None
+        summary["hash"] = node_hash
+        return summary
+    
+    def load_knowledge_index(self):
+        """بارگذاری فایل فهرست گره‌ها و هماهنگ‌سازی آن با فایل‌های موجود در دایرکتوری"""
+        summaries = {}
+        index_path = self.knowledge_index_path()
+        index_time = 0
+        if os.path.exists(index_path):
+            try:
+                index_time = os.path.getmtime(index_path)
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    summaries = {summary["id"]: summary for summary in json.load(f).get("nodes", [])}
+            except (OSError, ValueError, KeyError) as e:
+                print(f"فایل فهرست گره‌ها قابل خواندن نیست و بازسازی می‌شود: {e}")
+                summaries = {}
+        
+        # فقط ورودی‌های دایرکتوری بررسی می‌شوند؛ فایل‌های جدید یا تغییرکرده پس از آخرین
+        # ذخیره فهرست یک بار خوانده و در فهرست به‌روزرسانی می‌شوند
+        file_ids = set()
+        stale_ids = {}
+        with os.scandir(os.path.join(self.data_path, "knowledge_nodes")) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or entry.name == "index.json":
+                    continue
+                node_id = entry.name[:-len(".json")]
+                file_ids.add(node_id)
+                mtime = entry.stat().st_mtime
+                if node_id not in summaries or mtime > index_time:
+                    stale_ids[node_id] = mtime
+        
+        for node_id in list(summaries):
+            if node_id not in file_ids:
+                del summaries[node_id]
+                self.knowledge_index_dirty = True
+        # گره‌های موجود جای خود را در فهرست حفظ می‌کنند و گره‌های جدید به ترتیب زمان نوشتن اضافه می‌شوند
+        # (ترتیب رشته‌ای شناسه‌ها node_10 را پیش از node_9 می‌گذاشت)
+        for node_id in sorted(stale_ids, key=stale_ids.get):
+            try:
+                with open(self.knowledge_node_path(node_id), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"خطا در خواندن گره {node_id}: {e}")
+                continue
+            data = {key: value for key, value in data.items() if key not in self.NODE_RUNTIME_FIELDS}
+            data["id"] = node_id
+            summaries[node_id] = self.summarize_knowledge_node(data, self.hash_knowledge_data(data))
+            self.knowledge_index_dirty = True
+        return summaries
+    
+    def flush_knowledge_index(self):
+        """نوشتن فایل فهرست در صورت تغییر"""
+        if not self.knowledge_index_dirty:
+            return
+        with open(self.knowledge_index_path(), 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "nodes": list(self.knowledge_summaries.values())}, f, ensure_ascii=False)
+        self.knowledge_index_dirty = False
+    
+    def hash_knowledge_data(self, data):
+        encoded = json.dumps(data, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+    
+    def node_from_summary(self, summary):
+        """گره سبک ساخته‌شده از خلاصه (بدون محتوا و نمادها)"""
+        node = dict(summary)
+        node["connections"] = []
+        node["body_loaded"] = False
+        return node
+    
+    def materialize_knowledge_node(self, node):
+        """بارگذاری بدنه گره (محتوا، نمادها، ...) از فایل آن؛ فقط آخرین گره‌های استفاده‌شده بدنه را نگه می‌دارند"""
+        if not node.get("body_loaded", True):
+            try:
+                with open(self.knowledge_node_path(node["id"]), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"خطا در بارگذاری گره {node['id']}: {e}")
+                return node
+            for key, value in data.items():
+                if key not in self.NODE_RUNTIME_FIELDS and key not in self.NODE_SUMMARY_FIELDS:
+                    node[key] = value
+            node["body_loaded"] = True
+        
+        self.materialized_nodes[node["id"]] = node
+        self.materialized_nodes.move_to_end(node["id"])
+        self.evict_knowledge_bodies()
+        return node
+    
+    def evict_knowledge_bodies(self):
+        """آزاد کردن بدنه کم‌استفاده‌ترین گره‌ها تا سقف max_materialized_nodes (به‌جز گره انتخاب‌شده)"""
+        focus = self.current_state["focus"]
+        while len(self.materialized_nodes) > max(self.max_materialized_nodes, 2):
+            node_id = next(iter(self.materialized_nodes))
+            if node_id == focus:
+                self.materialized_nodes.move_to_end(node_id)
+                node_id = next(iter(self.materialized_nodes))
+            self.release_knowledge_node(self.materialized_nodes[node_id])
+    
+    def release_knowledge_node(self, node):
+        """آزاد کردن بدنه گره‌ای که دیگر استفاده نمی‌شود"""
+        self.materialized_nodes.pop(node["id"], None)
+        if node.get("body_loaded") is not True or "hash" not in node:
+            return
+        for key in list(node):
+            if key not in self.NODE_RUNTIME_FIELDS and key not in self.NODE_SUMMARY_FIELDS:
+                del node[key]
+        node["body_loaded"] = False
+    
+    def save_knowledge_node(self, node):
+        """ذخیره گره دانش به عنوان فایل؛ اگر محتوای گره تغییری نکرده باشد فایل دوباره نوشته نمی‌شود"""
+        # گره سبک قبل از ذخیره باید بدنه کامل داشته باشد
+        self.materialize_knowledge_node(node)
+        data = {key: value for key, value in node.items() if key not in self.NODE_RUNTIME_FIELDS}
+        node_hash = self.hash_knowledge_data(data)
+        
+        summary = self.knowledge_summaries.get(node["id"])
+        if summary is None or summary.get("hash") != node_hash:
+            # ارتباطات از شاخص‌ها بازسازی می‌شوند و ذخیره نمی‌شوند
+            with open(self.knowledge_node_path(node["id"]), 'w', encoding='utf-8') as f:
+                json.dump(dict(data, connections=[]), f, ensure_ascii=False, indent=2)
+            summary = self.summarize_knowledge_node(data, node_hash)
+            self.knowledge_summaries[node["id"]] = summary
+            self.knowledge_index_dirty = True
+        
+        node["primary_symbol"] = summary["primary_symbol"]
+        node["hash"] = node_hash
+    
+    def add_knowledge_node(self, node):
+        """افزودن گره دانش جدید و ایجاد فقط ارتباطات مربوط به آن (در هر دو جهت)"""
+        node = dict(node)
+        node.setdefault("id", f"KNOWLEDGE-{self.relationship_index.next_order + 1}")
+        node.setdefault("created_by", self.username)
+        node.setdefault("creation_date", self.timestamp)
+        node.setdefault("energy_level", 1.0)
+        node.setdefault("stability", 1.0)
+        node["connections"] = []
+        node["body_loaded"] = True
+        
+        if node["id"] in self.relationship_index:
+            raise ValueError(f"گره دانش {node['id']} از قبل وجود دارد")
+        
+        self.knowledge_node_rows[node["id"]] = len(self.knowledge_nodes)
+        self.knowledge_nodes.append(node)
+        self.save_knowledge_node(node)
+        
+        # فقط گره‌های هم‌بُعد و شرکای هارمونیک هم‌دسته بررسی می‌شوند
+        self.relationship_index.add(node)
+        self.knowledge_graph_dirty = True
+        return node
+    
+    def update_knowledge_node(self, node_id, changes):
+        """ویرایش گره دانش؛ ارتباطات فقط در صورت تغییر بُعد، دسته‌بندی یا فرکانس بازسازی می‌شوند"""
+        if node_id not in self.relationship_index:
+            raise KeyError(node_id)
+        changes = {key: value for key, value in changes.items() if key not in ("id",) + self.NODE_RUNTIME_FIELDS}
+        
+        # بدنه گره پیش از اعمال تغییرات بارگذاری می‌شود تا هنگام ذخیره از دست نرود
+        self.materialize_knowledge_node(self.relationship_index.nodes[node_id])
+        affected = self.relationship_index.update(node_id, changes)
+        self.save_knowledge_node(self.relationship_index.nodes[node_id])
+        if affected:
+            self.knowledge_graph_dirty = True
+        return affected
+    
+    def remove_knowledge_node(self, node_id):
+        """حذف گره دانش به همراه ارتباطات آن در هر دو جهت"""
+        if node_id not in self.relationship_index:
+            raise KeyError(node_id)
+        affected = self.relationship_index.remove(node_id)
+        
+        # گره آخر لیست جای گره حذف‌شده را می‌گیرد (بدون جابه‌جایی بقیه گره‌ها)
+        row = self.knowledge_node_rows.pop(node_id)
+        self.materialized_nodes.pop(node_id, None)
+        last = self.knowledge_nodes.pop()
+        if last["id"] != node_id:
+            self.knowledge_nodes[row] = last
+            self.knowledge_node_rows[last["id"]] = row
+        
+        node_path = self.knowledge_node_path(node_id)
+        if os.path.exists(node_path):
+            os.remove(node_path)
+        if self.knowledge_summaries.pop(node_id, None) is not None:
+            self.knowledge_index_dirty = True
+        
+        # پاک کردن انتخاب و هایلایت مربوط به گره حذف‌شده
+        if self.current_state["focus"] == node_id:
+            self.current_state["focus"] = None
+            self.focus_neighbors = set()
+        if self.hovered_node == node_id:
+            self.hovered_node = None
+        self.focus_neighbors.discard(node_id)
+        
+        self.knowledge_graph_dirty = True
+        return affected
     
     def update(self):
-        """به‌روزرسانی همه المان‌های سیستم"""
-        current_time = time.time()
-        self.animation_time = current_time
+        """به‌روزرسانی همه المان‌های سیستم با گام‌های ثابت ساعت شبیه‌سازی"""
+        for _ in range(self.simulation.advance()):
+            self.simulation_step()
         
-        # به‌روزرسانی ستاره‌ها
+        # رندر بین دو گام آخر درون‌یابی می‌شود تا حرکت در هر نرخ فریمی یکنواخت باشد
+        alpha = self.simulation.alpha
+        current_time = self.animation_time = self.simulation.render_time
+        self.view_rotation = self.interpolate_rotation(alpha)
+        self.particle_alpha = alpha
+        
+        # چشمک زدن ستاره‌ها و نوسان ابعاد تابع زمان‌اند و هر فریم یک بار محاسبه می‌شوند
         for star in self.stars:
-            # چشمک زدن ستاره‌ها
             brightness = 150 + 105 * math.sin(current_time * star['twinkle_rate'] * 10)
             star['color'] = (brightness, brightness, brightness)
         
+        for dim in self.dimensions:
+            # نوسان تدریجی ابعاد (فاز از crc32 نام بُعد؛ hash() رشته‌ها در هر اجرا تصادفی است)
+            self.dimensions[dim] = 0.5 + 0.3 * math.sin(current_time * 0.2 + zlib.crc32(dim.encode()) % 10)
+    
+    def simulation_step(self):
+        """یک گام ثابت شبیه‌سازی: حرکت ذرات انرژی و چرخش مکعب"""
+        self.previous_rotation = self.cube_rotation
+        
+        # چرخش با کلیدهای جهت‌دار نگه‌داشته‌شده
+        self.handle_keyboard_input()
+        
         # به‌روزرسانی ذرات انرژی
         for particle in self.energy_particles:
             # حرکت ذرات
-            x, y, z = particle['pos']
+            x, y, z = particle['prev_pos'] = particle['pos']
             angle_x, angle_y, angle_z = particle['angle']
             speed = particle['speed']
             
@@ -468,7 +784,7 @@ class CosmicCube:
                 y = distance * math.sin(angle_y) * math.sin(angle_x)
                 z = distance * math.cos(angle_y)
                 
-                particle['pos'] = (x, y, z)
+                particle['pos'] = particle['prev_pos'] = (x, y, z)
                 particle['angle'] = (
                     random.uniform(0, math.pi * 2),
                     random.uniform(0, math.pi * 2),
@@ -479,54 +795,141 @@ class CosmicCube:
         
         # چرخش خودکار مکعب
         if self.auto_rotate:
-            rotation = Rotation.from_euler(
-                'xyz', 
+            self.cube_rotation = self.get_auto_rotation() * self.cube_rotation
+        
+        # جلوگیری از انباشت خطای گرد کردن در ضرب‌های پیاپی
+        if self.cube_rotation is not self.previous_rotation:
+            self.cube_rotation = self.cube_rotation.normalized()
+    
+    def get_auto_rotation(self):
+        """چرخش خودکار یک گام شبیه‌سازی (کش‌شده تا تغییر rotation_speed)"""
+        if self.auto_rotation_speed != self.rotation_speed:
+            self.auto_rotation = Quaternion.from_euler(
+                'xyz',
                 [self.rotation_speed, self.rotation_speed * 0.7, self.rotation_speed * 0.5]
             )
-            self.cube_rotation = rotation * self.cube_rotation
-        
-        # به‌روزرسانی ابعاد
-        for dim in self.dimensions:
-            # نوسان تدریجی ابعاد
-            self.dimensions[dim] = 0.5 + 0.3 * math.sin(current_time * 0.2 + hash(dim) % 10)
+            self.auto_rotation_speed = self.rotation_speed
+        return self.auto_rotation
+    
+    def interpolate_rotation(self, alpha):
+        """چرخش بین گام قبلی و گام فعلی شبیه‌سازی (alpha بین ۰ و ۱)"""
+        if self.previous_rotation is self.cube_rotation:
+            return self.cube_rotation
+        return self.previous_rotation.slerp(self.cube_rotation, alpha)
+    
+    def get_rotation_matrix(self):
+        """ماتریس ۳×۳ چرخش نمایش مکعب (کش‌شده تا تغییر view_rotation)"""
+        # هر تغییر چرخش یک شیء Quaternion جدید می‌سازد، پس مقایسه هویت کافی است
+        if self.rotation_matrix_source is not self.view_rotation:
+            self.rotation_matrix = self.view_rotation.as_matrix()
+            self.rotation_matrix_source = self.view_rotation
+        return self.rotation_matrix
+    
+    def project_scene(self):
+        """چرخش و پروجکشن دسته‌ای رئوس مکعب، گره‌های دانش و ذرات انرژی برای این فریم"""
+        center = np.array([self.width // 2, self.height // 2], dtype=float)
+        
+        # موقعیت پایه گره‌ها روی دایره، با نوسان z و تأثیر بُعد هر گره
+        count = len(self.knowledge_nodes)
+        order = np.arange(count)
+        angle = 2 * math.pi * order / max(count, 1)
+        dim_values = np.array(
+            [self.dimensions.get(node.get("dimension", "consciousness"), 0.5) for node in self.knowledge_nodes],
+            dtype=float
+        )
+        node_points = np.column_stack((
+            100 * np.cos(angle) * (1 + 0.5 * dim_values),
+            100 * np.sin(angle) * (1 + 0.5 * dim_values),
+            30 * np.sin(self.animation_time * 0.1 + order * 0.5) * (1 + dim_values)
+        ))
+        
+        # یک ضرب ماتریسی برای رئوس مکعب و همه گره‌ها
+        points = np.concatenate((self.cube_vertices * 150, node_points))
+        rotated = points @ self.get_rotation_matrix().T
+        scale = self.fov / (rotated[:, 2] + self.view_distance + 400)
+        screen = center + rotated[:, :2] * scale[:, None]
+        
+        self.cube_screen_points = screen[:8]
+        self.node_screen_positions = screen[8:]
+        for node, render_pos, screen_pos in zip(
+            self.knowledge_nodes, rotated[8:].tolist(), self.node_screen_positions.tolist()
+        ):
+            node['render_pos'] = tuple(render_pos)
+            node['screen_pos'] = tuple(screen_pos)
+        
+        # ذرات انرژی (بدون چرخش، با پرسپکتیو نزدیک‌تر)، درون‌یابی‌شده بین دو گام آخر
+        if self.energy_particles:
+            positions = np.array([particle['pos'] for particle in self.energy_particles], dtype=float)
+            previous = np.array([particle['prev_pos'] for particle in self.energy_particles], dtype=float)
+            positions = previous + (positions - previous) * self.particle_alpha
+            depth = positions[:, 2] + self.view_distance
+            in_front = depth > 0
+            particle_scale = np.zeros(len(positions))
+            particle_scale[in_front] = self.fov / depth[in_front]
+            particle_screen = center + positions[:, :2] * particle_scale[:, None]
+            visible = in_front & (particle_screen >= 0).all(axis=1) \
+                & (particle_screen[:, 0] < self.width) & (particle_screen[:, 1] < self.height)
+            
+            # ترتیب رندر از دور به نزدیک (مرتب‌سازی پایدار مثل sorted)
+            draw_order = np.argsort(-positions[:, 2], kind='stable')
+            draw_order = draw_order[visible[draw_order]]
+            self.particle_projection = (draw_order, particle_screen, particle_scale)
+        else:
+            self.particle_projection = None
     
     def render(self):
         """رندر تمام المان‌های بصری"""
+        profiler = self.profiler
+        
+        # پروجکشن دسته‌ای صحنه
+        with profiler.phase("project_scene"):
+            self.project_scene()
+        
         # رندر پس‌زمینه
-        self.screen.fill(self.colors['background'])
+        with profiler.phase("render_background"):
+            self.screen.fill(self.colors['background'])
         
         # رندر ستاره‌ها
-        self.render_stars()
+        with profiler.phase("render_stars"):
+            self.render_stars()
         
         # رندر ذرات انرژی
-        self.render_energy_particles()
+        with profiler.phase("render_energy_particles"):
+            self.render_energy_particles()
         
         # رندر مکعب کیهانی
-        self.render_cosmic_cube()
+        with profiler.phase("render_cosmic_cube"):
+            self.render_cosmic_cube()
         
         # رندر گره‌های دانشی
-        self.render_knowledge_nodes()
+        with profiler.phase("render_knowledge_nodes"):
+            self.render_knowledge_nodes()
         
         # رندر رابط کاربری
-        self.render_ui()
-        
-        # نمایش نام کاربر و تاریخ
-        user_text = self.fonts["small"].render(
-            f"کاربر: {self.username} | تاریخ: {self.timestamp}", 
-            True, self.colors['text']
-        )
-        self.screen.blit(user_text, (10, self.height - 30))
+        with profiler.phase("render_ui"):
+            self.render_ui()
+            
+            # نمایش نام کاربر و تاریخ
+            user_text = self.fonts["small"].render(
+                f"کاربر: {self.username} | تاریخ: {self.timestamp}", 
+                True, self.colors['text']
+            )
+            self.screen.blit(user_text, (10, self.height - 30))
+            
+            # نمایش اطلاعات پایه‌گذاری
+            foundation_text = self.fonts["small"].render(
+                f"پایه‌گذاری: {self.foundation_date} | نسخه: {self.version}", 
+                True, self.colors['text']
+            )
+            foundation_rect = foundation_text.get_rect(right=self.width - 10, bottom=self.height - 10)
+            self.screen.blit(foundation_text, foundation_rect)
         
-        # نمایش اطلاعات پایه‌گذاری
-        foundation_text = self.fonts["small"].render(
-            f"پایه‌گذاری: {self.foundation_date} | نسخه: {self.version}", 
-            True, self.colors['text']
-        )
-        foundation_rect = foundation_text.get_rect(right=self.width - 10, bottom=self.height - 10)
-        self.screen.blit(foundation_text, foundation_rect)
+        # پنل پروفایلر (در صورت فعال بودن)
+        profiler.draw_overlay(self.screen, self.fonts["tiny"])
         
         # بروزرسانی نمایش
-        pygame.display.flip()
+        with profiler.phase("present"):
+            self.dirty_tracker.present(self.screen)
     
     def render_stars(self):
         """رندر ستاره‌های پس‌زمینه"""
@@ -557,65 +960,49 @@ class CosmicCube:
     
     def render_energy_particles(self):
         """رندر ذرات انرژی متحرک"""
-        center_x, center_y = self.width // 2, self.height // 2
-        
-        # مرتب کردن ذرات بر اساس عمق (z) برای رندر صحیح
-        sorted_particles = sorted(self.energy_particles, key=lambda p: p['pos'][2], reverse=True)
+        if self.particle_projection is None:
+            return
         
-        for particle in sorted_particles:
-            x, y, z = particle['pos']
+        # ترتیب دور به نزدیک و مختصات صفحه از پروجکشن دسته‌ای (فقط ذرات داخل صفحه)
+        draw_order, particle_screen, particle_scale = self.particle_projection
+        screen_positions = particle_screen.tolist()
+        scales = particle_scale.tolist()
+        
+        # هاله همه ذرات با یک فراخوانی blits رسم می‌شود
+        glows = []
+        for index in draw_order.tolist():
+            particle = self.energy_particles[index]
+            screen_x, screen_y = screen_positions[index]
+            scale = scales[index]
             
-            # تبدیل مختصات سه‌بعدی به صفحه دوبعدی
-            if z + self.view_distance > 0:  # فقط ذرات جلوی دوربین
-                # پروجکشن پرسپکتیو ساده
-                scale = self.fov / (z + self.view_distance)
-                screen_x = center_x + x * scale
-                screen_y = center_y + y * scale
-                
-                # اگر در محدوده صفحه است، رندر کن
-                if 0 <= screen_x < self.width and 0 <= screen_y < self.height:
-                    # اندازه و آلفا بر اساس عمق و عمر
-                    size = max(0.5, particle['size'] * scale)
-                    alpha = int(255 * particle['life'])
-                    base_color = particle['color']
-                    
-                    # رنگ بر اساس نوع بُعد
-                    dim_color = self.colors.get(particle['type'], (255, 255, 255))
-                    
-                    # ترکیب رنگ‌ها
-                    color = tuple(
-                        int((base_color[i] + dim_color[i]) / 2) for i in range(3)
-                    )
-                    
-                    # رندر ذره با افکت درخشش
-                    for i in range(3):
-                        glow_size = size * (3 - i) / 2
-                        glow_alpha = alpha // (i + 1)
-                        glow_color = (*color, glow_alpha)
-                        pygame.gfxdraw.filled_circle(
-                            self.screen, 
-                            int(screen_x), 
-                            int(screen_y), 
-                            int(glow_size), 
-                            glow_color
-                        )
+            # اندازه و آلفا بر اساس عمق و عمر
+            size = max(0.5, particle['size'] * scale)
+            alpha = int(255 * particle['life'])
+            base_color = particle['color']
+            
+            # رنگ بر اساس نوع بُعد
+            dim_color = self.colors.get(particle['type'], (255, 255, 255))
+            
+            # ترکیب رنگ‌ها
+            color = tuple(
+                int((base_color[i] + dim_color[i]) / 2) for i in range(3)
+            )
+            
+            # ذره با افکت درخشش: یک اسپرایت از اطلس (ذرات بسیار نزدیک مستقیم رسم می‌شوند)
+            layers = self.glow_atlas.particle_layers(size, alpha)
+            center = (int(screen_x), int(screen_y))
+            glow = self.glow_atlas.blit_entry(color, layers, center)
+            if glow:
+                glows.append(glow)
+            else:
+                self.glow_atlas.draw_direct(self.screen, color, layers, center)
+        
+        self.screen.blits(glows, doreturn=False)
     
     def render_cosmic_cube(self):
         """رندر مکعب کیهانی با ابعاد هفتگانه"""
-        center_x, center_y = self.width // 2, self.height // 2
-        
-        # اعمال چرخش به رئوس مکعب
-        rotated_points = self.cube_rotation.apply(self.cube_vertices * 150)
-        
-        # تبدیل نقاط سه‌بعدی به دوبعدی
-        screen_points = []
-        for point in rotated_points:
-            x, y, z = point
-            # پرسپکتیو ساده
-            scale = self.fov / (z + self.view_distance + 400)  # مکعب بزرگتر از ذرات
-            screen_x = center_x + x * scale
-            screen_y = center_y + y * scale
-            screen_points.append((screen_x, screen_y))
+        # رئوس چرخیده و تصویرشده از پروجکشن دسته‌ای فریم
+        screen_points = self.cube_screen_points.tolist()
         
         # رندر یال‌های مکعب
         for start, end in self.cube_edges:
@@ -623,7 +1010,7 @@ class CosmicCube:
             end_point = screen_points[end]
             
             # رنگ یال‌ها با افکت درخشش
-            pulse = 0.5 + 0.5 * math.sin(self.animation_time * 0.5 + hash(f"{start}{end}") % 10 * 0.1)
+            pulse = 0.5 + 0.5 * math.sin(self.animation_time * 0.5 + zlib.crc32(f"{start}{end}".encode()) % 10 * 0.1)
             edge_color = (
                 int(60 + 40 * pulse),
                 int(100 + 50 * pulse),
@@ -681,138 +1068,233 @@ class CosmicCube:
     def render_knowledge_nodes(self):
         """رندر گره‌های دانشی"""
         if not self.knowledge_nodes:
+            self.node_index.rebuild([])
             return
             
-        center_x, center_y = self.width // 2, self.height // 2
+        # بازسازی شاخص فضایی از موقعیت‌های تصویرشده این فریم
+        positions = self.node_screen_positions
+        self.node_index.rebuild(positions)
         
-        # محاسبه موقعیت گره‌ها در فضای سه‌بعدی
-        for i, node in enumerate(self.knowledge_nodes):
-            # موقعیت بر اساس بُعد اصلی و زاویه
-            angle = (2 * math.pi * i) / len(self.knowledge_nodes)
-            radius = 100  # فاصله از مرکز
-            
-            # موقعیت پایه
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            z = 30 * math.sin(self.animation_time * 0.1 + i * 0.5)  # نوسان در محور z
-            
-            # بُعد گره تأثیر اضافی روی موقعیت دارد
-            dim_name = node.get("dimension", "consciousness")
-            dim_value = self.dimensions.get(dim_name, 0.5)
-            
-            # تأثیر بُعد روی موقعیت
-            x *= 1 + 0.5 * dim_value
-            y *= 1 + 0.5 * dim_value
-            z *= 1 + dim_value
-            
-            # روتیشن مکعب روی گره‌ها هم اعمال شود
-            rotated_point = self.cube_rotation.apply(np.array([x, y, z]))
-            x, y, z = rotated_point
-            
-            # ذخیره موقعیت برای استفاده در رندر ارتباطات
-            node['render_pos'] = (x, y, z)
-            
-            # تبدیل به مختصات صفحه
-            scale = self.fov / (z + self.view_distance + 400)
-            screen_x = center_x + x * scale
-            screen_y = center_y + y * scale
-            
-            # ذخیره موقعیت صفحه
-            node['screen_pos'] = (screen_x, screen_y)
+        # گراف‌های کوچک با جزئیات کامل رندر می‌شوند؛ گراف‌های بزرگ سطح جزئیات (LOD) دارند
+        graph = self.get_knowledge_graph()
+        detailed = len(self.knowledge_nodes) <= self.lod_full_detail_nodes
+        zoom = 5.0 / self.view_distance
+        focus_rows = self.focus_rows(graph)
         
         # ابتدا ارتباطات را رندر می‌کنیم تا زیر گره‌ها باشند
-        for node in self.knowledge_nodes:
-            if 'connections' in node and 'screen_pos' in node:
-                start_pos = node['screen_pos']
-                
-                for conn in node['connections']:
-                    target_id = conn['target_id']
-                    strength = conn['strength']
-                    
-                    # پیدا کردن گره هدف
-                    target_node = next((n for n in self.knowledge_nodes if n['id'] == target_id), None)
-                    if target_node and 'screen_pos' in target_node:
-                        end_pos = target_node['screen_pos']
-                        
-                        # رنگ ارتباط بر اساس قدرت و نوع
-                        connection_color = None
-                        if conn['type'] == 'harmonic':
-                            # آبی برای ارتباطات هارمونیک
-                            connection_color = (
-                                int(80 + 40 * strength),
-                                int(120 + 80 * strength),
-                                int(200 + 55 * strength),
-                                int(150 * strength)
-                            )
-                        else:
-                            # بنفش برای ارتباطات مکمل
-                            connection_color = (
-                                int(140 + 40 * strength),
-                                int(80 + 60 * strength),
-                                int(180 + 75 * strength),
-                                int(150 * strength)
-                            )
-                        
-                        # ضخامت خط بر اساس قدرت
-                        line_width = max(1, int(3 * strength))
-                        
-                        # رندر خط ارتباط
-                        pygame.draw.line(
-                            self.screen, 
-                            connection_color, 
-                            (int(start_pos[0]), int(start_pos[1])), 
-                            (int(end_pos[0]), int(end_pos[1])), 
-                            line_width
-                        )
+        if len(graph) == len(self.knowledge_nodes) and graph.edge_count:
+            self.render_knowledge_edges(graph, positions, detailed, focus_rows, zoom)
         
         # سپس گره‌ها را رندر می‌کنیم
-        for node in self.knowledge_nodes:
-            if 'screen_pos' in node:
+        if detailed:
+            for node in self.knowledge_nodes:
                 screen_x, screen_y = node['screen_pos']
-                
-                # بُعد گره
-                dim_name = node.get("dimension", "consciousness")
-                dim_color = self.colors.get(dim_name, (150, 150, 150))
-                
-                # اندازه بر اساس انرژی و پایداری
-                energy = node.get("energy_level", 1.0)
-                stability = node.get("stability", 1.0)
-                base_size = 12 * energy
-                
-                # نوسان با توجه به پایداری (کمتر پایدار = نوسان بیشتر)
-                oscillation = (1 - stability) * math.sin(self.animation_time * 2)
-                size = base_size * (1 + 0.2 * oscillation)
-                
-                # رندر هاله گره
-                for i in range(3):
-                    glow_size = size * (3 - i) / 1.5
-                    glow_alpha = 150 // (i + 1)
-                    glow_color = (*dim_color, glow_alpha)
-                    pygame.gfxdraw.filled_circle(
-                        self.screen, 
-                        int(screen_x), 
-                        int(screen_y), 
-                        int(glow_size), 
-                        glow_color
-                    )
-                
-                # رندر هسته گره
-                pygame.gfxdraw.filled_circle(
-                    self.screen, 
-                    int(screen_x), 
-                    int(screen_y), 
-                    int(size), 
-                    (*dim_color, 255)
-                )
-                
-                # نمایش نماد گره
-                if "symbols" in node and node["symbols"]:
-                    symbol = node["symbols"][0]  # نماد اول را نمایش می‌دهیم
-                    symbol_color = (255, 255, 255)
-                    
-                    symbol_text = self.fonts["small"].render(symbol, True, symbol_color)
-                    symbol_rect = symbol_text.get_rect(center=(screen_x, screen_y))
-                    self.screen.blit(symbol_text, symbol_rect)
+                self.draw_knowledge_node(node, screen_x, screen_y)
+        else:
+            self.render_knowledge_nodes_lod(positions, focus_rows, zoom)
+    
+    def render_knowledge_edges(self, graph, positions, detailed, focus_rows, zoom):
+        """رندر ارتباطات از لایه کش‌شده؛ لایه فقط با تغییر موقعیت‌ها، بزرگنمایی، انتخاب یا گراف دوباره رسم می‌شود"""
+        points = positions.astype(int)
+        # موقعیت‌های صحیح تصویرشده اثر چرخش، بزرگنمایی و نوسان گره‌ها را با هم در بر دارند؛
+        # گراف پس از هر تغییر گره‌ها (knowledge_graph_dirty) یک شیء تازه است
+        key = (graph, self.screen.get_size(), detailed, zoom, focus_rows.tobytes(), points.tobytes())
+        if key != self.edge_layer_key:
+            if self.edge_layer is None or self.edge_layer.get_size() != self.screen.get_size():
+                self.edge_layer = pygame.Surface(self.screen.get_size(), SRCALPHA)
+            self.edge_layer.fill((0, 0, 0, 0))
+            self.draw_knowledge_edges(self.edge_layer, graph, points, detailed, focus_rows, zoom)
+            self.edge_layer_key = key
+        self.screen.blit(self.edge_layer, (0, 0))
+    
+    def draw_knowledge_edges(self, surface, graph, points, detailed, focus_rows, zoom):
+        """رسم ارتباطات: هر جفت گره یک بار، گروه‌بندی‌شده بر اساس رنگ کوانتیزه و ضخامت"""
+        # هر ارتباط روی هر دو گره ذخیره می‌شود؛ دو یال یک جفت روی هم می‌افتند و یکی کافی است
+        edges = graph.undirected_edges()
+        sources = graph.sources()[edges]
+        targets = graph.targets[edges]
+        strengths = graph.strengths[edges]
+        harmonic = graph.types[edges] == graph.type_code('harmonic')
+        if not detailed:
+            selected = self.select_lod_edges(points, sources, targets, strengths, focus_rows, zoom)
+            sources, targets = sources[selected], targets[selected]
+            strengths, harmonic = strengths[selected], harmonic[selected]
+        
+        # کلید گروه: نوع، سطح رنگ (قدرت تا ۱.۱ می‌رسد؛ رنگ در ۱ محدود می‌شود) و ضخامت ۱ تا ۳
+        levels = np.rint(np.minimum(strengths, 1.0) * (self.edge_color_levels - 1)).astype(np.int64)
+        widths = np.maximum(1, (3 * strengths).astype(np.int64))
+        keys = (harmonic * self.edge_color_levels + levels) * 4 + widths
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        # یک لیست تخت x1, y1, x2, y2 به‌جای یک لیست کوچک برای هر نقطه
+        segments = np.column_stack((points[sources[order]], points[targets[order]])).ravel().tolist()
+        
+        # هر گروه با یک رنگ و ضخامت ثابت و بدون محاسبه رنگ برای هر یال رسم می‌شود؛
+        # آلفای رنگ روی صفحه بدون آلفا اثری نداشت، پس روی لایه هم کدر رسم می‌شود تا ظاهر تغییر نکند
+        draw_line = pygame.draw.line
+        for first, last in zip([0] + bounds.tolist(), bounds.tolist() + [len(keys)]):
+            color, width = self.edge_style(int(keys[first]))
+            color = color[:3]
+            coords = iter(segments[4 * first:4 * last])
+            for x1, y1, x2, y2 in zip(coords, coords, coords, coords):
+                draw_line(surface, color, (x1, y1), (x2, y2), width)
+    
+    def edge_style(self, key):
+        """رنگ و ضخامت یک گروه یال از روی کلید آن (کش‌شده)"""
+        style = self.edge_styles.get(key)
+        if style is None:
+            group, width = divmod(key, 4)
+            harmonic, level = divmod(group, self.edge_color_levels)
+            level /= self.edge_color_levels - 1
+            if harmonic:
+                # آبی برای ارتباطات هارمونیک
+                color = (int(80 + 40 * level), int(120 + 80 * level), int(200 + 55 * level), int(150 * level))
+            else:
+                # بنفش برای ارتباطات مکمل
+                color = (int(140 + 40 * level), int(80 + 60 * level), int(180 + 75 * level), int(150 * level))
+            style = self.edge_styles[key] = (color, width)
+        return style
+    
+    def focus_rows(self, graph):
+        """اندیس گره انتخاب‌شده، همسایه‌های آن و گره زیر نشانگر ماوس در گراف"""
+        ids = set(self.focus_neighbors)
+        ids.update(node_id for node_id in (self.current_state["focus"], self.hovered_node) if node_id)
+        rows = [graph.index_of(node_id) for node_id in ids]
+        return np.array(sorted(row for row in rows if row is not None), dtype=np.int64)
+    
+    def select_lod_edges(self, points, sources, targets, strengths, focus_rows, zoom):
+        """انتخاب یال‌های قابل رندر: حذف یال‌های ضعیف و بسیار کوتاه، با اولویت یال‌های قوی‌تر"""
+        cell = max(2, round(self.lod_cluster_px / zoom))
+        
+        # آستانه قدرت با دور شدن دوربین بالاتر می‌رود
+        keep = strengths >= self.lod_edge_strength / zoom
+        
+        # یال‌هایی که کوتاه‌تر از یک خوشه هستند زیر خوشه پنهان می‌شوند
+        offsets = points[sources] - points[targets]
+        keep &= np.einsum('ij,ij->i', offsets, offsets) >= cell * cell
+        
+        # یال‌های گره انتخاب‌شده و همسایه‌هایش همیشه رندر می‌شوند
+        if len(focus_rows):
+            keep |= np.isin(sources, focus_rows) | np.isin(targets, focus_rows)
+        
+        selected = np.flatnonzero(keep)
+        if len(selected) > self.lod_max_edges:
+            strongest = np.argpartition(-strengths[selected], self.lod_max_edges)[:self.lod_max_edges]
+            selected = np.sort(selected[strongest])
+        return selected
+    
+    def render_knowledge_nodes_lod(self, positions, focus_rows, zoom):
+        """رندر گره‌ها با سطح جزئیات: خوشه برای گره‌های هم‌پوشان، هسته یا یک پیکسل برای بقیه"""
+        nodes = self.knowledge_nodes
+        
+        # گره‌های خارج از صفحه رندر نمی‌شوند
+        visible = (positions[:, 0] >= 0) & (positions[:, 0] < self.width) \
+            & (positions[:, 1] >= 0) & (positions[:, 1] < self.height)
+        is_focus = np.zeros(len(nodes), dtype=bool)
+        is_focus[focus_rows] = True
+        rest = np.flatnonzero(visible & ~is_focus)
+        
+        if len(rest):
+            rest_nodes = [nodes[i] for i in rest.tolist()]
+            colors = np.array(
+                [self.colors.get(node.get("dimension", "consciousness"), (150, 150, 150))[:3] for node in rest_nodes],
+                dtype=float
+            )
+            sizes = np.array([12 * node.get("energy_level", 1.0) for node in rest_nodes]) * zoom
+            
+            # گره‌هایی که در یک خانه از شبکه صفحه قرار می‌گیرند به یک خوشه تبدیل می‌شوند
+            cell = max(2, round(self.lod_cluster_px / zoom))
+            cells = np.floor(positions[rest] / cell).astype(np.int64)
+            keys = cells[:, 1] * (self.width // cell + 2) + cells[:, 0]
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            
+            clustered = np.flatnonzero(counts > 1)
+            if len(clustered):
+                members = counts[clustered]
+                centers = np.column_stack([
+                    np.bincount(inverse, weights=positions[rest, axis], minlength=len(counts))[clustered] / members
+                    for axis in (0, 1)
+                ])
+                cluster_colors = np.column_stack([
+                    np.bincount(inverse, weights=colors[:, channel], minlength=len(counts))[clustered] / members
+                    for channel in range(3)
+                ])
+                radii = np.minimum(2 + np.sqrt(members), 4 * cell)
+                for (x, y), color, radius in zip(
+                    centers.astype(int).tolist(), cluster_colors.astype(int).tolist(), radii.astype(int).tolist()
+                ):
+                    pygame.gfxdraw.filled_circle(self.screen, x, y, radius, (*color, 200))
+            
+            # گره‌های تنها: هسته ساده برای گره‌های بزرگ، یک پیکسل برای گره‌های ریز
+            single = counts[inverse] == 1
+            points = positions[rest].astype(int)
+            core = single & (sizes >= self.lod_pixel_px)
+            for (x, y), color, size in zip(
+                points[core].tolist(), colors[core].astype(int).tolist(), sizes[core].tolist()
+            ):
+                pygame.gfxdraw.filled_circle(self.screen, x, y, max(1, int(size / 2)), (*color, 255))
+            tiny = single & ~core
+            for (x, y), color in zip(points[tiny].tolist(), colors[tiny].astype(int).tolist()):
+                self.screen.set_at((x, y), color)
+        
+        # گره انتخاب‌شده، همسایه‌هایش و گره زیر نشانگر با هاله و نماد
+        for row in focus_rows.tolist():
+            if visible[row]:
+                screen_x, screen_y = nodes[row]['screen_pos']
+                self.draw_knowledge_node(nodes[row], screen_x, screen_y)
+    
+    def draw_knowledge_node(self, node, screen_x, screen_y):
+        """رندر کامل یک گره دانش: هاله، هسته، حلقه برجسته‌سازی و نماد"""
+        # بُعد گره
+        dim_name = node.get("dimension", "consciousness")
+        dim_color = self.colors.get(dim_name, (150, 150, 150))
+        
+        # اندازه بر اساس انرژی و پایداری
+        energy = node.get("energy_level", 1.0)
+        stability = node.get("stability", 1.0)
+        base_size = 12 * energy
+        
+        # نوسان با توجه به پایداری (کمتر پایدار = نوسان بیشتر)
+        oscillation = (1 - stability) * math.sin(self.animation_time * 2)
+        size = base_size * (1 + 0.2 * oscillation)
+        
+        # رندر هاله گره (اسپرایت از پیش رندرشده با ترکیب جمعی)
+        layers = self.glow_atlas.node_layers(size)
+        center = (int(screen_x), int(screen_y))
+        glow = self.glow_atlas.blit_entry(dim_color, layers, center)
+        if glow:
+            self.screen.blit(*glow)
+        else:
+            self.glow_atlas.draw_direct(self.screen, dim_color, layers, center)
+        
+        # رندر هسته گره
+        pygame.gfxdraw.filled_circle(
+            self.screen, 
+            int(screen_x), 
+            int(screen_y), 
+            int(size), 
+            (*dim_color, 255)
+        )
+        
+        # حلقه برجسته‌سازی گره زیر نشانگر ماوس و همسایه‌های گره انتخاب‌شده
+        if node['id'] == self.hovered_node or node['id'] in self.focus_neighbors:
+            pygame.gfxdraw.aacircle(
+                self.screen, 
+                int(screen_x), 
+                int(screen_y), 
+                int(size) + 4, 
+                self.colors['highlight'] if node['id'] == self.hovered_node else self.colors['accent2']
+            )
+        
+        # نمایش نماد گره (نماد اصلی از فهرست برای گره‌هایی که بدنه‌شان بارگذاری نشده)
+        symbol = node.get("primary_symbol") or (node.get("symbols") or [None])[0]
+        if symbol:
+            symbol_color = (255, 255, 255)
+            
+            symbol_text = self.fonts["small"].render(symbol, True, symbol_color)
+            symbol_rect = symbol_text.get_rect(center=(screen_x, screen_y))
+            self.screen.blit(symbol_text, symbol_rect)
     
     def render_ui(self):
         """رندر رابط کاربری"""
@@ -922,6 +1404,12 @@ class CosmicCube:
         title_rect = title.get_rect(centerx=panel.centerx, top=panel.top + 10)
         self.screen.blit(title, title_rect)
         
+        # نمایش گره انتخاب‌شده (بدنه آن هنگام انتخاب بارگذاری شده است)
+        focused = self.relationship_index.nodes.get(self.current_state["focus"])
+        if focused is not None:
+            self.render_focused_node(panel, focused)
+            return
+        
         # نمایش مفاهیم بنیادی
         concept_keys = list(self.core_concepts.keys())
         
@@ -962,14 +1450,39 @@ class CosmicCube:
                 symbols_rect = symbols_render.get_rect(centerx=panel.centerx, top=freq_rect.bottom + 15)
                 self.screen.blit(symbols_render, symbols_rect)
     
+    def render_focused_node(self, panel, node):
+        """نمایش نام، محتوا و نمادهای گره دانش انتخاب‌شده در پنل کاوشگر"""
+        name = self.fonts["large"].render(node.get("name", node["id"]), True, self.colors['accent1'])
+        name_rect = name.get_rect(centerx=panel.centerx, top=panel.top + 50)
+        self.screen.blit(name, name_rect)
+        
+        text_y = name_rect.bottom + 20
+        for line in textwrap.wrap(node.get("content", ""), width=80)[:5]:
+            text = self.fonts["medium"].render(line, True, self.colors['text'])
+            text_rect = text.get_rect(centerx=panel.centerx, top=text_y)
+            self.screen.blit(text, text_rect)
+            text_y += 30
+        
+        details = f"فرکانس: {node.get('frequency', 0)} Hz | بُعد: {node.get('dimension', '-')}"
+        symbols = node.get("symbols", [])
+        if symbols:
+            details += " | نمادها: " + " ".join(symbols)
+        details_text = self.fonts["small"].render(details, True, self.colors['accent2'])
+        details_rect = details_text.get_rect(centerx=panel.centerx, top=text_y + 20)
+        self.screen.blit(details_text, details_rect)
+    
     def handle_events(self):
         """پردازش رویدادهای ورودی"""
         for event in pygame.event.get():
+            self.pacer.process_event(event)
             if event.type == pygame.QUIT:
                 return False
             elif event.type == pygame.KEYDOWN:
                 self.keys_pressed.add(event.key)
                 
+                # کلیدهای پروفایلر
+                self.profiler.handle_key(event.key)
+                
                 # خروج با Escape
                 if event.key == pygame.K_ESCAPE:
                     return False
@@ -981,6 +1494,10 @@ class CosmicCube:
                 self.keys_pressed.discard(event.key)
             elif event.type == pygame.MOUSEMOTION:
                 self.mouse_pos = event.pos
+                
+                # گره زیر نشانگر ماوس
+                hovered = self.pick_node(event.pos)
+                self.hovered_node = hovered['id'] if hovered else None
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self.mouse_pressed = True
                 self.handle_mouse_press(event.pos, event.button)
@@ -1001,34 +1518,17 @@ class CosmicCube:
                     "explorer": pygame.Rect(20, self.height - 320, self.width - 40, 300)
                 }
         
-        # پردازش حرکت با کلیدها
-        self.handle_keyboard_input()
-        
-        # پردازش حرکت با ماوس
+        # پردازش حرکت با ماوس (حرکت با کلیدها در هر گام شبیه‌سازی اعمال می‌شود)
         self.handle_mouse_input()
         
         return True
     
     def handle_keyboard_input(self):
         """پردازش ورودی کلید"""
-        # چرخش با کلیدهای جهت‌دار
-        rot_amount = 0.02
-        
-        if pygame.K_UP in self.keys_pressed:
-            rotation = Rotation.from_euler('x', -rot_amount)
-            self.cube_rotation = rotation * self.cube_rotation
-        
-        if pygame.K_DOWN in self.keys_pressed:
-            rotation = Rotation.from_euler('x', rot_amount)
-            self.cube_rotation = rotation * self.cube_rotation
-        
-        if pygame.K_LEFT in self.keys_pressed:
-            rotation = Rotation.from_euler('y', -rot_amount)
-            self.cube_rotation = rotation * self.cube_rotation
-        
-        if pygame.K_RIGHT in self.keys_pressed:
-            rotation = Rotation.from_euler('y', rot_amount)
-            self.cube_rotation = rotation * self.cube_rotation
+        # چرخش با کلیدهای جهت‌دار (چرخش‌های از پیش محاسبه‌شده)
+        for key, rotation in self.key_rotations:
+            if key in self.keys_pressed:
+                self.cube_rotation = rotation * self.cube_rotation
     
     def handle_mouse_input(self):
         """پردازش ورودی ماوس"""
@@ -1039,33 +1539,41 @@ class CosmicCube:
                 self.auto_rotate = False
                 
                 # تبدیل حرکت ماوس به چرخش
-                rot_x = Rotation.from_euler('y', dx * 0.01)
-                rot_y = Rotation.from_euler('x', dy * 0.01)
+                rotation = Quaternion.from_euler('y', dx * 0.01) * Quaternion.from_euler('x', dy * 0.01)
                 
-                # اعمال چرخش
-                self.cube_rotation = rot_x * rot_y * self.cube_rotation
+                # اعمال چرخش (به گام قبلی هم، تا درون‌یابی کشیدن ماوس را عقب نیندازد)
+                self.cube_rotation = rotation * self.cube_rotation
+                self.previous_rotation = rotation * self.previous_rotation
         
         # به‌روزرسانی موقعیت نسبی ماوس
         pygame.mouse.get_rel()
     
+    def pick_node(self, pos):
+        """نزدیک‌ترین گره دانشی به موقعیت صفحه در شعاع انتخاب (با شاخص فضایی)"""
+        index = self.node_index.nearest(pos, self.node_pick_radius)
+        if index is None or index >= len(self.knowledge_nodes):
+            return None
+        return self.knowledge_nodes[index]
+    
     def handle_mouse_press(self, pos, button):
         """پردازش کلیک ماوس"""
         # بررسی کلیک روی گره‌های دانش
-        for node in self.knowledge_nodes:
-            if 'screen_pos' in node:
-                screen_x, screen_y = node['screen_pos']
-                
-                # فاصله از گره
-                dx = pos[0] - screen_x
-                dy = pos[1] - screen_y
-                distance = math.sqrt(dx*dx + dy*dy)
-                
-                # اگر روی گره کلیک شده
-                if distance < 15:
-                    # تنظیم گره فعلی و نمایش اطلاعات
-                    self.current_state["focus"] = node["id"]
-                    print(f"Selected node: {node['name']}")
-                    return
+        node = self.pick_node(pos)
+        if node:
+            # بارگذاری بدنه گره انتخاب‌شده؛ بدنه کم‌استفاده‌ترین گره‌ها آزاد می‌شود
+            self.materialize_knowledge_node(node)
+            
+            # تنظیم گره فعلی و نمایش اطلاعات
+            self.current_state["focus"] = node["id"]
+            
+            # همسایه‌های مستقیم گره در گراف دانش
+            graph = self.get_knowledge_graph()
+            row = graph.index_of(node["id"])
+            neighbors = graph.neighborhood(row, depth=1) if row is not None else []
+            self.focus_neighbors = {graph.ids[i] for i in neighbors}
+            
+            print(f"Selected node: {node.get('name', node['id'])} ({len(neighbors)} connected)")
+            return
         
         # بررسی کلیک روی پنل‌ها
         for panel_name, panel_rect in self.ui_panels.items():
@@ -1073,28 +1581,51 @@ class CosmicCube:
                 self.ui_active_panel = panel_name
                 return
     
+    def is_animating(self):
+        """آیا انیمیشن سریعی (چرخش تند یا کنترل کاربر) نرخ کامل فریم را لازم دارد"""
+        # چرخش خودکار آرام (پیش‌فرض) با نرخ بیکاری هم روان است: ساعت شبیه‌سازی گام‌های
+        # جاافتاده را جبران می‌کند، پس فقط چرخش تندتر از idle_rotation_speed نرخ کامل می‌خواهد
+        fast_rotation = self.auto_rotate and self.rotation_speed > self.idle_rotation_speed
+        return fast_rotation or self.mouse_pressed or bool(self.keys_pressed)
+    
     def run(self):
         """اجرای حلقه اصلی برنامه"""
         running = True
-        clock = pygame.time.Clock()
         
         while running:
+            self.profiler.begin_frame()
+            
             # پردازش رویدادها
-            running = self.handle_events()
+            with self.profiler.phase("handle_events"):
+                running = self.handle_events()
             
-            # به‌روزرسانی حالت
-            self.update()
+            # توقف شبیه‌سازی و رندر وقتی پنجره کوچک شده است
+            if not self.pacer.paused:
+                # به‌روزرسانی حالت
+                with self.profiler.phase("update"):
+                    self.update()
+                
+                # رندر
+                self.render()
+            else:
+                # زمان سپری‌شده در حالت توقف شبیه‌سازی را جبران نمی‌کنیم
+                self.simulation.hold()
             
-            # رندر
-            self.render()
+            self.profiler.end_frame()
             
-            # محدود کردن FPS
-            clock.tick(60)
+            # محدود کردن FPS (کاهش نرخ در حالت بیکاری)
+            self.pacer.tick(self.is_animating())
+        
+        # ذخیره فهرست گره‌ها در صورت افزودن، ویرایش یا حذف گره در این اجرا
+        self.flush_knowledge_index()
         
         pygame.quit()
         return True
 
 # اجرای برنامه
 if __name__ == "__main__":
-    cosmic_cube = CosmicCube(username="behicof", timestamp="2025-04-17 14:37:51")
+    cosmic_cube = CosmicCube(
+        username="behicof", timestamp="2025-04-17 14:37:51",
+        **app_options(description="مکعب کیهانی - پایه‌گذاری دانش بنیادین")
+    )
     cosmic_cube.run()
\ No newline at end of file
@@ -0,0 +1,310 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pygame
+
+
+def env_flag(name, default=False):
+    """Read a boolean switch such as COSMIC_DIRTY_RECTS=1 from the environment"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def headless_requested(headless=None):
+    """Resolve the headless switch: an explicit flag wins over COSMIC_HEADLESS"""
+    if headless is None:
+        return env_flag("COSMIC_HEADLESS")
+    return headless
+
+
+def init_pygame(headless=None):
+    """pygame.init(), selecting SDL's dummy video driver first when running headless"""
+    if headless_requested(headless):
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pygame.init()
+
+
+def create_screen(size, flags=0, headless=None):
+    """Create the main drawing surface: a window, or an off-screen surface when headless.
+
+    Headless mode switches SDL to its dummy video driver (re-initialising the
+    display module if pygame.init() already picked a real one) so fonts, events
+    and timers keep working on machines without a display.
+    """
+    if not headless_requested(headless):
+        return pygame.display.set_mode(size, flags)
+
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    if pygame.display.get_init() and pygame.display.get_driver() != "dummy":
+        pygame.display.quit()
+    if not pygame.display.get_init():
+        pygame.display.init()
+    return pygame.Surface(size)
+
+
+def is_offscreen(screen):
+    """Whether the surface is not the window surface (headless rendering)"""
+    return screen is not pygame.display.get_surface()
+
+
+class DirtyRectTracker:
+    """Present only the regions of the screen that changed since the last frame.
+
+    With the tracker disabled, present() is a plain pygame.display.flip().
+    When enabled, the presented frame is compared against the previous one in
+    fixed-size tiles and only the changed tiles are sent to the display with
+    pygame.display.update(rects). Regions can also be marked explicitly.
+    Off-screen (headless) surfaces are tracked the same way but never sent.
+    """
+
+    def __init__(self, enabled=None, tile_size=32):
+        if tile_size % 8:
+            raise ValueError("tile_size must be a multiple of 8")
+        if enabled is None:
+            enabled = env_flag("COSMIC_DIRTY_RECTS")
+        self.enabled = enabled
+        self.tile_size = tile_size
+        self.previous_frame = None
+        self.marked_rects = []
+        self.full_update = True
+        self.last_update_area = 0
+
+    def invalidate(self):
+        """Force a full-screen update on the next present (resize, view change)"""
+        self.full_update = True
+
+    def mark(self, rect):
+        """Mark a region as changed regardless of the pixel comparison"""
+        self.marked_rects.append(pygame.Rect(rect))
+
+    def capture(self, screen):
+        """Copy the screen pixels as a (rows, columns) array in memory order"""
+        width, height = screen.get_size()
+        bytesize = screen.get_bytesize()
+        buffer = screen.get_buffer()
+        try:
+            if bytesize == 4:
+                rows = np.frombuffer(buffer, dtype=np.uint32).reshape(height, -1)[:, :width]
+            else:
+                rows = np.frombuffer(buffer, dtype=np.uint8).reshape(height, -1)[:, :width * bytesize]
+            return rows.copy()
+        finally:
+            del buffer
+
+    def changed_rects(self, screen):
+        """Compare the screen against the previous frame and return the changed tiles"""
+        current = self.capture(screen)
+        previous = self.previous_frame
+        self.previous_frame = current
+        if previous is None or previous.shape != current.shape:
+            return None
+
+        tile = self.tile_size
+        width, height = screen.get_size()
+        # One tile spans tile pixels, which is tile * bytes columns in the byte view
+        tile_columns = tile * current.shape[1] // width
+        rows = -(-height // tile)
+        cols = -(-width // tile)
+
+        diff = np.not_equal(current, previous)
+        if diff.shape != (rows * tile, cols * tile_columns):
+            # Pad to a whole number of tiles so the diff can be reduced per tile
+            padded = np.zeros((rows * tile, cols * tile_columns), dtype=bool)
+            padded[:diff.shape[0], :diff.shape[1]] = diff
+            diff = padded
+        # OR the rows of each tile band together eight flags at a time, then
+        # collapse every tile's columns into a single changed flag
+        words = tile_columns // 8
+        band = np.bitwise_or.reduce(diff.view(np.uint64).reshape(rows, tile, cols * words), axis=1)
+        tiles = band.reshape(rows, cols, words).any(axis=2)
+
+        rects = []
+        for row in range(rows):
+            changed = np.flatnonzero(tiles[row])
+            if not len(changed):
+                continue
+            # Merge runs of neighbouring tiles into a single rect per run
+            breaks = np.flatnonzero(np.diff(changed) > 1)
+            starts = np.concatenate(([changed[0]], changed[breaks + 1]))
+            ends = np.concatenate((changed[breaks], [changed[-1]]))
+            for first, last in zip(starts.tolist(), ends.tolist()):
+                rects.append(pygame.Rect(
+                    first * tile, row * tile, (last - first + 1) * tile, tile
+                ).clip(0, 0, width, height))
+        return rects
+
+    def present(self, screen):
+        """Send the current frame to the display"""
+        offscreen = is_offscreen(screen)
+        if not self.enabled:
+            if not offscreen:
+                pygame.display.flip()
+            self.last_update_area = screen.get_width() * screen.get_height()
+            return
+
+        rects = self.changed_rects(screen)
+        if rects is None or self.full_update:
+            self.full_update = False
+            self.marked_rects = []
+            if not offscreen:
+                pygame.display.flip()
+            self.last_update_area = screen.get_width() * screen.get_height()
+            return
+
+        rects.extend(self.marked_rects)
+        self.marked_rects = []
+        self.last_update_area = sum(rect.width * rect.height for rect in rects)
+        if rects and not offscreen:
+            pygame.display.update(rects)
+
+
+# Events that count as user activity and wake an idle window back to full rate
+INPUT_EVENTS = (
+    pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT,
+    pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL,
+    pygame.VIDEORESIZE, pygame.WINDOWEXPOSED, pygame.QUIT
+)
+
+
+class FramePacer:
+    """Adaptive replacement for clock.tick(60) in the application loops.
+
+    Runs at target_fps while there is input or a visible animation, drops to
+    idle_fps after idle_after seconds without either, and reports paused while
+    the window is minimized (or unfocused, when pause_when_unfocused is set) so
+    the caller can skip simulation and rendering altogether. Idle and paused
+    waits are cut short as soon as an input event arrives.
+    """
+
+    def __init__(self, target_fps=60, idle_fps=10, idle_after=2.0, paused_fps=4,
+                 pause_when_unfocused=None, clock=None):
+        if pause_when_unfocused is None:
+            pause_when_unfocused = env_flag("COSMIC_PAUSE_UNFOCUSED")
+        self.target_fps = target_fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.paused_fps = paused_fps
+        self.pause_when_unfocused = pause_when_unfocused
+        self.clock = clock or pygame.time.Clock()
+        self.minimized = False
+        self.focused = True
+        self.last_activity = time.monotonic()
+        self.frame_start = self.last_activity
+
+    def notify_activity(self):
+        """Return to the full frame rate immediately"""
+        self.last_activity = time.monotonic()
+
+    def process_event(self, event):
+        """Track window state and user activity from an event of the main loop"""
+        if event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+            self.minimized = True
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN, pygame.WINDOWMAXIMIZED):
+            self.minimized = False
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+
+        if event.type in INPUT_EVENTS:
+            self.notify_activity()
+
+    @property
+    def paused(self):
+        """Whether the simulation should be suspended (window not visible)"""
+        return self.minimized or (self.pause_when_unfocused and not self.focused)
+
+    def current_fps(self, animating=False):
+        """Frame rate for the next frame"""
+        if self.paused:
+            return self.paused_fps
+        if animating or time.monotonic() - self.last_activity < self.idle_after:
+            return self.target_fps
+        return self.idle_fps
+
+    def tick(self, animating=False):
+        """Wait for the next frame; returns the milliseconds since the previous one"""
+        fps = self.current_fps(animating)
+        if fps >= self.target_fps:
+            elapsed = self.clock.tick(fps)
+        else:
+            # Sleep in short slices so new input snaps the loop back to full rate
+            deadline = self.frame_start + 1.0 / fps
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or pygame.event.peek(INPUT_EVENTS):
+                    break
+                pygame.time.wait(max(1, int(min(remaining, 0.01) * 1000)))
+            elapsed = self.clock.tick()
+        self.frame_start = time.monotonic()
+        return elapsed
+
+
+def run_frame_loop(app, handle_event, is_animating=None):
+    """Main loop of a visual app, running until app.running turns false.
+
+    Every event goes to app.pacer first; QUIT stops the loop, profiler hotkeys
+    are consumed, and the rest are passed to handle_event(event). A frame is
+    app.draw_frame() plus the profiler overlay, presented through
+    app.dirty_tracker. While the pacer reports paused nothing is drawn and
+    app.simulation is held so it does not catch up afterwards. is_animating()
+    keeps the pacer at the full frame rate.
+    """
+    profiler, pacer = app.profiler, app.pacer
+    while app.running:
+        profiler.begin_frame()
+        with profiler.phase("handle_events"):
+            for event in pygame.event.get():
+                pacer.process_event(event)
+                if event.type == pygame.QUIT:
+                    app.running = False
+                elif event.type == pygame.KEYDOWN and profiler.handle_key(event.key):
+                    continue
+                else:
+                    handle_event(event)
+
+        if pacer.paused:
+            app.simulation.hold()
+        else:
+            app.draw_frame()
+            profiler.draw_overlay(app.screen, app.font_small)
+            with profiler.phase("present"):
+                app.dirty_tracker.present(app.screen)
+        profiler.end_frame()
+        pacer.tick(is_animating() if is_animating is not None else False)
+
+
+def app_options(argv=None, description=None):
+    """Constructor keyword arguments for a visual app from its command line.
+
+    Options left out stay None so the app falls back to its defaults and the
+    COSMIC_* environment switches.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--target-fps", type=int, help="frame rate while animating or in use (default 60)")
+    parser.add_argument("--idle-fps", type=int, help="frame rate after a few seconds without input (default 10)")
+    parser.add_argument(
+        "--pause-when-unfocused", action="store_true", default=None,
+        help="suspend simulation and rendering while the window has no focus (or COSMIC_PAUSE_UNFOCUSED=1)"
+    )
+    parser.add_argument("--headless", action="store_true", default=None, help="render off-screen (or COSMIC_HEADLESS=1)")
+    args = parser.parse_args(argv)
+    return {name: value for name, value in vars(args).items() if value is not None}
+
+
+def build_gradient_background(size, top_color, bottom_color, step=1):
+    """Render the vertical cosmic gradient once so frames can blit it instead of redrawing it"""
+    width, height = size
+    background = pygame.Surface(size)
+    for y in range(0, height, step):
+        gradient_factor = y / height
+        color = tuple(
+            int(top + (bottom - top) * gradient_factor)
+            for top, bottom in zip(top_color, bottom_color)
+        )
+        pygame.draw.line(background, color, (0, y), (width, y), step)
+    return background
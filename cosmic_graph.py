@@ -0,0 +1,381 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+import numpy as np
+
+
+class KnowledgeGraph:
+    """Knowledge-node connections as an id→index map plus CSR adjacency arrays.
+
+    Node i's outgoing edges are targets[offsets[i]:offsets[i + 1]], with the
+    matching strengths, type codes (indexes into type_names) and active flags
+    at the same positions. Nodes keep the order of the list they were built
+    from, so row numbers line up with that list and with per-frame position
+    arrays.
+    """
+
+    def __init__(self, ids, offsets, targets, strengths, types, active, type_names):
+        self.ids = list(ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+        self.offsets = offsets
+        self.targets = targets
+        self.strengths = strengths
+        self.types = types
+        self.active = active
+        self.type_names = list(type_names)
+        self.pair_edges = None
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """Build the graph from node dicts carrying an 'id' and a 'connections' list"""
+        ids = [node["id"] for node in nodes]
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        type_codes = {}
+
+        counts = np.zeros(len(nodes), dtype=np.int64)
+        targets, strengths, types, active = [], [], [], []
+        for i, node in enumerate(nodes):
+            for connection in node.get("connections", ()):
+                # Connections to nodes that are not loaded have nothing to draw or walk to
+                target = index.get(connection["target_id"])
+                if target is None:
+                    continue
+                counts[i] += 1
+                targets.append(target)
+                strengths.append(connection.get("strength", 0.0))
+                types.append(type_codes.setdefault(connection.get("type"), len(type_codes)))
+                active.append(connection.get("active", True))
+
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            ids, offsets,
+            np.array(targets, dtype=np.int64),
+            np.array(strengths, dtype=np.float64),
+            np.array(types, dtype=np.int16),
+            np.array(active, dtype=bool),
+            type_codes
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def index_of(self, node_id):
+        return self.index.get(node_id)
+
+    def type_code(self, name):
+        """Code of a connection type name, or -1 when no edge has that type"""
+        try:
+            return self.type_names.index(name)
+        except ValueError:
+            return -1
+
+    def neighbors(self, i):
+        """Target rows of node i's outgoing edges"""
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def edge_slice(self, i):
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def sources(self):
+        """Source row of every edge, parallel to targets"""
+        return np.repeat(np.arange(len(self.ids)), np.diff(self.offsets))
+
+    def undirected_edges(self):
+        """Edge numbers covering each connected node pair once (the first edge listed for it)"""
+        if self.pair_edges is None:
+            sources = self.sources()
+            low = np.minimum(sources, self.targets)
+            high = np.maximum(sources, self.targets)
+            # Relationships are stored on both nodes, so most pairs appear twice
+            _, first = np.unique(low * len(self.ids) + high, return_index=True)
+            self.pair_edges = np.sort(first)
+        return self.pair_edges
+
+    def neighborhood(self, start, depth=1):
+        """Rows reachable from row start within depth hops (breadth-first, start excluded)"""
+        seen = {start}
+        frontier = deque([(start, 0)])
+        reached = []
+        while frontier:
+            i, distance = frontier.popleft()
+            if distance == depth:
+                continue
+            for target in self.neighbors(i).tolist():
+                if target not in seen:
+                    seen.add(target)
+                    reached.append(target)
+                    frontier.append((target, distance + 1))
+        return reached
+
+
+# Frequency-ratio windows (as multiples of a node's own frequency) that can
+# hold a unison, octave or perfect-fifth partner; candidates found in them are
+# confirmed with connection_strength, so the windows only need to be wide enough
+HARMONIC_WINDOWS = tuple(
+    (low * (1 - 1e-9), high * (1 + 1e-9)) for low, high in (
+        (0.99, 1 / 0.99),
+        (0.49, 0.51), (1 / 0.51, 1 / 0.49),
+        (0.65, 0.67), (1 / 0.67, 1 / 0.65)
+    )
+)
+
+
+def harmonic_bonus(node_freq, other_freq):
+    """Strength added for frequencies in unison, an octave or a perfect fifth apart"""
+    if node_freq > 0 and other_freq > 0:
+        freq_ratio = min(node_freq, other_freq) / max(node_freq, other_freq)
+        if abs(freq_ratio - 1.0) < 0.01:  # unison
+            return 0.3
+        elif abs(freq_ratio - 0.5) < 0.01 or abs(freq_ratio - 2.0) < 0.01:  # octave
+            return 0.2
+        elif abs(freq_ratio - 0.66) < 0.01 or abs(freq_ratio - 1.5) < 0.01:  # perfect fifth
+            return 0.15
+    return 0.0
+
+
+def connection_strength(node, other_node):
+    """Relationship strength between two knowledge nodes (dimension, harmonic frequency, category)"""
+    strength = 0.0
+
+    if node.get("dimension") == other_node.get("dimension"):
+        strength += 0.5
+
+    strength += harmonic_bonus(node.get("frequency", 0), other_node.get("frequency", 0))
+
+    if node.get("category") == other_node.get("category"):
+        strength += 0.3
+
+    return strength
+
+
+def build_relationships(nodes, threshold=0.3):
+    """Connection lists for every node, identical to comparing all pairs but without doing so.
+
+    Nodes sharing a dimension always clear the threshold, so they are taken
+    straight from the dimension bucket. Nodes in different dimensions only
+    clear it with a shared category plus a harmonic frequency, so those
+    partners are found by range search over the category's sorted
+    frequencies. Runs in O(n log n + connections).
+    """
+    dimensions, categories, frequencies = [], [], []
+    for node in nodes:
+        dimensions.append(node.get("dimension"))
+        categories.append(node.get("category"))
+        frequencies.append(node.get("frequency", 0))
+
+    by_dimension = {}
+    for j, dimension in enumerate(dimensions):
+        by_dimension.setdefault(dimension, []).append(j)
+
+    by_category = {}
+    for j, category in enumerate(categories):
+        if frequencies[j] > 0:
+            by_category.setdefault(category, []).append(j)
+    for category, members in by_category.items():
+        members.sort(key=frequencies.__getitem__)
+        by_category[category] = (members, [frequencies[j] for j in members])
+
+    relationships = []
+    for i, node in enumerate(nodes):
+        dimension = dimensions[i]
+        candidates = [j for j in by_dimension[dimension] if j != i]
+
+        # Harmonic partners of the same category in other dimensions
+        frequency = frequencies[i]
+        if frequency > 0 and categories[i] in by_category:
+            members, sorted_freqs = by_category[categories[i]]
+            partners = set()
+            for low, high in HARMONIC_WINDOWS:
+                start = bisect_left(sorted_freqs, frequency * low)
+                end = bisect_right(sorted_freqs, frequency * high)
+                partners.update(j for j in members[start:end] if dimensions[j] != dimension)
+            if partners:
+                candidates = sorted(candidates + list(partners))
+
+        # Same additions in the same order as connection_strength, from the prefetched fields
+        category = categories[i]
+        connections = []
+        for j in candidates:
+            same_dimension = dimension == dimensions[j]
+            strength = 0.5 if same_dimension else 0.0
+            strength += harmonic_bonus(frequency, frequencies[j])
+            if category == categories[j]:
+                strength += 0.3
+            if strength > threshold:
+                connections.append({
+                    "target_id": nodes[j]["id"],
+                    "strength": strength,
+                    "type": "harmonic" if same_dimension else "complementary",
+                    "active": True
+                })
+        relationships.append(connections)
+    return relationships
+
+
+class RelationshipIndex:
+    """Dimension, category and frequency indexes for keeping connections current as nodes change.
+
+    Adding a node only visits the nodes it connects to: its dimension bucket
+    plus the harmonic frequency windows of its category. Each connection is
+    written in both directions, and every connection list stays ordered by
+    the targets' insertion order, so the lists match what build_relationships
+    would produce for the same node sequence.
+    """
+
+    def __init__(self, threshold=0.3):
+        self.threshold = threshold
+        self.nodes = {}
+        self.order = {}
+        self.next_order = 0
+        # dimension -> [(order, id)] and category -> [(frequency, order, id)], both kept sorted
+        self.by_dimension = {}
+        self.by_category = {}
+
+    @classmethod
+    def from_nodes(cls, nodes, threshold=0.3):
+        """Index nodes whose connections are already built, without touching them"""
+        index = cls(threshold)
+        for node in nodes:
+            index.register(node, keep_sorted=False)
+        # Frequencies arrive unordered; sort each category once instead of inserting in order
+        for members in index.by_category.values():
+            members.sort()
+        return index
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def register(self, node, order=None, keep_sorted=True):
+        if order is None:
+            order = self.next_order
+            self.next_order += 1
+        node_id = node["id"]
+        self.nodes[node_id] = node
+        self.order[node_id] = order
+
+        insort(self.by_dimension.setdefault(node.get("dimension"), []), (order, node_id))
+        frequency = node.get("frequency", 0)
+        if frequency > 0:
+            members = self.by_category.setdefault(node.get("category"), [])
+            if keep_sorted:
+                insort(members, (frequency, order, node_id))
+            else:
+                members.append((frequency, order, node_id))
+        return order
+
+    def unregister(self, node):
+        node_id = node["id"]
+        order = self.order.pop(node_id)
+        del self.nodes[node_id]
+
+        members = self.by_dimension[node.get("dimension")]
+        members.pop(bisect_left(members, (order, node_id)))
+        if not members:
+            del self.by_dimension[node.get("dimension")]
+
+        frequency = node.get("frequency", 0)
+        if frequency > 0:
+            members = self.by_category[node.get("category")]
+            members.pop(bisect_left(members, (frequency, order, node_id)))
+            if not members:
+                del self.by_category[node.get("category")]
+        return order
+
+    def partners(self, node):
+        """Ids of the indexed nodes that node connects to (itself excluded)"""
+        node_id = node["id"]
+        dimension = node.get("dimension")
+        found = [other_id for _, other_id in self.by_dimension.get(dimension, ()) if other_id != node_id]
+
+        frequency = node.get("frequency", 0)
+        members = self.by_category.get(node.get("category"))
+        if frequency > 0 and members:
+            for low, high in HARMONIC_WINDOWS:
+                start = bisect_left(members, (frequency * low,))
+                end = bisect_right(members, (frequency * high, float("inf")))
+                found.extend(
+                    other_id for _, _, other_id in members[start:end]
+                    if self.nodes[other_id].get("dimension") != dimension
+                )
+        return found
+
+    def link(self, node):
+        """Create node's connections and the matching reverse connections; returns the partner ids"""
+        node_id = node["id"]
+        connections = node.setdefault("connections", [])
+        linked = []
+        for other_id in self.partners(node):
+            other_node = self.nodes[other_id]
+            # connection_strength is symmetric, so one evaluation serves both directions
+            strength = connection_strength(node, other_node)
+            if strength <= self.threshold:
+                continue
+            connection_type = "harmonic" if node.get("dimension") == other_node.get("dimension") else "complementary"
+            self.insert_connection(connections, {
+                "target_id": other_id, "strength": strength, "type": connection_type, "active": True
+            })
+            self.insert_connection(other_node.setdefault("connections", []), {
+                "target_id": node_id, "strength": strength, "type": connection_type, "active": True
+            })
+            linked.append(other_id)
+        return linked
+
+    def unlink(self, node):
+        """Drop node's connections and every reverse connection pointing at it; returns the partner ids"""
+        node_id = node["id"]
+        unlinked = []
+        for connection in node.get("connections", ()):
+            other_node = self.nodes.get(connection["target_id"])
+            if other_node is None:
+                continue
+            self.remove_connection(other_node.get("connections", []), node_id)
+            unlinked.append(connection["target_id"])
+        node["connections"] = []
+        return unlinked
+
+    def connection_order(self, connection):
+        return self.order.get(connection["target_id"], -1)
+
+    def insert_connection(self, connections, connection):
+        insort(connections, connection, key=self.connection_order)
+
+    def remove_connection(self, connections, target_id):
+        position = bisect_left(connections, self.order[target_id], key=self.connection_order)
+        if position < len(connections) and connections[position]["target_id"] == target_id:
+            connections.pop(position)
+        else:
+            # Lists not built through the index may be out of order; fall back to a scan
+            connections[:] = [c for c in connections if c["target_id"] != target_id]
+
+    def add(self, node):
+        """Index a new node and connect it; returns the ids whose connections changed"""
+        if node["id"] in self.nodes:
+            raise ValueError(f"Knowledge node {node['id']} is already indexed")
+        self.register(node)
+        return self.link(node)
+
+    def remove(self, node_id):
+        """Disconnect and forget a node; returns the ids whose connections changed"""
+        node = self.nodes[node_id]
+        unlinked = self.unlink(node)
+        self.unregister(node)
+        return unlinked
+
+    def update(self, node_id, changes):
+        """Apply field changes to a node, relinking it only when a relationship field changed"""
+        node = self.nodes[node_id]
+        if not any(key in changes and changes[key] != node.get(key) for key in ("dimension", "category", "frequency")):
+            node.update(changes)
+            return []
+
+        unlinked = self.unlink(node)
+        order = self.unregister(node)
+        node.update(changes)
+        self.register(node, order)
+        linked = self.link(node)
+        return list(dict.fromkeys(unlinked + linked))
@@ -0,0 +1,23 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Module object for a top-level module that is only executed on first attribute access.
+
+    Lets a module keep `pygame.xxx`-style references to a heavy dependency
+    while scripts that never touch those code paths skip loading it. Follows
+    the importlib.util.LazyLoader recipe from the standard library docs.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -6,16 +6,28 @@ import os
 from pygame import gfxdraw
 import time
 from datetime import datetime
+from cosmic_profiler import FrameProfiler
+from cosmic_clock import SimulationClock
+from cosmic_display import DirtyRectTracker, FramePacer, app_options, build_gradient_background, create_screen, headless_requested, init_pygame, run_frame_loop
 
 class CosmicLibrary:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, dirty_rects=None, target_fps=60, idle_fps=10, headless=None,
+                 pause_when_unfocused=None):
+        init_pygame(headless)
         self.width, self.height = 1200, 800
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.screen = create_screen((self.width, self.height), headless=headless)
         pygame.display.set_caption("Cosmic Library - Akashic Records")
         self.clock = pygame.time.Clock()
+        self.pacer = FramePacer(target_fps, idle_fps, pause_when_unfocused=pause_when_unfocused, clock=self.clock)
+        # Fixed-step animation clock; headless runs count exactly one step per frame
+        self.simulation = SimulationClock(frame_time=1 / 60 if headless_requested(headless) else None)
+        self.profiler = FrameProfiler()
         self.running = True
         
+        # Display updates (full flip or dirty rectangles only)
+        self.dirty_tracker = DirtyRectTracker(dirty_rects)
+        self.background = None
+        
         # Fonts
         self.font_small = pygame.font.SysFont('Arial', 16)
         self.font = pygame.font.SysFont('Arial', 24)
@@ -23,7 +35,6 @@ class CosmicLibrary:
         
         # Library data
         self.library_path = "cosmic_data"
-        self.ensure_library_exists()
         self.categories = [
             "Universal Knowledge",
             "Cosmic Events",
@@ -33,6 +44,7 @@ class CosmicLibrary:
             "Vibrational Data",
             "Timeline Recordings"
         ]
+        self.ensure_library_exists()
         
         # Visual elements
         self.stars = []
@@ -78,20 +90,16 @@ class CosmicLibrary:
     def update_stars(self):
         for star in self.stars:
             # Make stars twinkle
-            brightness = 150 + 105 * math.sin(time.time() * star['twinkle_rate'] * 10)
+            brightness = 150 + 105 * math.sin(self.simulation.render_time * star['twinkle_rate'] * 10)
             star['color'] = (brightness, brightness, brightness)
     
     def draw_cosmic_background(self):
-        # Create a dark gradient background
-        for y in range(self.height):
-            # Calculate gradient colors
-            gradient_factor = y / self.height
-            r = int(5 + 20 * gradient_factor)
-            g = int(5 + 10 * gradient_factor)
-            b = int(30 + 20 * gradient_factor)
-            
-            # Draw a line with the calculated color
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.width, y))
+        # Render the dark gradient background once and reuse it every frame
+        if self.background is None or self.background.get_size() != (self.width, self.height):
+            self.background = build_gradient_background(
+                (self.width, self.height), (5, 5, 30), (25, 15, 50)
+            )
+        self.screen.blit(self.background, (0, 0))
     
     def draw_stars(self):
         for star in self.stars:
@@ -127,7 +135,7 @@ class CosmicLibrary:
             rect = pygame.Rect(self.width // 2 - 200, start_y + i * category_height, 400, 60)
             
             # Draw glowing box
-            glow_factor = 0.5 + 0.5 * math.sin(time.time() * 2 + i * 0.5)
+            glow_factor = 0.5 + 0.5 * math.sin(self.simulation.render_time * 2 + i * 0.5)
             glow_color = (
                 int(40 + 40 * glow_factor),
                 int(20 + 30 * glow_factor),
@@ -431,31 +439,32 @@ class CosmicLibrary:
             else:
                 self.input_text += unicode
         
-    def run(self):
-        while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left click
-                        self.handle_click(event.pos)
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE and not self.input_active:
-                        self.running = False
-                    else:
-                        self.handle_key(event.key, event.unicode)
-            
-            # Update and draw
+    def draw_frame(self):
+        # Update and draw, timing each phase for the profiler overlay
+        with self.profiler.phase("update"):
+            self.simulation.advance()
             self.update_stars()
+        with self.profiler.phase("background"):
             self.draw_cosmic_background()
+        with self.profiler.phase("stars"):
             self.draw_stars()
+        with self.profiler.phase("interface"):
             self.draw_library_interface()
-            
-            pygame.display.flip()
-            self.clock.tick(60)
         
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:  # Left click
+                self.handle_click(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE and not self.input_active:
+                self.running = False
+            else:
+                self.handle_key(event.key, event.unicode)
+        
+    def run(self):
+        run_frame_loop(self, self.handle_event)
         pygame.quit()
 
 if __name__ == "__main__":
-    app = CosmicLibrary()
+    app = CosmicLibrary(**app_options(description="Cosmic Library - Akashic Records"))
     app.run()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import hashlib
+
+EMPTY_ROOT = hashlib.sha256(b"").hexdigest()
+
+
+class MerkleTree:
+    """Merkle root over a stream of leaf hashes, in O(log n) memory.
+
+    Leaves are hex sha256 digests supplied by the caller (one per record).
+    Interior nodes hash b"\\x01" + left + right, so an interior digest can
+    never be mistaken for a leaf. Completed subtrees wait on a stack until a
+    sibling of the same height arrives, like carries in a binary counter; an
+    unpaired subtree at the end is folded in as it stands (the RFC 6962 tree
+    shape), so the root does not depend on how the leaves were batched.
+    """
+
+    def __init__(self):
+        self.stack = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, leaf_hash):
+        """Append one leaf (hex digest)"""
+        digest = bytes.fromhex(leaf_hash)
+        height = 0
+        while self.stack and self.stack[-1][0] == height:
+            _, left = self.stack.pop()
+            digest = hashlib.sha256(b"\x01" + left + digest).digest()
+            height += 1
+        self.stack.append((height, digest))
+        self.count += 1
+
+    def extend(self, leaf_hashes):
+        for leaf_hash in leaf_hashes:
+            self.add(leaf_hash)
+
+    @property
+    def root(self):
+        """Hex root of the leaves added so far (sha256 of nothing when empty)"""
+        if not self.stack:
+            return EMPTY_ROOT
+        digest = self.stack[-1][1]
+        for _, left in reversed(self.stack[:-1]):
+            digest = hashlib.sha256(b"\x01" + left + digest).digest()
+        return digest.hex()
+
+    @classmethod
+    def root_of(cls, leaf_hashes):
+        tree = cls()
+        tree.extend(leaf_hashes)
+        return tree.root
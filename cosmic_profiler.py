@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import pygame
+
+
+class FrameProfiler:
+    """Per-phase frame timing for the pygame apps.
+
+    Timings for the last `capacity` frames are kept in a ring buffer. Each
+    frame is bracketed by begin_frame()/end_frame() and its phases are timed
+    with the phase(name) context manager. F3 toggles an overlay with the
+    p50/p95/p99 frame times and the most expensive phases; F4 writes the
+    buffered frames as a Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    OVERLAY_KEY = pygame.K_F3
+    EXPORT_KEY = pygame.K_F4
+
+    def __init__(self, capacity=600, trace_dir="cosmic_profiles", log_interval=10.0):
+        self.frames = deque(maxlen=capacity)
+        self.trace_dir = trace_dir
+        self.log_interval = log_interval
+        self.overlay_visible = False
+        self.origin = time.perf_counter()
+        self.last_log = self.origin
+        self.frame_start = None
+        self.current_phases = []
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.current_phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """Time one phase of the current frame"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current_phases.append((name, start, time.perf_counter() - start))
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        end = time.perf_counter()
+        self.frames.append((self.frame_start, end - self.frame_start, self.current_phases))
+        self.frame_start = None
+
+        if self.log_interval and end - self.last_log >= self.log_interval:
+            self.last_log = end
+            self.log_summary()
+
+    def frame_times(self):
+        return [duration for _, duration, _ in self.frames]
+
+    def percentiles(self, fractions=(0.50, 0.95, 0.99)):
+        """Frame-time percentiles in milliseconds over the buffered frames"""
+        ordered = sorted(self.frame_times())
+        if not ordered:
+            return {fraction: 0.0 for fraction in fractions}
+        last = len(ordered) - 1
+        return {
+            fraction: ordered[min(last, int(round(fraction * last)))] * 1000
+            for fraction in fractions
+        }
+
+    def phase_means(self):
+        """Mean milliseconds per frame spent in each phase"""
+        totals = {}
+        for _, _, phases in self.frames:
+            for name, _, duration in phases:
+                totals[name] = totals.get(name, 0.0) + duration
+        count = max(1, len(self.frames))
+        return {name: total * 1000 / count for name, total in totals.items()}
+
+    def top_phases(self, count=5):
+        return sorted(self.phase_means().items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def summary_text(self):
+        p = self.percentiles()
+        phases = ", ".join(f"{name} {ms:.2f}" for name, ms in self.top_phases(3))
+        return (
+            f"frames {len(self.frames)} | p50 {p[0.50]:.2f} ms p95 {p[0.95]:.2f} ms "
+            f"p99 {p[0.99]:.2f} ms | {phases}"
+        )
+
+    def log_summary(self):
+        if self.frames:
+            print(f"Frame profile: {self.summary_text()}")
+
+    def handle_key(self, key):
+        """Profiler hotkeys; returns True when the key was consumed"""
+        if key == self.OVERLAY_KEY:
+            self.overlay_visible = not self.overlay_visible
+            return True
+        if key == self.EXPORT_KEY:
+            path = self.export_chrome_trace()
+            print(f"Frame trace written to {path}")
+            return True
+        return False
+
+    def draw_overlay(self, screen, font):
+        """Draw the frame-time panel when it is toggled on"""
+        if not self.overlay_visible:
+            return
+
+        p = self.percentiles()
+        lines = [
+            f"Frame time  p50 {p[0.50]:.2f}  p95 {p[0.95]:.2f}  p99 {p[0.99]:.2f} ms",
+            f"Buffered frames: {len(self.frames)}"
+        ]
+        lines += [f"{name:<24}{ms:>8.2f} ms" for name, ms in self.top_phases(6)]
+
+        line_height = font.get_linesize()
+        panel = pygame.Rect(0, 10, 340, line_height * len(lines) + 16)
+        panel.centerx = screen.get_width() // 2
+
+        background = pygame.Surface(panel.size, pygame.SRCALPHA)
+        background.fill((10, 10, 25, 210))
+        screen.blit(background, panel)
+        pygame.draw.rect(screen, (100, 150, 250), panel, 1)
+
+        for i, line in enumerate(lines):
+            color = (255, 220, 150) if i == 0 else (220, 220, 255)
+            text = font.render(line, True, color)
+            screen.blit(text, (panel.left + 8, panel.top + 8 + i * line_height))
+
+    def chrome_trace(self):
+        """Buffered frames as Chrome trace events (complete events, microseconds)"""
+        events = []
+        for start, duration, phases in self.frames:
+            events.append({
+                "name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                "ts": (start - self.origin) * 1e6, "dur": duration * 1e6
+            })
+            for name, phase_start, phase_duration in phases:
+                events.append({
+                    "name": name, "ph": "X", "pid": 1, "tid": 1,
+                    "ts": (phase_start - self.origin) * 1e6, "dur": phase_duration * 1e6
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path=None):
+        """Write the trace file and return its path"""
+        if path is None:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(self.trace_dir, f"frame_trace_{stamp}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
@@ -1,4 +1,4 @@
-import pygame
+import importlib
 import random
 import math
 import json
@@ -6,6 +6,12 @@ import os
 import time
 from datetime import datetime
 from dataclasses import dataclass, asdict
+from cosmic_clock import SimulationClock
+from cosmic_lazy import lazy_import
+
+# pygame only loads when the visualizer starts; scripts that just drive
+# RealityForge (saving, loading, exporting realities) never pay for it
+pygame = lazy_import("pygame")
 
 # Reality Editor Core
 @dataclass
@@ -131,12 +137,23 @@ class RealityForge:
 
 # Reality Visualization System
 class CosmicRealityVisualizer:
-    def __init__(self, forge=None):
-        pygame.init()
+    def __init__(self, forge=None, target_fps=60, idle_fps=10, headless=None,
+                 pause_when_unfocused=None):
+        # The display stack is imported here rather than with the module (see lazy pygame above)
+        from cosmic_display import DirtyRectTracker, FramePacer, create_screen, headless_requested, init_pygame
+        from cosmic_profiler import FrameProfiler
+        importlib.import_module("pygame.gfxdraw")
+        
+        init_pygame(headless)
         self.width, self.height = 1280, 800
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.screen = create_screen((self.width, self.height), headless=headless)
         pygame.display.set_caption("Cosmic Reality Forge")
         self.clock = pygame.time.Clock()
+        self.pacer = FramePacer(target_fps, idle_fps, pause_when_unfocused=pause_when_unfocused, clock=self.clock)
+        # Fixed-step animation clock; headless runs count exactly one step per frame
+        self.simulation = SimulationClock(frame_time=1 / 60 if headless_requested(headless) else None)
+        self.profiler = FrameProfiler()
+        self.dirty_tracker = DirtyRectTracker(False)
         self.running = True
         
         # Reality Forge
@@ -246,7 +263,7 @@ class CosmicRealityVisualizer:
     def update_stars(self):
         for star in self.stars:
             # Make stars twinkle
-            brightness = 150 + 105 * math.sin(time.time() * star['twinkle_rate'] * 10)
+            brightness = 150 + 105 * math.sin(self.simulation.render_time * star['twinkle_rate'] * 10)
             star['color'] = (brightness, brightness, brightness)
     
     def update_energy_particles(self):
@@ -415,7 +432,7 @@ class CosmicRealityVisualizer:
             node_y = center_y + radius * math.sin(angle)
             
             # Animated glow effect
-            pulse = 0.5 + 0.5 * math.sin(time.time() * 1.5 + i * 0.7)
+            pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.5 + i * 0.7)
             node_color = self.colors.get(field, self.colors['accent1'])
             
             # Adjust brightness based on pulse
@@ -448,7 +465,7 @@ class CosmicRealityVisualizer:
             self.screen.blit(value_text, value_rect)
         
         # Draw center node
-        center_pulse = 0.5 + 0.5 * math.sin(time.time() * 2)
+        center_pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 2)
         center_radius = 50 + 10 * center_pulse
         
         # Multi-colored center node
@@ -524,7 +541,7 @@ class CosmicRealityVisualizer:
             border_width = 3 if is_active else 1
             
             # Draw field background with slight animation
-            pulse = 0.5 + 0.5 * math.sin(time.time() * 1.5 + i * 0.3)
+            pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.5 + i * 0.3)
             bg_color = (
                 int(30 + 15 * pulse if is_active else 20),
                 int(30 + 15 * pulse if is_active else 20),
@@ -605,7 +622,7 @@ class CosmicRealityVisualizer:
                 rect = pygame.Rect(self.width // 2 - 400, start_y + i * item_height, 800, item_height - 20)
                 
                 # Animated highlight for items
-                pulse = 0.5 + 0.5 * math.sin(time.time() * 1.0 + i * 0.3)
+                pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.0 + i * 0.3)
                 item_color = (
                     int(20 + 10 * pulse),
                     int(20 + 10 * pulse),
@@ -794,7 +811,7 @@ class CosmicRealityVisualizer:
             node_y = center_y + radius * math.sin(angle)
             
             # Animated glow effect
-            pulse = 0.5 + 0.5 * math.sin(time.time() * 1.5 + i * 0.7)
+            pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 1.5 + i * 0.7)
             node_color = self.colors.get(field, self.colors['accent1'])
             
             # Adjust brightness based on pulse
@@ -823,7 +840,7 @@ class CosmicRealityVisualizer:
             self.screen.blit(value_text, value_rect)
         
         # Draw center node
-        center_pulse = 0.5 + 0.5 * math.sin(time.time() * 2)
+        center_pulse = 0.5 + 0.5 * math.sin(self.simulation.render_time * 2)
         center_radius = 40 + 10 * center_pulse
         
         # Multi-colored center node
@@ -1070,34 +1087,26 @@ class CosmicRealityVisualizer:
             else:
                 self.save_description += unicode
     
-    def run(self):
-        while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left click
-                        self.handle_click(event.pos)
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE and not self.save_mode:
-                        if self.active_view != "main":
-                            self.active_view = "main"
-                        else:
-                            self.running = False
-                    else:
-                        self.handle_key(event.key, event.unicode)
-            
-            # Update elements
+    def draw_frame(self):
+        """Update the animations and draw the active view"""
+        # Update elements
+        with self.profiler.phase("update"):
+            steps = self.simulation.advance()
             self.update_stars()
-            self.update_energy_particles()
-            self.update_reality_particles()
-            
-            # Draw everything
+            # Particles move a fixed distance per simulation step, whatever the frame rate
+            for _ in range(steps):
+                self.update_energy_particles()
+                self.update_reality_particles()
+        
+        # Draw everything
+        with self.profiler.phase("background"):
             self.draw_cosmic_background()
+        with self.profiler.phase("stars_particles"):
             self.draw_stars()
             self.draw_energy_particles()
-            
-            # Draw the appropriate interface
+        
+        # Draw the appropriate interface
+        with self.profiler.phase("interface"):
             if self.active_view == "main":
                 self.draw_main_interface()
             elif self.active_view == "edit":
@@ -1106,20 +1115,42 @@ class CosmicRealityVisualizer:
                 self.draw_saved_realities()
             elif self.active_view == "detail":
                 self.draw_reality_detail()
-            
-            # Draw reality change particles
+        
+        # Draw reality change particles
+        with self.profiler.phase("reality_particles"):
             self.draw_reality_particles()
-            
-            # Draw save interface if active
+        
+        # Draw save interface if active
+        with self.profiler.phase("interface"):
             if self.save_mode:
                 self.draw_save_interface()
             
             # Draw notifications
             self.draw_notification()
-            
-            pygame.display.flip()
-            self.clock.tick(60)
+    
+    def is_animating(self):
+        """Reality change bursts and notification fades need the full frame rate"""
+        if self.particles:
+            return True
+        return self.notification is not None and time.time() < self.notification_timer
+    
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:  # Left click
+                self.handle_click(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE and not self.save_mode:
+                if self.active_view != "main":
+                    self.active_view = "main"
+                else:
+                    self.running = False
+            else:
+                self.handle_key(event.key, event.unicode)
+    
+    def run(self):
+        from cosmic_display import run_frame_loop
         
+        run_frame_loop(self, self.handle_event, self.is_animating)
         pygame.quit()
 
 # Helper function to initialize with sample data
@@ -1190,6 +1221,7 @@ if __name__ == "__main__":
     forge = initialize_sample_realities()
     
     # Run the visualizer
-    app = CosmicRealityVisualizer(forge)
+    from cosmic_display import app_options
+    app = CosmicRealityVisualizer(forge, **app_options(description="Cosmic Reality Forge"))
     app.show_notification("Welcome to the Cosmic Reality Forge", (180, 220, 255), 5)
     app.run()
\ No newline at end of file
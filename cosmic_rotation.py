@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+
+AXES = {"x": (1.0, 0.0, 0.0), "y": (0.0, 1.0, 0.0), "z": (0.0, 0.0, 1.0)}
+
+
+class Quaternion:
+    """Unit quaternion for single 3D rotations, in plain Python floats.
+
+    Covers what the cube's camera needs from scipy's Rotation (Euler and
+    rotation-vector construction, composition, inverse, matrices) without
+    scipy's per-call overhead, which dominates when rotations are built one
+    at a time. Composition follows scipy: (p * q) applies q first, then p.
+    Instances are immutable; every operation returns a new quaternion.
+    """
+
+    __slots__ = ("w", "x", "y", "z")
+
+    def __init__(self, w=1.0, x=0.0, y=0.0, z=0.0):
+        self.w = w
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @classmethod
+    def identity(cls):
+        return cls()
+
+    @classmethod
+    def from_axis_angle(cls, axis, angle):
+        """Rotation by angle radians about an axis letter ('x', 'y', 'z') or a 3-vector"""
+        ax, ay, az = AXES[axis] if isinstance(axis, str) else axis
+        norm = math.sqrt(ax * ax + ay * ay + az * az)
+        if norm == 0.0:
+            return cls()
+        s = math.sin(angle / 2) / norm
+        return cls(math.cos(angle / 2), ax * s, ay * s, az * s)
+
+    @classmethod
+    def from_euler(cls, seq, angles):
+        """Euler angles in scipy's convention: lowercase axes are extrinsic, uppercase intrinsic"""
+        if isinstance(angles, (int, float)):
+            angles = (angles,)
+        if len(seq) != len(angles):
+            raise ValueError(f"Expected {len(seq)} angles for sequence {seq!r}, got {len(angles)}")
+        result = cls()
+        for axis, angle in zip(seq, angles):
+            step = cls.from_axis_angle(axis.lower(), angle)
+            result = result * step if axis.isupper() else step * result
+        return result
+
+    @classmethod
+    def from_rotvec(cls, rotvec):
+        """Rotation about the vector's direction by its length in radians"""
+        x, y, z = rotvec
+        return cls.from_axis_angle((x, y, z), math.sqrt(x * x + y * y + z * z))
+
+    @classmethod
+    def from_scipy(cls, rotation):
+        """Convert a scipy.spatial.transform.Rotation (scalar-last quaternion)"""
+        x, y, z, w = rotation.as_quat().tolist()
+        return cls(w, x, y, z)
+
+    def __mul__(self, other):
+        w1, x1, y1, z1 = self.w, self.x, self.y, self.z
+        w2, x2, y2, z2 = other.w, other.x, other.y, other.z
+        return Quaternion(
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+        )
+
+    def __repr__(self):
+        return f"Quaternion(w={self.w:.6f}, x={self.x:.6f}, y={self.y:.6f}, z={self.z:.6f})"
+
+    def inv(self):
+        return Quaternion(self.w, -self.x, -self.y, -self.z)
+
+    def normalized(self):
+        """Same rotation rescaled to unit length (long chains of products drift slowly)"""
+        norm = math.sqrt(self.w * self.w + self.x * self.x + self.y * self.y + self.z * self.z)
+        return Quaternion(self.w / norm, self.x / norm, self.y / norm, self.z / norm)
+
+    def as_quat(self):
+        """(x, y, z, w), scipy's scalar-last order"""
+        return (self.x, self.y, self.z, self.w)
+
+    def as_rotvec(self):
+        w, x, y, z = self.w, self.x, self.y, self.z
+        if w < 0:
+            w, x, y, z = -w, -x, -y, -z
+        sin_half = math.sqrt(x * x + y * y + z * z)
+        if sin_half < 1e-12:
+            return (2 * x, 2 * y, 2 * z)
+        scale = 2 * math.atan2(sin_half, w) / sin_half
+        return (x * scale, y * scale, z * scale)
+
+    def as_matrix(self):
+        """3×3 rotation matrix as a numpy array"""
+        w, x, y, z = self.w, self.x, self.y, self.z
+        return np.array([
+            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)]
+        ])
+
+    def as_scipy(self):
+        """The same rotation as a scipy Rotation (scipy is only needed for this)"""
+        from scipy.spatial.transform import Rotation
+        return Rotation.from_quat(self.as_quat())
+
+    def slerp(self, other, t):
+        """Rotation a fraction t of the shortest way from this one to other"""
+        w2, x2, y2, z2 = other.w, other.x, other.y, other.z
+        dot = self.w * w2 + self.x * x2 + self.y * y2 + self.z * z2
+        if dot < 0:
+            # q and -q are the same rotation; take the shorter arc
+            w2, x2, y2, z2, dot = -w2, -x2, -y2, -z2, -dot
+        if dot > 0.9995:
+            # Nearly identical: linear interpolation is exact enough and avoids dividing by ~0
+            result = Quaternion(
+                self.w + (w2 - self.w) * t, self.x + (x2 - self.x) * t,
+                self.y + (y2 - self.y) * t, self.z + (z2 - self.z) * t
+            )
+            return result.normalized()
+        theta = math.acos(dot)
+        sin_theta = math.sin(theta)
+        a = math.sin((1 - t) * theta) / sin_theta
+        b = math.sin(t * theta) / sin_theta
+        return Quaternion(
+            a * self.w + b * w2, a * self.x + b * x2, a * self.y + b * y2, a * self.z + b * z2
+        )
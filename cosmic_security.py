@@ -4,18 +4,47 @@ import json
 import time
 import random
 import base64
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+from cosmic_archive import PackReader, PackWriter
+from cosmic_merkle import MerkleTree
+
+# نسخه قالب بسته رمزشده: نسخه ۲ توکن Fernet را همان‌طور که هست (متن base64 امن برای URL) نگه می‌دارد؛
+# بسته‌های قدیمی بدون envelope_version توکن را یک بار دیگر با base64 کدگذاری کرده بودند
+ENVELOPE_VERSION = 2
+
+# چک‌سام پشتیبان: ریشه درخت مرکل روی هش محتوای گره‌ها (برگ‌ها در فهرست پشتیبان ذخیره می‌شوند)؛
+# فهرست‌های قدیمی بدون checksum_method هش کل فهرست گره‌ها را دارند
+BACKUP_CHECKSUM_METHOD = "merkle-sha256"
+
+# فایل آرشیو بسته‌بندی‌شده پشتیبان (همه گره‌ها در یک فایل به جای یک فایل برای هر گره)
+BACKUP_ARCHIVE = "nodes.pack"
+
+# سیستم سبک فرایندهای کارگر پشتیبان‌گیری (فقط کلیدها و رمزکننده‌ها)
+_backup_worker = None
+
+def _init_backup_worker(encryption_keys):
+    """آماده‌سازی فرایند کارگر: encrypt_data فقط به کلیدها و مخزن رمزکننده‌ها نیاز دارد"""
+    global _backup_worker
+    _backup_worker = CosmicSecuritySystem.__new__(CosmicSecuritySystem)
+    _backup_worker.encryption_keys = encryption_keys
+    _backup_worker.ciphers = {}
+
+def _run_backup_task(task, batch):
+    """اجرای یک مرحله دسته‌ای پشتیبان (رمزنگاری یا رمزگشایی) در فرایند کارگر"""
+    return getattr(_backup_worker, task)(batch)
+
 class CosmicSecuritySystem:
     """
     سیستم امنیتی مکعب کیهانی:
     سامانه چندلایه برای محافظت از دانش بنیادین و تضمین دسترسی مجاز
     """
     
-    def __init__(self, founder_username, foundation_date):
+    def __init__(self, founder_username, foundation_date, rotate_keys=False):
         self.founder_username = founder_username
         self.foundation_date = foundation_date
         self.security_initialization_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -35,8 +64,17 @@ class CosmicSecuritySystem:
             "intentional": self.initialize_layer("intentional", "نیت", 7)
         }
         
-        # تولید کلیدهای رمزنگاری
-        self.encryption_keys = self.generate_encryption_keys()
+        # رمزکننده‌های Fernet هر لایه (در اولین استفاده ساخته و نگه داشته می‌شوند)
+        self.ciphers = {}
+        
+        # کلیدهای رمزنگاری: کلیدهای ذخیره‌شده بارگذاری می‌شوند و فقط کلیدهای
+        # موجود‌نبودن (راه‌اندازی اول) یا چرخش صریح به مشتق‌سازی PBKDF2 نیاز دارند
+        self.encryption_keys = self.load_encryption_keys()
+        missing = [name for name in self.key_names() if name not in self.encryption_keys]
+        if missing:
+            self.encryption_keys.update(self.generate_encryption_keys(missing))
+        if rotate_keys:
+            self.rotate_encryption_keys()
         
         # ایجاد رمزهای امنیتی بنیادین
         self.foundational_passwords = self.generate_foundational_passwords()
@@ -133,60 +171,116 @@ class CosmicSecuritySystem:
         key_material = f"{layer_name}-{security_level}-{self.founder_username}-{int(time.time())}"
         return hashlib.sha384(key_material.encode()).hexdigest()
     
-    def generate_encryption_keys(self):
-        """تولید کلیدهای رمزنگاری"""
+    def key_names(self):
+        """نام کلیدهای رمزنگاری: یک کلید برای هر لایه و کلید اصلی"""
+        return list(self.security_layers) + ["master"]
+    
+    def key_path(self, name):
+        filename = "master_key.json" if name == "master" else f"{name}_key.json"
+        return os.path.join(self.security_path, "keys", filename)
+    
+    def key_owner(self):
+        """شناسه مالک کلیدها (بنیان‌گذار و تاریخ پایه‌گذاری) برای تشخیص کلیدهای نصب دیگر"""
+        return hashlib.sha256(f"{self.founder_username}-{self.foundation_date}".encode()).hexdigest()[:16]
+    
+    def is_valid_key_entry(self, entry):
+        """بررسی ساختار کلید ذخیره‌شده و تعلق آن به همین بنیان‌گذار"""
+        if not isinstance(entry, dict) or not isinstance(entry.get("key"), str) or "key_id" not in entry:
+            return False
+        # فایل‌های قدیمی‌تر شناسه مالک ندارند و پذیرفته می‌شوند
+        if entry.get("owner", self.key_owner()) != self.key_owner():
+            return False
+        try:
+            return len(base64.urlsafe_b64decode(entry["key"])) == 32
+        except ValueError:
+            return False
+    
+    def load_encryption_keys(self):
+        """بارگذاری کلیدهای ذخیره‌شده در cosmic_security/keys (کلیدهای ناموجود یا نامعتبر حذف می‌شوند)"""
         keys = {}
-        
-        # برای هر لایه یک کلید رمزنگاری تولید می‌کنیم
-        for layer_name in self.security_layers:
-            # تولید کلید Fernet
-            password = f"{layer_name}-{self.founder_username}-{self.foundation_date}".encode()
-            salt = os.urandom(16)
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-            )
-            key = base64.urlsafe_b64encode(kdf.derive(password))
-            
-            keys[layer_name] = {
-                "key": key.decode(),
-                "salt": base64.b64encode(salt).decode(),
-                "creation_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "key_id": f"KEY-{layer_name.upper()}-{int(time.time())}"
-            }
-            
-            # ذخیره کلید در فایل جداگانه
-            key_path = os.path.join(self.security_path, "keys", f"{layer_name}_key.json")
-            with open(key_path, 'w') as f:
-                # نکته امنیتی: در یک سیستم واقعی، کلیدها نباید به صورت متن ساده ذخیره شوند
-                json.dump(keys[layer_name], f, indent=2)
-        
-        # کلید اصلی سیستم
-        master_password = f"MASTER-{self.founder_username}-{self.foundation_date}-COSMIC-CUBE".encode()
-        master_salt = os.urandom(16)
-        master_kdf = PBKDF2HMAC(
+        for name in self.key_names():
+            try:
+                with open(self.key_path(name), 'r') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if self.is_valid_key_entry(entry):
+                keys[name] = entry
+        return keys
+    
+    def derive_key_entry(self, name):
+        """مشتق‌سازی کلید Fernet یک لایه (یا کلید اصلی) با PBKDF2"""
+        # cryptography در اولین استفاده بارگذاری می‌شود تا import این ماژول سبک بماند
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        
+        if name == "master":
+            password = f"MASTER-{self.founder_username}-{self.foundation_date}-COSMIC-CUBE".encode()
+            iterations = 150000
+            key_id = f"MASTER-KEY-{int(time.time())}"
+        else:
+            password = f"{name}-{self.founder_username}-{self.foundation_date}".encode()
+            iterations = 100000
+            key_id = f"KEY-{name.upper()}-{int(time.time())}"
+        
+        salt = os.urandom(16)
+        kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
-            salt=master_salt,
-            iterations=150000,
+            salt=salt,
+            iterations=iterations,
         )
-        master_key = base64.urlsafe_b64encode(master_kdf.derive(master_password))
+        key = base64.urlsafe_b64encode(kdf.derive(password))
         
-        keys["master"] = {
-            "key": master_key.decode(),
-            "salt": base64.b64encode(master_salt).decode(),
+        return {
+            "key": key.decode(),
+            "salt": base64.b64encode(salt).decode(),
             "creation_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "key_id": f"MASTER-KEY-{int(time.time())}"
+            "key_id": key_id,
+            "owner": self.key_owner()
         }
-        
-        master_key_path = os.path.join(self.security_path, "keys", "master_key.json")
-        with open(master_key_path, 'w') as f:
-            json.dump(keys["master"], f, indent=2)
+    
+    def generate_encryption_keys(self, names=None, previous_keys=None, workers=None):
+        """تولید و ذخیره کلیدهای رمزنگاری (همه کلیدها یا فقط نام‌های داده‌شده)"""
+        names = list(names or self.key_names())
+        
+        # مشتق‌سازی‌ها مستقل‌اند و PBKDF2 در cryptography قفل GIL را آزاد می‌کند،
+        # پس هر کلید در یک رشته جداگانه (به تعداد هسته‌ها) مشتق می‌شود
+        if workers is None:
+            workers = min(len(names), os.cpu_count() or 1)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                keys = dict(zip(names, executor.map(self.derive_key_entry, names)))
+        else:
+            keys = {name: self.derive_key_entry(name) for name in names}
+        
+        for name in names:
+            # در چرخش کلید، کلیدهای قبلی برای رمزگشایی داده‌های قدیمی نگه داشته می‌شوند
+            previous = (previous_keys or {}).get(name)
+            if previous:
+                history = [{"key": previous["key"], "key_id": previous["key_id"]}] + previous.get("previous_keys", [])
+                keys[name]["previous_keys"] = history
+                # شناسه کلید بر پایه ثانیه است؛ چرخش در همان ثانیه نباید شناسه تکراری بسازد
+                if any(old["key_id"] == keys[name]["key_id"] for old in history):
+                    keys[name]["key_id"] += f"-R{len(history)}"
+            
+            # ذخیره کلید در فایل جداگانه
+            with open(self.key_path(name), 'w') as f:
+                # نکته امنیتی: در یک سیستم واقعی، کلیدها نباید به صورت متن ساده ذخیره شوند
+                json.dump(keys[name], f, indent=2)
         
         return keys
     
+    def rotate_encryption_keys(self, names=None):
+        """چرخش صریح کلیدها: مشتق‌سازی کلید جدید و نگه‌داشتن کلید قبلی برای رمزگشایی"""
+        rotated = self.generate_encryption_keys(names, previous_keys=self.encryption_keys)
+        self.encryption_keys.update(rotated)
+        
+        # رمزکننده لایه‌های چرخیده با کلیدهای جدید دوباره ساخته می‌شود
+        for name in rotated:
+            self.ciphers.pop(name, None)
+        return rotated
+    
     def generate_foundational_passwords(self):
         """تولید رمزهای بنیادین برای دسترسی بحرانی"""
         passwords = {}
@@ -498,9 +592,8 @@ class CosmicSecuritySystem:
         if layer_name not in self.encryption_keys:
             raise ValueError(f"کلید رمزنگاری برای لایه {layer_name} یافت نشد.")
         
-        # ایجاد رمزکننده Fernet با کلید لایه
-        key = self.encryption_keys[layer_name]["key"]
-        cipher = Fernet(key.encode())
+        # رمزکننده لایه از مخزن رمزکننده‌ها
+        cipher = self.get_cipher(layer_name)
         
         # تبدیل داده به رشته JSON و رمزنگاری
         if isinstance(data, (dict, list)):
@@ -510,9 +603,10 @@ class CosmicSecuritySystem:
         
         encrypted_data = cipher.encrypt(data)
         
-        # افزودن اطلاعات رمزنگاری
+        # افزودن اطلاعات رمزنگاری (توکن Fernet خودش متن ASCII است و کدگذاری دوباره لازم ندارد)
         result = {
-            "encrypted_data": base64.b64encode(encrypted_data).decode('utf-8'),
+            "envelope_version": ENVELOPE_VERSION,
+            "encrypted_data": encrypted_data.decode('ascii'),
             "encryption_method": "Fernet",
             "layer": layer_name,
             "key_id": self.encryption_keys[layer_name]["key_id"],
@@ -530,12 +624,14 @@ class CosmicSecuritySystem:
         if layer_name not in self.encryption_keys:
             raise ValueError(f"کلید رمزگشایی برای لایه {layer_name} یافت نشد.")
         
-        # ایجاد رمزگشا با کلید لایه
-        key = self.encryption_keys[layer_name]["key"]
-        cipher = Fernet(key.encode())
+        # رمزگشای لایه (کلیدهای قبلی لایه هم داده‌های رمزشده پیش از چرخش را باز می‌کنند)
+        cipher = self.get_cipher(layer_name)
         
-        # رمزگشایی داده‌ها
-        encrypted_data = base64.b64decode(encrypted_package["encrypted_data"])
+        # رمزگشایی داده‌ها (بسته‌های قدیمی یک لایه base64 اضافه دارند)
+        if encrypted_package.get("envelope_version", 1) >= 2:
+            encrypted_data = encrypted_package["encrypted_data"].encode('ascii')
+        else:
+            encrypted_data = base64.b64decode(encrypted_package["encrypted_data"])
         decrypted_data = cipher.decrypt(encrypted_data)
         
         # تلاش برای تبدیل به JSON
@@ -545,6 +641,20 @@ class CosmicSecuritySystem:
             # اگر JSON نیست، به صورت رشته برگردان
             return decrypted_data.decode('utf-8')
         
+    def get_cipher(self, layer_name):
+        """رمزکننده لایه، یک بار برای هر لایه ساخته می‌شود؛ با کلیدهای چرخیده MultiFernet است"""
+        cipher = self.ciphers.get(layer_name)
+        if cipher is None:
+            from cryptography.fernet import Fernet, MultiFernet
+            
+            # رمزنگاری همیشه با کلید فعلی؛ رمزگشایی کلیدهای قبلی را هم به ترتیب امتحان می‌کند
+            entry = self.encryption_keys[layer_name]
+            keys = [entry["key"]] + [old["key"] for old in entry.get("previous_keys", [])]
+            fernets = [Fernet(key.encode()) for key in keys]
+            cipher = fernets[0] if len(fernets) == 1 else MultiFernet(fernets)
+            self.ciphers[layer_name] = cipher
+        return cipher
+    
     def verify_authentication(self, username, password, additional_factors=None):
         """بررسی احراز هویت چندعاملی"""
         # شبیه‌سازی بررسی احراز هویت
@@ -592,29 +702,57 @@ class CosmicSecuritySystem:
             "access_level": authorized_user["authorization_level"]
         }
     
-    def backup_knowledge(self, knowledge_nodes):
-        """تهیه نسخه پشتیبان از گره‌های دانش"""
-        # تعیین مکان پشتیبان‌گیری
+    def backup_knowledge(self, knowledge_nodes, workers=None, batch_size=256, packed=False, incremental=False):
+        """تهیه نسخه پشتیبان از گره‌های دانش (افزایشی: فقط گره‌های تغییرکرده از آخرین پشتیبان)"""
+        # تعیین مکان پشتیبان‌گیری (دو پشتیبان در یک ثانیه پوشه جداگانه می‌گیرند)
         backup_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_folder = os.path.join(self.security_path, "backups", backup_time)
+        backups_dir = os.path.join(self.security_path, "backups")
+        stamp, n = backup_time, 1
+        while os.path.exists(os.path.join(backups_dir, backup_time)):
+            backup_time = f"{stamp}_{n}"
+            n += 1
+        backup_folder = os.path.join(backups_dir, backup_time)
         os.makedirs(backup_folder, exist_ok=True)
         
-        # رمزنگاری و ذخیره هر گره
+        # هش محتوای هر گره: گره‌ای که همین محتوا را در پشتیبان قبلی (یا پیش‌تر در همین پشتیبان)
+        # دارد دوباره رمزنگاری نمی‌شود و فقط به فایل ذخیره‌شده ارجاع می‌دهد
+        known = self.latest_backup_entries(exclude=backup_time) if incremental else {}
+        node_hashes, node_files, sources, stored = [], [], {}, []
+        checksum = MerkleTree()
         for i, node in enumerate(knowledge_nodes):
-            # انتخاب لایه رمزنگاری بر اساس بُعد گره
-            layer_name = node.get("dimension", "information")
-            if layer_name not in self.encryption_keys:
-                layer_name = "master"  # استفاده از کلید اصلی اگر لایه مناسب یافت نشد
-            
-            # رمزنگاری گره
-            encrypted_node = self.encrypt_data(node, layer_name)
-            
-            # ذخیره در فایل
-            node_filename = f"node_{i+1}_{node.get('id', str(i))}.enc"
-            node_path = os.path.join(backup_folder, node_filename)
-            
-            with open(node_path, 'w') as f:
-                json.dump(encrypted_node, f, indent=2)
+            node_hash = self.node_hash(node)
+            node_hashes.append(node_hash)
+            checksum.add(node_hash)
+            if node_hash in known:
+                source, filename = known[node_hash]
+                if source != backup_time:
+                    sources[str(i + 1)] = source
+            else:
+                filename = self.backup_filename(i, node)
+                known[node_hash] = (backup_time, filename)
+                stored.append((i, node))
+            node_files.append(filename)
+        
+        # رمزنگاری دسته‌ای گره‌ها در فرایندهای کارگر (به تعداد هسته‌ها) و نوشتن فایل‌ها
+        # در یک رشته نویسنده جداگانه؛ صف محدود جلوی انباشت دسته‌های نانوشته در حافظه را می‌گیرد
+        if workers is None:
+            workers = min(os.cpu_count() or 1, -(-len(stored) // batch_size))
+        workers = max(1, workers)
+        write_queue = queue.Queue(maxsize=2 * workers)
+        write_errors = []
+        writer = threading.Thread(
+            target=self.write_backup_files, args=(backup_folder, write_queue, write_errors, packed), daemon=True
+        )
+        writer.start()
+        try:
+            batches = self.backup_batches(stored, batch_size)
+            for records in self.map_backup_batches("encrypt_backup_batch", batches, workers):
+                write_queue.put(records)
+        finally:
+            write_queue.put(None)
+            writer.join()
+        if write_errors:
+            raise write_errors[0]
         
         # ایجاد فایل فهرست
         manifest = {
@@ -622,27 +760,281 @@ class CosmicSecuritySystem:
             "founder": self.founder_username,
             "node_count": len(knowledge_nodes),
             "encryption_layers_used": list(set(node.get("dimension", "information") for node in knowledge_nodes)),
-            "checksum": self.generate_backup_checksum(knowledge_nodes)
+            "checksum": checksum.root,
+            "checksum_method": BACKUP_CHECKSUM_METHOD,
+            "format": "packed" if packed else "files",
+            "stored_count": len(stored),
+            # نام فایل (یا رکورد آرشیو) هر گره به ترتیب، تا بازیابی بدون جستجو در پوشه انجام شود؛
+            # sources پشتیبانی را نشان می‌دهد که گره‌های بدون تغییر در آن ذخیره شده‌اند
+            "files": node_files,
+            "sources": sources,
+            "node_hashes": node_hashes
         }
+        if packed:
+            manifest["archive"] = BACKUP_ARCHIVE
         
+        # فهرست ابتدا در فایل موقت نوشته و سپس جایگزین می‌شود تا پشتیبان قطع‌شده فهرست نیمه‌کاره نداشته باشد
         manifest_path = os.path.join(backup_folder, "manifest.json")
-        with open(manifest_path, 'w') as f:
+        with open(manifest_path + ".tmp", 'w') as f:
             json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
         
         return {
             "success": True,
             "backup_location": backup_folder,
             "backup_time": backup_time,
-            "node_count": len(knowledge_nodes)
+            "node_count": len(knowledge_nodes),
+            "stored_count": len(stored)
         }
     
+    def node_hash(self, node):
+        """هش محتوای گره (مستقل از ترتیب کلیدها)"""
+        return hashlib.sha256(json.dumps(node, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def backup_order(self, backup_time):
+        """کلید مرتب‌سازی زمانی پوشه پشتیبان: (زمان، شماره پسوند)؛ ترتیب متنی ‎_10 را پیش از ‎_9 می‌گذارد"""
+        stamp, _, suffix = backup_time[:15], backup_time[15:16], backup_time[16:]
+        return stamp, int(suffix) if suffix.isdigit() else 0
+    
+    def latest_backup_entries(self, exclude=None):
+        """هش گره‌های آخرین پشتیبان سالم دارای هش محتوا: {هش: (پشتیبان ذخیره‌کننده، نام فایل)}"""
+        backups_dir = os.path.join(self.security_path, "backups")
+        if not os.path.isdir(backups_dir):
+            return {}
+        for backup_time in sorted(os.listdir(backups_dir), key=self.backup_order, reverse=True):
+            manifest_path = os.path.join(backups_dir, backup_time, "manifest.json")
+            if backup_time == exclude or not os.path.exists(manifest_path):
+                continue
+            # فهرست ناقص یا آسیب‌دیده (مثلاً از پشتیبان قطع‌شده) نادیده گرفته می‌شود و پشتیبان قبلی مبنا می‌شود
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"فهرست پشتیبان {backup_time} قابل خواندن نیست: {e}")
+                continue
+            if not isinstance(manifest, dict) or not all(
+                key in manifest for key in ("node_hashes", "files", "sources")
+            ):
+                continue
+            # ارجاع‌ها همیشه مستقیم به پشتیبانی است که فایل را دارد، پس زنجیره هرگز بلندتر نمی‌شود
+            sources = manifest["sources"]
+            return {
+                node_hash: (sources.get(str(i), backup_time), filename)
+                for i, (node_hash, filename) in enumerate(zip(manifest["node_hashes"], manifest["files"]), 1)
+            }
+        return {}
+    
+    def backup_filename(self, i, node):
+        """نام فایل گره i‌ام (از صفر) در پشتیبان"""
+        return f"node_{i+1}_{node.get('id', str(i))}.enc"
+    
+    def map_backup_batches(self, task, batches, workers):
+        """نتیجه متد دسته‌ای task برای هر دسته، به همان ترتیب؛ با بیش از یک کارگر در فرایندهای جداگانه"""
+        if workers > 1:
+            # multiprocessing فقط وقتی بارگذاری می‌شود که واقعاً کارگر جداگانه لازم باشد
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # رشته نویسنده پیش از ساخت کارگرها در حال اجراست؛ با fork ممکن است قفلی که آن رشته
+            # در همان لحظه نگه داشته (فایل، صف) در کارگر قفل بماند، پس کارگرها از forkserver
+            # (یا spawn در سیستم‌هایی که آن را ندارند) ساخته می‌شوند
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_backup_worker, initargs=(self.encryption_keys,)
+            ) as executor:
+                # حداکثر دو دسته برای هر کارگر در جریان است؛ ترتیب دسته‌ها حفظ می‌شود
+                pending = deque()
+                for batch in batches:
+                    pending.append(executor.submit(_run_backup_task, task, batch))
+                    if len(pending) >= 2 * workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        else:
+            for batch in batches:
+                yield getattr(self, task)(batch)
+    
+    def backup_batches(self, indexed_nodes, batch_size):
+        """دسته‌های (نام فایل، لایه، گره) برای رمزنگاری پشتیبان از (شماره از صفر، گره)"""
+        batch = []
+        for i, node in indexed_nodes:
+            # انتخاب لایه رمزنگاری بر اساس بُعد گره
+            layer_name = node.get("dimension", "information")
+            if layer_name not in self.encryption_keys:
+                layer_name = "master"  # استفاده از کلید اصلی اگر لایه مناسب یافت نشد
+            
+            batch.append((self.backup_filename(i, node), layer_name, node))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def encrypt_backup_batch(self, batch):
+        """رمزنگاری یک دسته گره؛ خروجی (نام فایل، محتوای فایل) برای نویسنده"""
+        # فایل‌ها JSON فشرده‌اند (بدون تورفتگی)؛ restore_knowledge هر دو شکل را می‌خواند
+        return [
+            (filename, json.dumps(self.encrypt_data(node, layer_name)).encode('utf-8'))
+            for filename, layer_name, node in batch
+        ]
+    
+    def write_backup_files(self, backup_folder, write_queue, errors, packed=False):
+        """رشته نویسنده: دسته‌های رمزشده را از صف می‌گیرد و روی دیسک می‌نویسد تا None برسد"""
+        archive = None
+        try:
+            if packed:
+                # همه گره‌ها به صورت قاب‌های پشت سر هم در یک فایل آرشیو نوشته می‌شوند
+                archive = PackWriter(os.path.join(backup_folder, BACKUP_ARCHIVE))
+            while True:
+                records = write_queue.get()
+                if records is None:
+                    return
+                if errors:
+                    # پس از خطا فقط صف خالی می‌شود تا تولیدکننده پشت صف پر نماند
+                    continue
+                try:
+                    for filename, payload in records:
+                        if archive is not None:
+                            archive.write(filename, payload)
+                        else:
+                            with open(os.path.join(backup_folder, filename), 'wb') as f:
+                                f.write(payload)
+                except Exception as e:
+                    # هر خطایی (نه فقط OSError) ثبت می‌شود و رشته زنده می‌ماند تا صف را خالی کند؛
+                    # در غیر این صورت تولیدکننده پشت صف پر برای همیشه منتظر می‌ماند
+                    errors.append(e)
+        except Exception as e:
+            errors.append(e)
+            # بدون آرشیو هم صف تا انتها خالی می‌شود
+            while write_queue.get() is not None:
+                pass
+        finally:
+            if archive is not None:
+                try:
+                    archive.close()
+                except Exception as e:
+                    errors.append(e)
+    
+    def read_backup_nodes(self, backup_folder, manifest, failures=None):
+        """بسته‌های رمزشده گره‌های پشتیبان به ترتیب، به صورت جریانی: (شماره گره، محتوای خام بسته)؛
+        شماره گره‌هایی که خوانده نمی‌شوند به failures افزوده می‌شود"""
+        if failures is None:
+            failures = []
+        if manifest.get("format") == "packed" and "files" not in manifest:
+            # آرشیو بسته‌بندی‌شده بدون فهرست فایل‌ها: قاب‌ها به ترتیب نوشتن خوانده می‌شوند؛
+            # آرشیو ناقص یا آسیب‌دیده گزارش می‌شود و گره‌های باقی‌مانده خراب شمرده می‌شوند
+            read = 0
+            try:
+                with PackReader(os.path.join(backup_folder, manifest["archive"])) as archive:
+                    for read, payload in enumerate(archive.frames(), 1):
+                        yield read, payload
+            except (OSError, ValueError) as e:
+                print(f"خطا در خواندن آرشیو پشتیبان {manifest.get('backup_time')}: {e}")
+                failures.extend(range(read + 1, manifest["node_count"] + 1))
+            return
+        
+        node_files = manifest.get("files")
+        if node_files is None:
+            # فهرست‌های قدیمی نام فایل‌ها را ندارند؛ پوشه یک بار خوانده و بر اساس شماره گره نگاشته می‌شود
+            numbered = {}
+            for filename in sorted(os.listdir(backup_folder)):
+                parts = filename.split("_", 2)
+                if filename.endswith(".enc") and parts[0] == "node" and len(parts) == 3 and parts[1].isdigit():
+                    numbered.setdefault(int(parts[1]), filename)
+            node_files = [numbered.get(i) for i in range(1, manifest["node_count"] + 1)]
+        
+        # گره‌های بدون تغییر از پشتیبان‌های قبلی خوانده می‌شوند (هر آرشیو یک بار باز می‌شود)
+        sources = manifest.get("sources", {})
+        backups_dir = os.path.dirname(backup_folder)
+        archives = {}
+        try:
+            for i, filename in enumerate(node_files, 1):
+                if filename is None:
+                    failures.append(i)
+                    continue
+                source = sources.get(str(i))
+                folder = backup_folder if source is None else os.path.join(backups_dir, source)
+                
+                if folder not in archives:
+                    try:
+                        archives[folder] = self.open_backup_archive(folder, None if source else manifest)
+                    except (OSError, ValueError) as e:
+                        # پشتیبان ارجاع‌شده در دسترس نیست؛ خطا یک بار گزارش و گره‌هایش رد می‌شوند
+                        print(f"خطا در خواندن پشتیبان {source or manifest.get('backup_time')}: {e}")
+                        archives[folder] = False
+                archive = archives[folder]
+                if archive is False:
+                    failures.append(i)
+                    continue
+                
+                # بارگیری گره رمزنگاری شده
+                try:
+                    if archive is None:
+                        with open(os.path.join(folder, filename), 'rb') as f:
+                            raw = f.read()
+                    else:
+                        reader, positions = archive
+                        raw = reader.read(positions[filename])
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"خطا در خواندن گره {i} از پشتیبان {source or manifest.get('backup_time')}: {e}")
+                    failures.append(i)
+                    continue
+                yield i, raw
+        finally:
+            for archive in archives.values():
+                if archive:
+                    archive[0].close()
+    
+    def node_numbers_text(self, numbers, limit=10):
+        """شماره گره‌ها برای پیام‌ها (حداکثر limit شماره)"""
+        return ", ".join(str(i) for i in numbers[:limit]) + ("، ..." if len(numbers) > limit else "")
+    
+    def open_backup_archive(self, backup_folder, manifest=None):
+        """آرشیو یک پشتیبان بسته‌بندی‌شده و جایگاه رکوردهایش بر اساس نام؛ None برای پشتیبان فایل‌به‌فایل"""
+        if manifest is None:
+            with open(os.path.join(backup_folder, "manifest.json"), 'r') as f:
+                manifest = json.load(f)
+        if manifest.get("format") != "packed":
+            return None
+        reader = PackReader(os.path.join(backup_folder, manifest["archive"]))
+        return reader, {name: position for position, (name, _, _) in enumerate(reader.index)}
+    
+    def restore_batches(self, raw_nodes, batch_size):
+        """دسته‌های (شماره گره، محتوای خام بسته) برای رمزگشایی"""
+        batch = []
+        for item in raw_nodes:
+            batch.append(item)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def decrypt_backup_batch(self, batch):
+        """رمزگشایی یک دسته (شماره گره، محتوای خام بسته)؛ خروجی (شماره، گره، هش گره، خطا)"""
+        # هش برگ هر گره همین‌جا (در فرایند کارگر) محاسبه می‌شود تا بررسی صحت هم موازی باشد
+        results = []
+        for i, raw in batch:
+            try:
+                node = self.decrypt_data(json.loads(raw))
+                results.append((i, node, self.node_hash(node), None))
+            except Exception as e:
+                results.append((i, None, None, str(e)))
+        return results
+    
     def generate_backup_checksum(self, knowledge_nodes):
         """تولید چک‌سام برای بررسی صحت نسخه پشتیبان"""
-        # ترکیب تمام داده‌ها و تولید هش
-        combined_data = json.dumps(knowledge_nodes, sort_keys=True).encode('utf-8')
-        return hashlib.sha256(combined_data).hexdigest()
+        # ریشه مرکل روی هش گره‌ها، به صورت جریانی و بدون ساختن JSON کل فهرست در حافظه
+        return MerkleTree.root_of(self.node_hash(node) for node in knowledge_nodes)
+    
+    def update_backup_checksum(self, checksum, i, node):
+        """چک‌سام پشتیبان‌های قدیمی: افزودن گره i‌ام (از صفر) با همان بایت‌های json.dumps(knowledge_nodes, sort_keys=True)"""
+        if i:
+            checksum.update(b", ")
+        checksum.update(json.dumps(node, sort_keys=True).encode('utf-8'))
     
-    def restore_knowledge(self, backup_time, authentication_result):
+    def restore_knowledge(self, backup_time, authentication_result, workers=None, batch_size=256):
         """بازیابی دانش از نسخه پشتیبان"""
         # بررسی مجاز بودن کاربر
         if not authentication_result["success"]:
@@ -665,35 +1057,61 @@ class CosmicSecuritySystem:
         with open(manifest_path, 'r') as f:
             manifest = json.load(f)
         
-        # بازیابی گره‌ها
+        # بازیابی گره‌ها: خواندن جریانی بسته‌ها و رمزگشایی دسته‌ای در فرایندهای کارگر؛
+        # چک‌سام هم‌زمان با رسیدن گره‌ها (به ترتیب) محاسبه می‌شود
+        if workers is None:
+            workers = min(os.cpu_count() or 1, -(-manifest["node_count"] // batch_size))
+        workers = max(1, workers)
+        # گره‌هایی که خوانده یا رمزگشایی نمی‌شوند (مثلاً یک بایت تغییرکرده در فایل یا قاب)
+        # همراه گره‌های ناهمخوان با هش برگ در corrupt_nodes برگردانده می‌شوند
+        failed_nodes = []
+        batches = self.restore_batches(self.read_backup_nodes(backup_folder, manifest, failed_nodes), batch_size)
+        merkle = manifest.get("checksum_method") == BACKUP_CHECKSUM_METHOD
+        checksum = MerkleTree() if merkle else hashlib.sha256(b"[")
         restored_nodes = []
-        for i in range(1, manifest["node_count"] + 1):
-            # جستجوی فایل گره
-            node_files = [f for f in os.listdir(backup_folder) if f.startswith(f"node_{i}_")]
-            
-            if not node_files:
-                continue
-                
-            node_path = os.path.join(backup_folder, node_files[0])
-            
-            # بارگیری گره رمزنگاری شده
-            with open(node_path, 'r') as f:
-                encrypted_node = json.load(f)
-            
-            # رمزگشایی گره
-            try:
-                node = self.decrypt_data(encrypted_node)
+        corrupt_nodes = []
+        for results in self.map_backup_batches("decrypt_backup_batch", batches, workers):
+            for i, node, node_hash, error in results:
+                if error is not None:
+                    print(f"خطا در رمزگشایی گره {i}: {error}")
+                    failed_nodes.append(i)
+                    continue
+                if merkle:
+                    # هر گره جداگانه با هش برگ خود در فهرست سنجیده می‌شود
+                    if node_hash != manifest["node_hashes"][i - 1]:
+                        corrupt_nodes.append(i)
+                    checksum.add(node_hash)
+                else:
+                    self.update_backup_checksum(checksum, len(restored_nodes), node)
                 restored_nodes.append(node)
-            except Exception as e:
-                print(f"خطا در رمزگشایی گره {i}: {e}")
+        if not merkle:
+            checksum.update(b"]")
         
         # بررسی صحت بازیابی
         if len(restored_nodes) != manifest["node_count"]:
+            corrupt_nodes = sorted(set(failed_nodes + corrupt_nodes))
+            message = f"بازیابی ناقص. {len(restored_nodes)} از {manifest['node_count']} گره بازیابی شد."
+            if corrupt_nodes:
+                message += f" گره‌های خراب: {self.node_numbers_text(corrupt_nodes)}"
             return {
                 "success": False, 
-                "message": f"بازیابی ناقص. {len(restored_nodes)} از {manifest['node_count']} گره بازیابی شد."
+                "message": message,
+                "corrupt_nodes": corrupt_nodes
             }
         
+        if corrupt_nodes:
+            listed = self.node_numbers_text(corrupt_nodes)
+            return {
+                "success": False,
+                "message": f"{len(corrupt_nodes)} گره با هش ثبت‌شده در فهرست مطابقت ندارد: {listed}",
+                "corrupt_nodes": corrupt_nodes
+            }
+        
+        # با برگ‌های درست، ناهمخوانی ریشه یعنی خود فهرست (هش برگ‌ها) دستکاری شده است
+        digest = checksum.root if merkle else checksum.hexdigest()
+        if "checksum" in manifest and digest != manifest["checksum"]:
+            return {"success": False, "message": "چک‌سام نسخه پشتیبان با گره‌های بازیابی‌شده مطابقت ندارد."}
+        
         return {
             "success": True,
             "message": f"{len(restored_nodes)} گره دانش با موفقیت بازیابی شد.",
@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class ScreenSpatialIndex:
+    """Uniform-grid index over projected screen positions for hover and click hit-testing.
+
+    rebuild() buckets the points into square cells and sorts them by cell key,
+    so a radius query only binary-searches the few rows of cells the query
+    circle overlaps instead of measuring the distance to every point.
+    """
+
+    def __init__(self, cell_size=32):
+        self.cell_size = float(cell_size)
+        self.positions = np.empty((0, 2))
+        self.order = np.empty(0, dtype=np.int64)
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.origin = np.zeros(2, dtype=np.int64)
+        self.columns = 0
+        self.rows = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def rebuild(self, positions):
+        """Index a (n, 2) array of screen positions; query results are row numbers into it"""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.positions = positions
+        valid = np.flatnonzero(np.isfinite(positions).all(axis=1))
+        if not len(valid):
+            self.order = np.empty(0, dtype=np.int64)
+            self.sorted_keys = np.empty(0, dtype=np.int64)
+            self.columns = self.rows = 0
+            return
+
+        cells = np.floor(positions[valid] / self.cell_size).astype(np.int64)
+        self.origin = cells.min(axis=0)
+        cells -= self.origin
+        self.columns, self.rows = (cells.max(axis=0) + 1).tolist()
+
+        keys = cells[:, 1] * self.columns + cells[:, 0]
+        # A stable sort keeps points of one cell in their original order
+        order = np.argsort(keys, kind="stable")
+        self.order = valid[order]
+        self.sorted_keys = keys[order]
+
+    def query_radius(self, point, radius):
+        """Row numbers of the points within radius of point, in ascending order"""
+        if not len(self.order):
+            return np.empty(0, dtype=np.int64)
+
+        x, y = point
+        first = np.floor(np.array([x - radius, y - radius]) / self.cell_size).astype(np.int64) - self.origin
+        last = np.floor(np.array([x + radius, y + radius]) / self.cell_size).astype(np.int64) - self.origin
+        col_first, row_first = max(0, first[0]), max(0, first[1])
+        col_last, row_last = min(self.columns - 1, last[0]), min(self.rows - 1, last[1])
+        if col_first > col_last or row_first > row_last:
+            return np.empty(0, dtype=np.int64)
+
+        # Within one row of cells the covered keys are contiguous
+        rows = np.arange(row_first, row_last + 1)
+        starts = np.searchsorted(self.sorted_keys, rows * self.columns + col_first, side="left")
+        ends = np.searchsorted(self.sorted_keys, rows * self.columns + col_last, side="right")
+        candidates = np.concatenate([self.order[s:e] for s, e in zip(starts, ends)])
+        if not len(candidates):
+            return candidates
+
+        offsets = self.positions[candidates] - (x, y)
+        inside = np.einsum("ij,ij->i", offsets, offsets) < radius * radius
+        return np.sort(candidates[inside])
+
+    def nearest(self, point, radius):
+        """Row number of the closest point within radius, or None"""
+        candidates = self.query_radius(point, radius)
+        if not len(candidates):
+            return None
+        offsets = self.positions[candidates] - point
+        return int(candidates[np.argmin(np.einsum("ij,ij->i", offsets, offsets))])
@@ -0,0 +1,79 @@
+import math
+
+import pygame
+import pygame.gfxdraw
+
+
+class GlowAtlas:
+    """Pre-rendered radial glow sprites, keyed by quantized color, radius and alpha.
+
+    A glow is a stack of concentric translucent circles. Instead of
+    rasterizing the stack with gfxdraw every frame, each distinct stack is
+    drawn once onto a black sprite and then blitted with additive blending,
+    so a glowing object costs one blit and a whole frame of glows can go
+    through a single Surface.blits() call. Sizes are quantized in half-pixel
+    steps up to small_size and in geometric steps above it. Glows wider than
+    max_radius (objects right in front of the camera) get no sprite; callers
+    draw those with draw_direct(), which gfxdraw clips to the target surface.
+    """
+
+    def __init__(self, alpha_levels=16, max_sprites=1024, max_radius=64, small_size=8, size_ratio=1.08):
+        self.alpha_step = 255 / (alpha_levels - 1)
+        self.max_sprites = max_sprites
+        self.max_radius = max_radius
+        self.small_size = small_size
+        self.log_ratio = math.log(size_ratio)
+        self.sprites = {}
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def quantize_alpha(self, alpha):
+        return int(round(round(max(0, min(255, alpha)) / self.alpha_step) * self.alpha_step))
+
+    def quantize_size(self, size):
+        if size <= self.small_size:
+            return round(size * 2) / 2
+        steps = round(math.log(size / self.small_size) / self.log_ratio)
+        return self.small_size * math.exp(steps * self.log_ratio)
+
+    def sprite(self, color, layers):
+        """Sprite for circles of (radius, alpha) drawn outermost first, or None when too large"""
+        key = (color, layers)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            radius = max(radius for radius, _ in layers)
+            if radius > self.max_radius:
+                return None
+            sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+            sprite.fill((0, 0, 0))
+            for layer_radius, alpha in layers:
+                pygame.gfxdraw.filled_circle(sprite, radius, radius, layer_radius, (*color, alpha))
+            if len(self.sprites) >= self.max_sprites:
+                self.sprites.clear()
+            self.sprites[key] = sprite
+        return sprite
+
+    def blit_entry(self, color, layers, center):
+        """(sprite, dest, area, flags) tuple for Surface.blits centering the glow on center, or None"""
+        sprite = self.sprite(color, layers)
+        if sprite is None:
+            return None
+        radius = sprite.get_width() // 2
+        return (sprite, (center[0] - radius, center[1] - radius), None, pygame.BLEND_ADD)
+
+    def draw_direct(self, surface, color, layers, center):
+        """Rasterize the glow straight onto surface (used for glows too large for a sprite)"""
+        for radius, alpha in layers:
+            pygame.gfxdraw.filled_circle(surface, center[0], center[1], radius, (*color, alpha))
+
+    def particle_layers(self, size, alpha):
+        """Energy-particle glow: three circles at 1.5x, 1x and 0.5x size with falling alpha"""
+        size = self.quantize_size(size)
+        alpha = self.quantize_alpha(alpha)
+        return tuple((int(size * (3 - i) / 2), alpha // (i + 1)) for i in range(3))
+
+    def node_layers(self, size):
+        """Knowledge-node halo: three circles at 2x, 1.33x and 0.67x size"""
+        size = self.quantize_size(size)
+        return tuple((int(size * (3 - i) / 1.5), 150 // (i + 1)) for i in range(3))
@@ -0,0 +1,55 @@
+import os
+import random
+
+import pytest
+
+from cosmic_archive import PackReader, PackWriter
+
+
+def sample_records(count, seed=0):
+    rng = random.Random(seed)
+    # Include empty payloads and payloads that look like frame headers
+    sizes = [0, 1, 4, 5] + [rng.randrange(0, 5000) for _ in range(max(0, count - 4))]
+    return [(f"node_{i + 1}.enc", rng.randbytes(size)) for i, size in enumerate(sizes[:count])]
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 200])
+def test_round_trip(tmp_path, count):
+    records = sample_records(count)
+    path = os.path.join(tmp_path, "nodes.pack")
+    with PackWriter(path) as writer:
+        for name, payload in records:
+            writer.write(name, payload)
+        assert len(writer) == count
+
+    with PackReader(path) as reader:
+        assert len(reader) == count
+        assert [name for name, _, _ in reader.index] == [name for name, _ in records]
+        assert list(reader.frames()) == [payload for _, payload in records]
+        # Random access through the index, out of write order
+        for position in reversed(range(count)):
+            assert reader.read(position) == records[position][1]
+
+
+def test_close_is_idempotent(tmp_path):
+    path = os.path.join(tmp_path, "nodes.pack")
+    writer = PackWriter(path)
+    writer.write("only", b"payload")
+    writer.close()
+    size = os.path.getsize(path)
+    writer.close()
+
+    assert os.path.getsize(path) == size
+    with PackReader(path) as reader:
+        assert reader.read(0) == b"payload"
+
+
+def test_unclosed_archive_is_rejected(tmp_path):
+    path = os.path.join(tmp_path, "nodes.pack")
+    writer = PackWriter(path)
+    writer.write("record", b"x" * 100)
+    writer.file.flush()
+
+    with pytest.raises(ValueError):
+        PackReader(path)
+    writer.close()
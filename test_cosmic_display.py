@@ -0,0 +1,95 @@
+import pygame
+import pytest
+
+from cosmic_clock import SimulationClock
+from cosmic_display import DirtyRectTracker, FramePacer, run_frame_loop
+from cosmic_profiler import FrameProfiler
+
+
+class LoopApp:
+    """Minimal app for run_frame_loop that records what the loop asked of it"""
+
+    def __init__(self):
+        self.screen = pygame.Surface((64, 48))
+        self.font_small = pygame.font.Font(None, 16)
+        self.profiler = FrameProfiler(log_interval=None)
+        self.pacer = FramePacer(target_fps=1000)
+        self.simulation = SimulationClock(frame_time=1 / 60)
+        self.dirty_tracker = DirtyRectTracker(False)
+        self.running = True
+        self.events = []
+        self.frames = 0
+        self.holds = 0
+        hold = self.simulation.hold
+
+        def counted_hold():
+            self.holds += 1
+            hold()
+
+        self.simulation.hold = counted_hold
+
+    def handle_event(self, event):
+        self.events.append(event.type)
+
+    def draw_frame(self):
+        self.frames += 1
+
+
+@pytest.fixture
+def scripted_events(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    script = []
+    monkeypatch.setattr(pygame.event, "get", lambda *args, **kwargs: script.pop(0) if script else [])
+    yield script
+    pygame.quit()
+
+
+def key(code):
+    return pygame.event.Event(pygame.KEYDOWN, key=code, unicode="", mod=0)
+
+
+def test_loop_draws_until_quit(scripted_events):
+    app = LoopApp()
+    scripted_events.extend([[], [key(pygame.K_a)], [pygame.event.Event(pygame.QUIT), key(pygame.K_b)]])
+
+    run_frame_loop(app, app.handle_event)
+
+    assert not app.running
+    assert app.frames == 3
+    # Events after QUIT in the same batch are still delivered
+    assert app.events == [pygame.KEYDOWN, pygame.KEYDOWN]
+    assert len(app.profiler.frames) == 3
+
+
+def test_profiler_hotkeys_are_not_passed_on(scripted_events):
+    app = LoopApp()
+    scripted_events.extend([[key(FrameProfiler.OVERLAY_KEY)], [pygame.event.Event(pygame.QUIT)]])
+
+    run_frame_loop(app, app.handle_event)
+
+    assert app.profiler.overlay_visible
+    assert app.events == []
+
+
+def test_minimized_window_holds_simulation_without_drawing(scripted_events):
+    app = LoopApp()
+    scripted_events.extend([
+        [pygame.event.Event(pygame.WINDOWMINIMIZED)], [],
+        [pygame.event.Event(pygame.WINDOWRESTORED)], [pygame.event.Event(pygame.QUIT)]
+    ])
+
+    run_frame_loop(app, app.handle_event)
+
+    assert app.holds == 2
+    assert app.frames == 2
+
+
+def test_is_animating_is_asked_every_frame(scripted_events):
+    app = LoopApp()
+    calls = []
+    scripted_events.extend([[], [pygame.event.Event(pygame.QUIT)]])
+
+    run_frame_loop(app, app.handle_event, lambda: calls.append(True) or True)
+
+    assert len(calls) == 2
@@ -0,0 +1,66 @@
+import copy
+
+import pytest
+
+from cosmic_benchmark import pairwise_relationships, relationship_test_nodes
+from cosmic_graph import RelationshipIndex, build_relationships
+
+
+def connected(nodes):
+    """Nodes with their connections built from scratch, as a fresh load would have them"""
+    nodes = copy.deepcopy(nodes)
+    for node, connections in zip(nodes, build_relationships(nodes)):
+        node["connections"] = connections
+    return nodes
+
+
+def connections_by_id(nodes):
+    return {node["id"]: node["connections"] for node in nodes}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_build_relationships_matches_all_pairs(seed):
+    # Few dimensions and categories, so same-dimension and cross-dimension harmonic partners both occur
+    nodes = relationship_test_nodes(300, dimensions=5, categories=4, seed=seed)
+
+    assert build_relationships(nodes) == pairwise_relationships(nodes)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_relationship_index_add_matches_rebuild(seed):
+    nodes = relationship_test_nodes(200, dimensions=5, categories=4, seed=seed)
+    index_nodes = connected(nodes[:150])
+    index = RelationshipIndex.from_nodes(index_nodes)
+
+    for node in copy.deepcopy(nodes[150:]):
+        index.add(node)
+        index_nodes.append(node)
+
+    assert connections_by_id(index_nodes) == connections_by_id(connected(nodes))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_relationship_index_remove_matches_rebuild(seed):
+    nodes = relationship_test_nodes(200, dimensions=5, categories=4, seed=seed)
+    index_nodes = connected(nodes)
+    index = RelationshipIndex.from_nodes(index_nodes)
+    removed = {node["id"] for node in nodes[::7]}
+
+    for node_id in removed:
+        index.remove(node_id)
+
+    remaining = [node for node in nodes if node["id"] not in removed]
+    assert connections_by_id(index.nodes.values()) == connections_by_id(connected(remaining))
+
+
+def test_relationship_index_remove_then_add_matches_rebuild():
+    nodes = relationship_test_nodes(120, dimensions=5, categories=4, seed=7)
+    index = RelationshipIndex.from_nodes(connected(nodes))
+    readded = copy.deepcopy(nodes[10])
+
+    index.remove(readded["id"])
+    index.add(readded)
+
+    # A re-added node goes to the end of the insertion order
+    expected = nodes[:10] + nodes[11:] + [nodes[10]]
+    assert connections_by_id(index.nodes.values()) == connections_by_id(connected(expected))
@@ -0,0 +1,56 @@
+import hashlib
+
+import pytest
+
+from cosmic_merkle import EMPTY_ROOT, MerkleTree
+
+
+def leaves(count):
+    return [hashlib.sha256(f"node {i}".encode()).hexdigest() for i in range(count)]
+
+
+def reference_root(leaf_hashes):
+    """RFC 6962 tree built top-down: left subtree holds the largest power of two below n"""
+    if len(leaf_hashes) == 1:
+        return bytes.fromhex(leaf_hashes[0])
+    split = 1
+    while split * 2 < len(leaf_hashes):
+        split *= 2
+    return hashlib.sha256(
+        b"\x01" + reference_root(leaf_hashes[:split]) + reference_root(leaf_hashes[split:])
+    ).digest()
+
+
+def test_empty_tree():
+    assert MerkleTree.root_of([]) == EMPTY_ROOT
+
+
+def test_single_leaf_is_its_own_root():
+    leaf = leaves(1)[0]
+    assert MerkleTree.root_of([leaf]) == leaf
+
+
+def test_two_and_three_leaves_by_hand():
+    a, b, c = (bytes.fromhex(leaf) for leaf in leaves(3))
+    ab = hashlib.sha256(b"\x01" + a + b).digest()
+    assert MerkleTree.root_of(leaves(2)) == ab.hex()
+    # The unpaired third leaf is folded in as it stands, not duplicated
+    assert MerkleTree.root_of(leaves(3)) == hashlib.sha256(b"\x01" + ab + c).hexdigest()
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 4, 5, 7, 8, 9, 17, 33, 64, 65, 100, 129])
+def test_streaming_root_matches_reference_tree(count):
+    assert MerkleTree.root_of(leaves(count)) == reference_root(leaves(count)).hex()
+
+
+def test_root_can_be_read_while_streaming():
+    tree = MerkleTree()
+    for count, leaf in enumerate(leaves(20), 1):
+        tree.add(leaf)
+        assert len(tree) == count
+        assert tree.root == reference_root(leaves(count)).hex()
+
+
+def test_root_depends_on_leaf_order():
+    forward = leaves(5)
+    assert MerkleTree.root_of(forward) != MerkleTree.root_of(forward[::-1])
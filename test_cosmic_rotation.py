@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pytest
+
+from cosmic_rotation import Quaternion
+
+QUARTER = math.pi / 2
+
+# Right-handed quarter turns about x, y and z
+RX90 = np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]])
+RY90 = np.array([[0, 0, 1], [0, 1, 0], [-1, 0, 0]])
+RZ90 = np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+
+
+def rotation_x(angle):
+    c, s = math.cos(angle), math.sin(angle)
+    return np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+
+
+def rotation_y(angle):
+    c, s = math.cos(angle), math.sin(angle)
+    return np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
+
+
+def rotation_z(angle):
+    c, s = math.cos(angle), math.sin(angle)
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+
+@pytest.mark.parametrize("axis, expected", [("x", RX90), ("y", RY90), ("z", RZ90)])
+def test_quarter_turn_matrices(axis, expected):
+    np.testing.assert_allclose(Quaternion.from_euler(axis, QUARTER).as_matrix(), expected, atol=1e-12)
+
+
+def test_identity_matrix():
+    np.testing.assert_allclose(Quaternion.identity().as_matrix(), np.eye(3))
+
+
+def test_extrinsic_euler_applies_first_axis_first():
+    a, b, c = 0.3, -1.1, 2.0
+    expected = rotation_z(c) @ rotation_y(b) @ rotation_x(a)
+    np.testing.assert_allclose(Quaternion.from_euler("xyz", (a, b, c)).as_matrix(), expected, atol=1e-12)
+
+
+def test_intrinsic_euler_composes_in_body_frame():
+    a, b, c = 0.3, -1.1, 2.0
+    expected = rotation_x(a) @ rotation_y(b) @ rotation_z(c)
+    np.testing.assert_allclose(Quaternion.from_euler("XYZ", (a, b, c)).as_matrix(), expected, atol=1e-12)
+
+
+def test_from_euler_rejects_wrong_angle_count():
+    with pytest.raises(ValueError):
+        Quaternion.from_euler("xy", (0.1,))
+
+
+def test_product_applies_right_operand_first():
+    p, q = Quaternion.from_euler("x", 0.4), Quaternion.from_euler("z", -0.9)
+    np.testing.assert_allclose((p * q).as_matrix(), p.as_matrix() @ q.as_matrix(), atol=1e-12)
+
+
+def test_inverse_is_transpose():
+    q = Quaternion.from_euler("xyz", (0.5, 0.2, -0.7))
+    np.testing.assert_allclose(q.inv().as_matrix(), q.as_matrix().T, atol=1e-12)
+    np.testing.assert_allclose((q * q.inv()).as_matrix(), np.eye(3), atol=1e-12)
+
+
+def test_rotvec_round_trip():
+    rotvec = (0.3, -0.4, 1.2)
+    q = Quaternion.from_rotvec(rotvec)
+    np.testing.assert_allclose(q.as_rotvec(), rotvec, atol=1e-12)
+    # Same rotation as the quaternion with flipped sign
+    np.testing.assert_allclose(Quaternion(-q.w, -q.x, -q.y, -q.z).as_rotvec(), rotvec, atol=1e-12)
+
+
+def test_normalized_keeps_rotation_and_restores_unit_length():
+    q = Quaternion.from_euler("xyz", (0.5, 0.2, -0.7))
+    scaled = Quaternion(3 * q.w, 3 * q.x, 3 * q.y, 3 * q.z).normalized()
+    assert math.isclose(scaled.w ** 2 + scaled.x ** 2 + scaled.y ** 2 + scaled.z ** 2, 1.0)
+    np.testing.assert_allclose(scaled.as_matrix(), q.as_matrix(), atol=1e-12)
+
+
+@pytest.mark.parametrize("end_angle", [QUARTER, 0.0005])
+def test_slerp_endpoints(end_angle):
+    start = Quaternion.from_euler("y", 0.2)
+    end = Quaternion.from_euler("xz", (end_angle, 0.3))
+    np.testing.assert_allclose(start.slerp(end, 0.0).as_matrix(), start.as_matrix(), atol=1e-12)
+    np.testing.assert_allclose(start.slerp(end, 1.0).as_matrix(), end.as_matrix(), atol=1e-12)
+
+
+def test_slerp_midpoint_is_half_the_angle():
+    middle = Quaternion.identity().slerp(Quaternion.from_euler("z", QUARTER), 0.5)
+    np.testing.assert_allclose(middle.as_matrix(), rotation_z(QUARTER / 2), atol=1e-12)
+
+
+def test_slerp_takes_shorter_arc_for_negated_quaternion():
+    end = Quaternion.from_euler("z", QUARTER)
+    negated = Quaternion(-end.w, -end.x, -end.y, -end.z)
+    middle = Quaternion.identity().slerp(negated, 0.5)
+    np.testing.assert_allclose(middle.as_matrix(), rotation_z(QUARTER / 2), atol=1e-12)
+
+
+@pytest.mark.parametrize("t", [0.0, 0.25, 0.5, 0.9, 1.0])
+def test_slerp_stays_unit_length(t):
+    for end in (Quaternion.from_euler("xyz", (1.0, -2.0, 0.5)), Quaternion.from_euler("x", 1e-4)):
+        q = Quaternion.identity().slerp(end, t)
+        assert math.isclose(q.w ** 2 + q.x ** 2 + q.y ** 2 + q.z ** 2, 1.0, rel_tol=1e-12)
+
+
+def test_matches_scipy_rotation():
+    Rotation = pytest.importorskip("scipy.spatial.transform").Rotation
+    rng = np.random.default_rng(0)
+    for seq in ("xyz", "ZYX", "yx", "ZX"):
+        angles = rng.uniform(-math.pi, math.pi, len(seq)).tolist()
+        np.testing.assert_allclose(
+            Quaternion.from_euler(seq, angles).as_matrix(), Rotation.from_euler(seq, angles).as_matrix(), atol=1e-12
+        )
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from cosmic_security import CosmicSecuritySystem
+
+AUTHENTICATED = {"success": True, "access_level": 9}
+
+
+@pytest.fixture
+def security(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    system = CosmicSecuritySystem("behicof", "2025-04-17 14:59:15")
+    capsys.readouterr()
+    return system
+
+
+def knowledge_nodes(count):
+    return [{"id": f"node-{i}", "dimension": "temporal", "content": f"knowledge {i}"} for i in range(count)]
+
+
+@pytest.mark.parametrize("keep_bytes", [0, 3, 40, -20])
+def test_restore_reports_truncated_archive(security, keep_bytes):
+    backup = security.backup_knowledge(knowledge_nodes(5), packed=True)
+    archive_path = os.path.join(backup["backup_location"], "nodes.pack")
+    with open(archive_path, "rb") as f:
+        data = f.read()
+    with open(archive_path, "wb") as f:
+        f.write(data[:keep_bytes])
+
+    result = security.restore_knowledge(backup["backup_time"], AUTHENTICATED)
+
+    assert not result["success"]
+    assert "restored_nodes" not in result
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_restore_names_node_that_fails_to_decrypt(security, packed):
+    backup = security.backup_knowledge(knowledge_nodes(50), packed=packed)
+    if packed:
+        path = os.path.join(backup["backup_location"], "nodes.pack")
+        with security.open_backup_archive(backup["backup_location"])[0] as archive:
+            _, offset, length = archive.index[9]
+    else:
+        path = os.path.join(backup["backup_location"], "node_10_node-9.enc")
+        offset, length = 0, os.path.getsize(path)
+    with open(path, "r+b") as f:
+        # Flip a byte inside the Fernet token of node 10
+        f.seek(offset + length // 2)
+        byte = f.read(1)
+        f.seek(offset + length // 2)
+        f.write(bytes([byte[0] ^ 0x01]))
+
+    result = security.restore_knowledge(backup["backup_time"], AUTHENTICATED)
+
+    assert not result["success"]
+    assert result["corrupt_nodes"] == [10]
+
+
+def test_backup_writer_error_does_not_deadlock(security, monkeypatch):
+    def broken_write(self, name, payload):
+        raise TypeError("bad record")
+
+    monkeypatch.setattr("cosmic_archive.PackWriter.write", broken_write)
+    # More batches than the write queue holds (2 per worker), so a dead writer would block the producer
+    with pytest.raises(TypeError):
+        security.backup_knowledge(knowledge_nodes(40), workers=1, batch_size=2, packed=True)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_worker_pool_backup_round_trip(security, packed):
+    nodes = knowledge_nodes(40)
+    # Several batches per worker while the writer thread is running
+    backup = security.backup_knowledge(nodes, workers=2, batch_size=4, packed=packed)
+
+    restored = security.restore_knowledge(backup["backup_time"], AUTHENTICATED, workers=2, batch_size=4)
+
+    assert restored["success"]
+    assert restored["restored_nodes"] == nodes
+
+
+def test_backup_order_uses_numeric_suffix(security):
+    names = ["20250101_120000_9", "20250101_120000_10", "20250101_120000", "20241231_235959_11"]
+    assert sorted(names, key=security.backup_order) == [
+        "20241231_235959_11", "20250101_120000", "20250101_120000_9", "20250101_120000_10"
+    ]
+
+
+@pytest.mark.parametrize(
+    "manifest_text", ['{"backup_time": "2025', "[]", '{"node_hashes": ["0"], "files": ["node_1_x.enc"]}']
+)
+def test_incremental_backup_skips_unreadable_latest_manifest(security, manifest_text):
+    nodes = knowledge_nodes(6)
+    base = security.backup_knowledge(nodes)
+    broken = security.backup_knowledge(nodes, incremental=True)
+    # An interrupted backup leaves an unusable manifest behind
+    with open(os.path.join(broken["backup_location"], "manifest.json"), "w") as f:
+        f.write(manifest_text)
+
+    follow_up = security.backup_knowledge(nodes, incremental=True)
+
+    assert follow_up["stored_count"] == 0
+    restored = security.restore_knowledge(follow_up["backup_time"], AUTHENTICATED)
+    assert restored["restored_nodes"] == nodes
+    assert not os.path.exists(os.path.join(base["backup_location"], "manifest.json.tmp"))
+
+
+def test_incremental_backup_diffs_against_newest_same_second_backup(security):
+    nodes = knowledge_nodes(12)
+    backups = [security.backup_knowledge(nodes)]
+    for _ in range(11):
+        backups.append(security.backup_knowledge(nodes, incremental=True))
+    changed = [dict(node) for node in nodes]
+    changed[0]["content"] = "revised"
+    # Only the newest backup already holds the revised node
+    newest = security.backup_knowledge(changed, incremental=True)
+    follow_up = security.backup_knowledge(changed, incremental=True)
+
+    assert newest["stored_count"] == 1
+    assert follow_up["stored_count"] == 0
+    restored = security.restore_knowledge(follow_up["backup_time"], AUTHENTICATED)
+    assert restored["restored_nodes"] == changed